@@ -1,10 +1,33 @@
 import multiprocessing
-import tkinter as tk
-
-from src.gui import DigitRecognitionApp
+import sys
 
 if __name__ == "__main__":
     multiprocessing.freeze_support()
+    if len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+        # 基准测试：python main.py benchmark run/compare ...
+        from src.benchmark import main
+
+        sys.exit(main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "daemon":
+        # 本机识别服务：python main.py daemon [--port 8765]
+        from src.daemon import main
+
+        sys.exit(main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "tune":
+        # 校准本机的推理参数：python main.py tune [--backend onnx]
+        from src.tuning import main
+
+        sys.exit(main(sys.argv[2:]))
+    if len(sys.argv) > 1:
+        # 带参数运行时进入无界面的批量识别模式
+        from src.batch import main
+
+        sys.exit(main(sys.argv[1:]))
+
+    import tkinter as tk
+
+    from src.gui import DigitRecognitionApp
+
     root = tk.Tk()
     app = DigitRecognitionApp(root)
     root.mainloop()
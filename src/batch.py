@@ -0,0 +1,296 @@
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+from functools import partial
+from typing import Any, Iterator, TextIO
+
+from src.constant import (
+    BATCH_IMAGE_EXTENSIONS,
+    CASCADE_ESCALATION,
+    CASCADE_ESCALATIONS,
+    OCR_BACKEND,
+    OCR_BACKENDS,
+    SHARED_MODEL_BACKENDS,
+)
+from src.ocr_backend import WorkerTuning, backend_config_error
+from src.recognition import (
+    RecognitionOptions,
+    cascade_unavailable_warning,
+    preload_models,
+    recognition_process,
+)
+from src.tuning import plan_workers, startup_tuning
+from src.worker_memory import rss_budget
+from src.worker_supervisor import WorkerPool
+
+
+def collect_image_paths(inputs: list[str]) -> tuple[list[str], list[str]]:
+    """
+    展开命令行传入的文件、通配符和目录，返回 (图片路径, 未匹配到任何图片的输入)
+    """
+    paths: list[str] = []
+    missing: list[str] = []
+    seen: set[str] = set()
+
+    def add(path: str):
+        path = os.path.abspath(path)
+        if path not in seen:
+            seen.add(path)
+            paths.append(path)
+
+    for item in inputs:
+        if os.path.isdir(item):
+            matched = sorted(
+                os.path.join(dirpath, filename)
+                for dirpath, _, filenames in os.walk(item)
+                for filename in filenames
+                if filename.lower().endswith(BATCH_IMAGE_EXTENSIONS)
+            )
+        elif os.path.isfile(item):
+            matched = [item]
+        else:
+            matched = sorted(
+                path for path in glob.glob(item, recursive=True) if os.path.isfile(path)
+            )
+        if not matched:
+            missing.append(item)
+        for path in matched:
+            add(path)
+    return paths, missing
+
+
+def batch_recognition_process(
+    image_path: str, options: RecognitionOptions
+) -> dict[str, Any]:
+    result = recognition_process(image_path, options)
+    return {"path": image_path, **result}
+
+
+def to_record(result: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "path": result["path"],
+        "numbers": result.get("numbers", []),
+        "scores": result.get("scores", []),
+        "tiers": result.get("tiers", []),
+        "total": result.get("total", 0.0),
+        "elapsed_time": result.get("elapsed_time"),
+        "pipeline": result.get("pipeline"),
+        "trimmed_pixels": result.get("trimmed_pixels", 0),
+        "table": result.get("table"),
+        "cached": result.get("cached", False),
+        "stages": result.get("trace", {}).get("stages", {}),
+        "worker_rss": result.get("trace", {}).get("rss"),
+        "error": None if result["success"] else result["error"],
+    }
+
+
+def write_record(output: TextIO, record: dict[str, Any]):
+    output.write(json.dumps(record, ensure_ascii=False) + "\n")
+    output.flush()
+
+
+def iter_results(
+    paths: list[str],
+    workers: int,
+    options: RecognitionOptions,
+    backend: str,
+    tuning: WorkerTuning | None,
+    shared_models: bool = False,
+    rss_budget: int | None = None,
+) -> Iterator[dict[str, Any]]:
+    # 逐张返回已完成的结果，不等待整个批次结束；识别进程崩溃时只把这一张记为失败
+    context = multiprocessing.get_context("fork" if shared_models else None)
+    if shared_models:
+        preload_models(backend, tuning)
+    with WorkerPool(
+        workers, (None, None, backend, tuning, False), context, rss_budget
+    ) as pool:
+        for path, result, error in pool.imap_unordered(
+            partial(batch_recognition_process, options=options), paths
+        ):
+            if error is not None:
+                result = {"path": path, "success": False, "error": str(error)}
+            yield result
+
+
+def run_batch(
+    output: TextIO,
+    inputs: list[str],
+    workers: int,
+    options: RecognitionOptions | None = None,
+    backend: str = OCR_BACKEND,
+    tuning: WorkerTuning | None = None,
+    shared_models: bool = False,
+    rss_budget: int | None = None,
+) -> int:
+    start_time = time.time()
+    paths, missing = collect_image_paths(inputs)
+    grand_total = 0.0
+    failed = 0
+    recycled_pids: set[int] = set()
+
+    for item in missing:
+        failed += 1
+        write_record(
+            output,
+            {
+                "path": item,
+                "numbers": [],
+                "scores": [],
+                "tiers": [],
+                "total": 0.0,
+                "elapsed_time": None,
+                "pipeline": None,
+                "trimmed_pixels": 0,
+                "table": None,
+                "cached": False,
+                "stages": {},
+                "worker_rss": None,
+                "error": "未找到图片",
+            },
+        )
+
+    if paths:
+        for result in iter_results(
+            paths,
+            min(workers, len(paths)),
+            options or RecognitionOptions(),
+            backend,
+            tuning,
+            shared_models,
+            rss_budget,
+        ):
+            if result.get("trace", {}).get("recycled"):
+                recycled_pids.add(result["trace"]["pid"])
+            record = to_record(result)
+            if record["error"] is None:
+                grand_total += record["total"]
+            else:
+                failed += 1
+            write_record(output, record)
+
+    write_record(
+        output,
+        {
+            "summary": True,
+            "images": len(paths),
+            "failed": failed,
+            "recycled_workers": len(recycled_pids),
+            "total": grand_total,
+            "elapsed_time": time.time() - start_time,
+        },
+    )
+    return 1 if failed else 0
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="SnapSum4J",
+        description="批量识别图片中的数字并求和，每张图片输出一行JSON",
+    )
+    parser.add_argument("inputs", nargs="+", help="图片文件、通配符或目录")
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        help="识别进程数（默认：按物理核心数、校准的线程数和可用内存计算）",
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="单列数字图片跳过文字检测，版面不确定时自动回退到完整流程",
+    )
+    parser.add_argument(
+        "--no-adaptive",
+        action="store_true",
+        help="关闭大图切片检测和小图按原尺寸检测，始终按模型默认尺寸缩放",
+    )
+    parser.add_argument(
+        "--no-trim",
+        action="store_true",
+        help="关闭检测前的自动裁边，始终把整张图片送去识别",
+    )
+    parser.add_argument(
+        "--table",
+        action="store_true",
+        help="按框的位置把数字聚成列和行，结果中附带每列和每行的小计",
+    )
+    parser.add_argument(
+        "--cascade",
+        nargs="?",
+        const=CASCADE_ESCALATION,
+        choices=CASCADE_ESCALATIONS,
+        help="先用轻量模型识别，置信度或数字格式检查不通过时再用服务端模型；"
+        "boxes 只重新识别有问题的文本框，image 整张图重新识别"
+        f"（默认：{CASCADE_ESCALATION}）",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=OCR_BACKENDS,
+        default=OCR_BACKEND,
+        help=f"OCR引擎（默认：{OCR_BACKEND}）；onnx 需要先用 paddle2onnx 导出模型",
+    )
+    parser.add_argument(
+        "--share-models",
+        action="store_true",
+        help="在主进程中加载一次模型，识别进程以 fork 方式启动并与主进程写时复制共享模型权重"
+        "（仅 Linux/macOS 的 Paddle 引擎）",
+    )
+    parser.add_argument(
+        "--rss-budget",
+        type=int,
+        help="识别进程的常驻内存上限（MB），超过后在完成当前图片时重启该进程，0 表示不限制"
+        "（默认：预估占用的2倍）",
+    )
+    parser.add_argument("-o", "--output", help="输出JSONL文件路径（默认：标准输出）")
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers 必须大于0")
+    if args.rss_budget is not None and args.rss_budget < 0:
+        parser.error("--rss-budget 不能小于0")
+    if args.share_models and args.backend not in SHARED_MODEL_BACKENDS:
+        parser.error(f"{args.backend} 引擎不支持 --share-models")
+    if args.share_models and "fork" not in multiprocessing.get_all_start_methods():
+        parser.error("当前系统不支持 fork，无法使用 --share-models")
+    if error := backend_config_error(args.backend):
+        parser.error(error)
+    return args
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    options = RecognitionOptions(
+        fast_path=args.fast,
+        adaptive_det=not args.no_adaptive,
+        cascade=args.cascade,
+        auto_trim=not args.no_trim,
+        table=args.table,
+    )
+    if args.cascade and (warning := cascade_unavailable_warning(args.backend)):
+        print(warning, file=sys.stderr)
+    tuning = startup_tuning(args.backend)
+    workers = args.workers or plan_workers(
+        args.backend, tuning.cpu_threads if tuning else None, args.share_models
+    )
+    budget = rss_budget(args.backend, args.rss_budget)
+
+    def run(output: TextIO) -> int:
+        return run_batch(
+            output,
+            args.inputs,
+            workers,
+            options,
+            args.backend,
+            tuning,
+            args.share_models,
+            budget,
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            return run(output)
+    return run(sys.stdout)
@@ -0,0 +1,393 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+from typing import Any
+
+import numpy as np
+
+from src.constant import (
+    BENCHMARK_ACCURACY_TOLERANCE,
+    BENCHMARK_LATENCY_TOLERANCE,
+    BENCHMARK_MEMORY_TOLERANCE,
+    BENCHMARK_REPEAT,
+    BENCHMARK_SEED,
+    CASCADE_ESCALATION,
+    CASCADE_ESCALATIONS,
+    OCR_BACKEND,
+    OCR_BACKENDS,
+    SYNTHETIC_DPIS,
+    SYNTHETIC_FONTS,
+    SYNTHETIC_KINDS,
+    SYNTHETIC_NOISE_LEVELS,
+    SYNTHETIC_ROWS,
+)
+from src.recognition import (
+    RecognitionOptions,
+    cascade_unavailable_warning,
+    disable_result_cache,
+    ensure_worker,
+    init_worker,
+    recognition_process,
+)
+from src.shared_image import release_shared_image, share_image
+from src.synthetic_images import SyntheticCase, build_cases, generate_sample
+
+# (指标, 变好的方向, 容差类型)：延迟和内存按相对变化判断，准确率按绝对差值判断
+SUMMARY_METRICS: tuple[tuple[str, str, str], ...] = (
+    ("latency_p50", "lower", "latency"),
+    ("latency_p95", "lower", "latency"),
+    ("throughput", "higher", "latency"),
+    ("peak_rss", "lower", "memory"),
+    ("digit_accuracy", "higher", "accuracy"),
+    ("number_accuracy", "higher", "accuracy"),
+    ("sum_correct_rate", "higher", "accuracy"),
+)
+
+
+def peak_rss() -> int | None:
+    # Linux 上 ru_maxrss 的单位是KB；Windows 没有 resource 模块
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def edit_distance(source: str, target: str) -> int:
+    """
+    逐行用 NumPy 计算编辑距离，60 行的表格也能在毫秒级完成
+    """
+    if not source or not target:
+        return max(len(source), len(target))
+    target_codes = np.frombuffer(target.encode("utf-32-le"), dtype=np.uint32)
+    offsets = np.arange(len(target) + 1)
+    row = offsets.copy()
+    for index, char in enumerate(source, 1):
+        substitute = row[:-1] + (target_codes != ord(char))
+        current = np.empty_like(row)
+        current[0] = index
+        current[1:] = np.minimum(row[1:] + 1, substitute)
+        # 插入操作沿行方向传播：current[j] = min(current[j], current[j-1] + 1)
+        row = np.minimum.accumulate(current - offsets) + offsets
+    return int(row[-1])
+
+
+def digit_accuracy(predicted: list[str], truth: list[str]) -> float:
+    expected = " ".join(truth)
+    distance = edit_distance(" ".join(predicted), expected)
+    return max(0.0, 1.0 - distance / max(len(expected), 1))
+
+
+def number_accuracy(predicted: list[str], truth: list[str]) -> float:
+    # 不考虑顺序，多识别或漏识别的数字都会拉低准确率
+    matched = sum((Counter(predicted) & Counter(truth)).values())
+    return matched / max(len(predicted), len(truth), 1)
+
+
+def exact_sum(numbers: list[str]) -> Decimal | None:
+    try:
+        return sum((Decimal(number) for number in numbers), Decimal(0))
+    except InvalidOperation:
+        return None
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    return float(np.percentile(values, q)) if values else None
+
+
+def run_case(
+    case: SyntheticCase, options: RecognitionOptions, repeat: int
+) -> dict[str, Any]:
+    sample = generate_sample(case)
+    shm, handle = share_image(sample.image)
+    latencies: list[float] = []
+    result: dict[str, Any] = {}
+    try:
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            result = recognition_process(handle, options)
+            latencies.append(time.perf_counter() - start_time)
+            if not result["success"]:
+                break
+    finally:
+        release_shared_image(shm)
+
+    record: dict[str, Any] = {
+        "name": case.name,
+        "kind": case.kind,
+        "rows": case.rows,
+        "font": case.font,
+        "dpi": case.dpi,
+        "noise": case.noise,
+        "seed": case.seed,
+        "size": list(sample.image.size),
+        "latencies": latencies,
+        "expected_total": str(sample.total),
+    }
+    if not result["success"]:
+        return {**record, "error": result["error"]}
+    predicted: list[str] = result["numbers"]
+    total = exact_sum(predicted)
+    return {
+        **record,
+        "numbers": predicted,
+        "total": None if total is None else str(total),
+        "digit_accuracy": digit_accuracy(predicted, sample.numbers),
+        "number_accuracy": number_accuracy(predicted, sample.numbers),
+        "sum_correct": total == sample.total,
+        "pipeline": result["pipeline"],
+        "trimmed_pixels": result["trimmed_pixels"],
+        "error": None,
+    }
+
+
+def summarize(records: list[dict[str, Any]]) -> dict[str, Any]:
+    succeeded = [record for record in records if record["error"] is None]
+    latencies = [latency for record in succeeded for latency in record["latencies"]]
+
+    def mean(key: str) -> float | None:
+        values = [float(record[key]) for record in succeeded]
+        return sum(values) / len(values) if values else None
+
+    return {
+        "cases": len(records),
+        "failed": len(records) - len(succeeded),
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        # 只计识别耗时，不含生成合成图片的时间
+        "throughput": len(latencies) / sum(latencies) if latencies else None,
+        "digit_accuracy": mean("digit_accuracy"),
+        "number_accuracy": mean("number_accuracy"),
+        "sum_correct_rate": mean("sum_correct"),
+    }
+
+
+def run_benchmark(args: argparse.Namespace) -> dict[str, Any]:
+    options = RecognitionOptions(
+        fast_path=args.fast,
+        adaptive_det=not args.no_adaptive,
+        cascade=args.cascade,
+        auto_trim=not args.no_trim,
+    )
+    if args.cascade and (warning := cascade_unavailable_warning(args.backend)):
+        print(warning, file=sys.stderr)
+    cases, missing_fonts = build_cases(
+        args.kinds, args.rows, args.fonts, args.dpi, args.noise, args.seed
+    )
+    # 关闭结果缓存，重复运行同一张图时每次都真正执行识别
+    disable_result_cache()
+    load_start = time.perf_counter()
+    init_worker(backend_name=args.backend)
+    ensure_worker()
+    load_time = time.perf_counter() - load_start
+
+    records: list[dict[str, Any]] = []
+    for index, case in enumerate(cases, 1):
+        records.append(run_case(case, options, args.repeat))
+        print(f"[{index}/{len(cases)}] {case.name}", file=sys.stderr)
+
+    return {
+        "environment": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {
+            "backend": args.backend,
+            "options": json.loads(options.cache_tag()),
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "load_time": load_time,
+        "summary": {**summarize(records), "peak_rss": peak_rss()},
+        "kinds": {
+            kind: summarize([record for record in records if record["kind"] == kind])
+            for kind in dict.fromkeys(case.kind for case in cases)
+        },
+        "skipped_fonts": missing_fonts,
+        "results": records,
+    }
+
+
+def compare_metric(
+    name: str,
+    baseline: float | None,
+    current: float | None,
+    direction: str,
+    tolerance: float,
+    relative: bool,
+) -> dict[str, Any] | None:
+    if baseline is None or current is None:
+        return None
+    change = current - baseline
+    if relative:
+        change = change / baseline if baseline else 0.0
+    worse = -change if direction == "higher" else change
+    if worse <= tolerance:
+        return None
+    return {
+        "metric": name,
+        "baseline": baseline,
+        "current": current,
+        "change": change,
+        "tolerance": tolerance,
+    }
+
+
+def compare_reports(
+    baseline: dict[str, Any], current: dict[str, Any], tolerances: dict[str, float]
+) -> dict[str, Any]:
+    """
+    对比总体和每种版式的指标，超过容差的变化记为退化
+    """
+    sections = [("summary", baseline["summary"], current["summary"])]
+    sections.extend(
+        (f"kinds.{kind}", baseline["kinds"][kind], current["kinds"][kind])
+        for kind in current["kinds"]
+        if kind in baseline["kinds"]
+    )
+    regressions: list[dict[str, Any]] = []
+    for section, old, new in sections:
+        for name, direction, kind in SUMMARY_METRICS:
+            regression = compare_metric(
+                name,
+                old.get(name),
+                new.get(name),
+                direction,
+                tolerances[kind],
+                kind != "accuracy",
+            )
+            if regression is not None:
+                regressions.append({"section": section, **regression})
+    baseline_cases = {record["name"] for record in baseline["results"]}
+    baseline_passed = {
+        record["name"] for record in baseline["results"] if record["error"] is None
+    }
+    return {
+        # 用例集合或配置不同时仍会对比，但数字不一定可比
+        "comparable": baseline_cases
+        == {record["name"] for record in current["results"]}
+        and baseline["config"] == current["config"],
+        "new_failures": sorted(
+            record["name"]
+            for record in current["results"]
+            if record["error"] is not None and record["name"] in baseline_passed
+        ),
+        "regressions": regressions,
+    }
+
+
+def load_report(path: str) -> dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_report(report: dict[str, Any], output_path: str | None):
+    text = json.dumps(report, ensure_ascii=False, indent=2) + "\n"
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="SnapSum4J benchmark",
+        description="用合成的数字图片测量识别延迟、吞吐量、内存和准确率，并与基线对比",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="运行基准测试并输出JSON报告")
+    run.add_argument(
+        "--kinds", nargs="+", choices=SYNTHETIC_KINDS, default=SYNTHETIC_KINDS
+    )
+    run.add_argument("--rows", nargs="+", type=int, default=SYNTHETIC_ROWS)
+    run.add_argument(
+        "--fonts",
+        nargs="+",
+        default=SYNTHETIC_FONTS,
+        help="字体文件名，default 为 Pillow 自带字体，系统中找不到的字体会被跳过",
+    )
+    run.add_argument("--dpi", nargs="+", type=int, default=SYNTHETIC_DPIS)
+    run.add_argument(
+        "--noise",
+        nargs="+",
+        type=float,
+        default=SYNTHETIC_NOISE_LEVELS,
+        help="高斯噪声的标准差（像素值）",
+    )
+    run.add_argument(
+        "--repeat",
+        type=int,
+        default=BENCHMARK_REPEAT,
+        help=f"每张图片识别次数（默认：{BENCHMARK_REPEAT}）",
+    )
+    run.add_argument("--seed", type=int, default=BENCHMARK_SEED)
+    run.add_argument("--fast", action="store_true", help="启用单列快速识别")
+    run.add_argument("--no-adaptive", action="store_true", help="关闭自适应检测")
+    run.add_argument("--no-trim", action="store_true", help="关闭检测前的自动裁边")
+    run.add_argument(
+        "--cascade",
+        nargs="?",
+        const=CASCADE_ESCALATION,
+        choices=CASCADE_ESCALATIONS,
+        help="启用快速/准确模型级联识别",
+    )
+    run.add_argument("--backend", choices=OCR_BACKENDS, default=OCR_BACKEND)
+    run.add_argument("-o", "--output", help="输出JSON文件路径（默认：标准输出）")
+
+    compare = subparsers.add_parser(
+        "compare", help="对比两份报告，有指标退化时以非零状态退出"
+    )
+    compare.add_argument("baseline", help="基线报告")
+    compare.add_argument("current", help="本次报告")
+    compare.add_argument(
+        "--latency-tolerance",
+        type=float,
+        default=BENCHMARK_LATENCY_TOLERANCE,
+        help=f"延迟和吞吐量允许的相对变化（默认：{BENCHMARK_LATENCY_TOLERANCE}）",
+    )
+    compare.add_argument(
+        "--memory-tolerance",
+        type=float,
+        default=BENCHMARK_MEMORY_TOLERANCE,
+        help=f"峰值内存允许的相对变化（默认：{BENCHMARK_MEMORY_TOLERANCE}）",
+    )
+    compare.add_argument(
+        "--accuracy-tolerance",
+        type=float,
+        default=BENCHMARK_ACCURACY_TOLERANCE,
+        help=f"准确率允许下降的绝对值（默认：{BENCHMARK_ACCURACY_TOLERANCE}）",
+    )
+    compare.add_argument("-o", "--output", help="输出JSON文件路径（默认：标准输出）")
+
+    args = parser.parse_args(argv)
+    if args.command == "run" and args.repeat < 1:
+        parser.error("--repeat 必须大于0")
+    return args
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    if args.command == "compare":
+        result = compare_reports(
+            load_report(args.baseline),
+            load_report(args.current),
+            {
+                "latency": args.latency_tolerance,
+                "memory": args.memory_tolerance,
+                "accuracy": args.accuracy_tolerance,
+            },
+        )
+        write_report(result, args.output)
+        return 1 if result["regressions"] or result["new_failures"] else 0
+    report = run_benchmark(args)
+    write_report(report, args.output)
+    return 1 if report["summary"]["failed"] else 0
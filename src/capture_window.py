@@ -1,39 +1,64 @@
-import os
 import tkinter as tk
 from tkinter import messagebox
 from typing import Callable
 
-import pyautogui
+from PIL import Image, ImageTk
 
-from src.constant import CAPTURE_SCREEN_RECT_MIN_LENGTH, TEMP_FILE_NAME
+from src.constant import (
+    CAPTURE_SCREEN_RECT_MIN_LENGTH,
+    JOB_KIND_RECOGNIZE,
+    TRACE_STAGE_CAPTURE,
+)
 from src.gui_constant import (
+    SCREEN_CAPTURE_ALPHA,
     SCREEN_CAPTURE_CANCEL_DELAY,
+    SCREEN_CAPTURE_SUCCESS_TEXT,
     SCREEN_CAPTURE_WARNING_MESSAGE,
     SCREEN_CAPTURE_WARNING_TITLE,
 )
+from src.screen_grab import screen_grabber
+from src.tracing import RequestTrace
+from src.utils import Box
 
 
 class CaptureScreen(tk.Toplevel):
     def __init__(
         self,
         root: tk.Tk,
-        image_path_var: tk.StringVar,
         status_var: tk.StringVar,
-        recognize_digits: Callable[[], None],
+        recognize_digits: Callable[[Image.Image, RequestTrace], None],
+        on_region_selected: Callable[[Box], None] | None = None,
+        frozen_frame: Image.Image | None = None,
     ):
         super().__init__(root)
         self.root = root
         self.attributes("-fullscreen", True)  # pyright: ignore[reportUnknownMemberType]
-        self.attributes("-alpha", 0.3)  # pyright: ignore[reportUnknownMemberType]
+        # 冻结画面时遮罩直接显示截好的整屏画面，需要完全不透明
+        self.attributes(  # pyright: ignore[reportUnknownMemberType]
+            "-alpha", SCREEN_CAPTURE_ALPHA if frozen_frame is None else 1.0
+        )
         self.attributes("-topmost", True)  # pyright: ignore[reportUnknownMemberType]
         self.config(cursor="cross")
-        self.image_path_var = image_path_var
         self.status_var = status_var
         self.recognize_digits = recognize_digits
+        # 监视模式只需要区域坐标，不立即截图识别
+        self.on_region_selected = on_region_selected
+        # 打开遮罩时截取的整屏画面，选中区域直接从中裁剪，不会截到正在消失的遮罩
+        self.frozen_frame = frozen_frame
+        self.photo: ImageTk.PhotoImage | None = None
 
     def create_canvas(self, screen_width: int, screen_height: int):
-        canvas = tk.Canvas(self, width=screen_width, height=screen_height)
+        canvas = tk.Canvas(
+            self, width=screen_width, height=screen_height, highlightthickness=0
+        )
         canvas.pack(fill=tk.BOTH, expand=True)
+        if self.frozen_frame is not None:
+            frame = self.frozen_frame
+            if frame.size != (screen_width, screen_height):
+                # 截图按物理像素、界面按逻辑坐标时两者大小不同，只缩放显示用的副本
+                frame = frame.resize((screen_width, screen_height))
+            self.photo = ImageTk.PhotoImage(frame)
+            canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)
         return canvas
 
     def handle_select_region_events(self, canvas: tk.Canvas):
@@ -75,7 +100,11 @@ class CaptureScreen(tk.Toplevel):
                     and y2 - y1 > CAPTURE_SCREEN_RECT_MIN_LENGTH
                 ):
                     self.destroy()
-                    self.capture_selected_region(x1, y1, x2, y2)
+                    if self.on_region_selected is not None:
+                        self.root.deiconify()
+                        self.on_region_selected((x1, y1, x2, y2))
+                    else:
+                        self.capture_selected_region(x1, y1, x2, y2)
                 else:
                     self.destroy()
                     self.root.deiconify()
@@ -101,15 +130,34 @@ class CaptureScreen(tk.Toplevel):
 
     def capture_selected_region(self, x1: int, y1: int, x2: int, y2: int):
         try:
-            screenshot = pyautogui.screenshot(region=(x1, y1, x2 - x1, y2 - y1))
-            temp_file = os.path.join(os.path.abspath("."), TEMP_FILE_NAME)
-            screenshot.save(temp_file)
+            trace = RequestTrace(JOB_KIND_RECOGNIZE)
+            with trace.stage(TRACE_STAGE_CAPTURE):
+                if self.frozen_frame is not None:
+                    screenshot = self.crop_frozen_frame(x1, y1, x2, y2)
+                else:
+                    # 先让遮罩的销毁请求送达显示服务器，再只截取所选区域
+                    self.root.update_idletasks()
+                    screenshot = screen_grabber().grab((x1, y1, x2, y2))
             self.root.deiconify()
-            self.image_path_var.set(temp_file)
             self.status_var.set(
-                f"已截取屏幕区域，保存为: {os.path.basename(temp_file)}"
+                SCREEN_CAPTURE_SUCCESS_TEXT.format(
+                    width=screenshot.width, height=screenshot.height
+                )
             )
-            self.recognize_digits()
+            self.recognize_digits(screenshot, trace)
         except Exception as e:
             messagebox.showerror("错误", f"截取屏幕失败: {str(e)}")
             self.status_var.set(f"截取屏幕失败: {str(e)}")
+
+    def crop_frozen_frame(self, x1: int, y1: int, x2: int, y2: int) -> Image.Image:
+        assert self.frozen_frame is not None
+        scale_x = self.frozen_frame.width / self.root.winfo_screenwidth()
+        scale_y = self.frozen_frame.height / self.root.winfo_screenheight()
+        return self.frozen_frame.crop(
+            (
+                round(x1 * scale_x),
+                round(y1 * scale_y),
+                round(x2 * scale_x),
+                round(y2 * scale_y),
+            )
+        )
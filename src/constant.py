@@ -1,9 +1,271 @@
+import os
+
 SCALE_FACTOR: int = 3
-TEMP_FILE_NAME: str = "temp.png"
 
 PREVIEW_RECT_MIN_LENGTH: int = 10
+# 预览窗口最多占屏幕的比例，超出部分通过滚动查看
+PREVIEW_MAX_SCREEN_RATIO: float = 0.8
+PREVIEW_MIN_ZOOM: float = 0.05
+PREVIEW_MAX_ZOOM: float = 8.0
+PREVIEW_ZOOM_STEP: float = 1.25
+PREVIEW_TILE_SIZE: int = 256
+PREVIEW_TILE_CACHE_SIZE: int = 128
+PREVIEW_PYRAMID_MIN_SIDE: int = 64
 
 CAPTURE_SCREEN_RECT_MIN_LENGTH: int = 10
+# 截图方式：x11 通过 libX11 直接读取所选区域，pyautogui 为通用方式，auto 在 X11 桌面上优先用 x11
+CAPTURE_BACKEND_AUTO: str = "auto"
+CAPTURE_BACKEND_X11: str = "x11"
+CAPTURE_BACKEND_PYAUTOGUI: str = "pyautogui"
+CAPTURE_BACKEND: str = os.environ.get("SNAPSUM4J_CAPTURE_BACKEND", CAPTURE_BACKEND_AUTO)
 
 DET_MODEL_PATH: str = "models/PP-OCRv5_server_det"
 REC_MODEL_PATH: str = "models/PP-OCRv5_server_rec"
+REC_MODEL_NAME: str = "PP-OCRv5_server_rec"
+REC_BATCH_SIZE: int = 8
+# 级联模式下先运行的轻量模型，放在服务端模型旁边
+MOBILE_DET_MODEL_PATH: str = "models/PP-OCRv5_mobile_det"
+MOBILE_REC_MODEL_PATH: str = "models/PP-OCRv5_mobile_rec"
+MOBILE_REC_MODEL_NAME: str = "PP-OCRv5_mobile_rec"
+
+MODEL_TIER_FAST: str = "fast"
+MODEL_TIER_ACCURATE: str = "accurate"
+# 各档模型：(检测模型目录, 识别模型目录, 识别模型名称)
+MODEL_TIERS: dict[str, tuple[str, str, str]] = {
+    MODEL_TIER_FAST: (
+        MOBILE_DET_MODEL_PATH,
+        MOBILE_REC_MODEL_PATH,
+        MOBILE_REC_MODEL_NAME,
+    ),
+    MODEL_TIER_ACCURATE: (DET_MODEL_PATH, REC_MODEL_PATH, REC_MODEL_NAME),
+}
+
+# 级联识别：轻量模型的结果置信度不足或不像合法数字时交给服务端模型，
+# boxes 只重新识别有问题的文本框，image 整张图重新走服务端模型
+CASCADE_ESCALATE_BOXES: str = "boxes"
+CASCADE_ESCALATE_IMAGE: str = "image"
+CASCADE_ESCALATIONS: tuple[str, ...] = (
+    CASCADE_ESCALATE_BOXES,
+    CASCADE_ESCALATE_IMAGE,
+)
+CASCADE_ESCALATION: str = CASCADE_ESCALATE_BOXES
+CASCADE_MIN_SCORE: float = 0.9
+# 数字字符占比达到这个比例却不是合法数字的文本视为识别错误
+CASCADE_NUMERIC_RATIO: float = 0.5
+CASCADE_BOX_PADDING: int = 4
+CASCADE_UNAVAILABLE_WARNING: str = (
+    "未找到轻量模型 {det} / {rec}，级联识别将只使用服务端模型"
+)
+
+# OCR 引擎：paddle 使用 PaddleOCR，onnx 使用 ONNX Runtime CPU 推理同一套检测/识别模型
+OCR_BACKEND_PADDLE: str = "paddle"
+OCR_BACKEND_ONNX: str = "onnx"
+OCR_BACKENDS: tuple[str, ...] = (OCR_BACKEND_PADDLE, OCR_BACKEND_ONNX)
+OCR_BACKEND: str = os.environ.get("SNAPSUM4J_OCR_BACKEND", OCR_BACKEND_PADDLE)
+# 由 paddle2onnx 导出，放在对应模型目录下
+ONNX_MODEL_FILE: str = "inference.onnx"
+# ONNX Runtime 会话参数，可用同名的 SNAPSUM4J_ 环境变量覆盖，创建引擎时校验。
+# 线程数为 0 表示由 ONNX Runtime 按CPU核心数决定；本机有校准结果时算子内线程数以校准结果为准
+ONNX_INTRA_OP_THREADS: str = os.environ.get("SNAPSUM4J_ONNX_INTRA_OP_THREADS", "0")
+ONNX_INTER_OP_THREADS: str = os.environ.get("SNAPSUM4J_ONNX_INTER_OP_THREADS", "1")
+# disable / basic / extended / all
+ONNX_GRAPH_OPTIMIZATION: str = os.environ.get("SNAPSUM4J_ONNX_GRAPH_OPTIMIZATION", "all")
+ONNX_DET_MIN_BOX_SIZE: int = 3
+ONNX_DET_MAX_SIDE_LIMIT: int = 4000
+
+BATCH_IMAGE_EXTENSIONS: tuple[str, ...] = (
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".bmp",
+    ".gif",
+    ".tif",
+    ".tiff",
+)
+
+RESULT_CACHE_VERSION: int = 4
+RESULT_CACHE_MAX_ENTRIES: int = 256
+# 磁盘缓存的最多文件数，超过后按最近使用时间淘汰到上限的 RESULT_CACHE_PRUNE_RATIO
+RESULT_CACHE_DISK_MAX_ENTRIES: int = 4096
+RESULT_CACHE_PRUNE_RATIO: float = 0.9
+# 设为 None 则只使用内存缓存
+RESULT_CACHE_DIR: str | None = os.path.join(
+    os.path.expanduser("~"), ".snapsum4j", "result_cache"
+)
+
+WARMUP_IMAGE_SIZE: tuple[int, int] = (160, 40)
+WARMUP_IMAGE_TEXT: str = "1234.56"
+
+WORKER_STATE_TUNING: str = "tuning"
+WORKER_STATE_LOADING: str = "loading"
+WORKER_STATE_WARMING: str = "warming"
+WORKER_STATE_READY: str = "ready"
+WORKER_STATE_FAILED: str = "failed"
+# 界面的识别进程崩溃或超时被重启
+WORKER_STATE_RESTARTING: str = "restarting"
+
+PIPELINE_FULL: str = "det_rec"
+PIPELINE_REC_ONLY: str = "rec_only"
+PIPELINE_TILED: str = "tiled_det_rec"
+
+# 单列快速识别：水平投影切行的参数
+LINE_INK_THRESHOLD: int = 60
+LINE_MIN_HEIGHT: int = 6
+LINE_MIN_GAP: int = 2
+LINE_PADDING: int = 4
+LINE_MAX_HEIGHT_RATIO: float = 2.0
+LINE_MAX_COLUMN_GAP_RATIO: float = 2.5
+
+# 检测前自动裁边：边缘处灰度极差不超过容差的行/列视为均匀边框，
+# 其余部分按墨迹范围外扩 TRIM_PADDING 像素（检测模型需要文字周围留白）
+TRIM_UNIFORM_TOLERANCE: int = 8
+TRIM_PADDING: int = 12
+
+# 表格模式：水平方向重叠（或间隔小于 TABLE_COLUMN_GAP 像素）的框属于同一列；
+# 比较行时只取每个框中间 TABLE_ROW_OVERLAP 比例的高度
+TABLE_COLUMN_GAP: int = 0
+TABLE_ROW_OVERLAP: float = 0.5
+
+# 大图切片检测：超过触发边长的图片按原始分辨率切成重叠切片
+DET_TILE_SIZE: int = 960
+DET_TILE_OVERLAP: int = 160
+DET_TILE_TRIGGER_SIDE: int = 1920
+TILE_EDGE_MARGIN: int = 4
+TILE_DEDUP_OVERLAP: float = 0.5
+TILE_GRID_CELL: int = 256
+
+# 低置信度复查
+LOW_CONFIDENCE_THRESHOLD: float = 0.9
+RECHECK_SCALE: int = 2
+RECHECK_PADDING: int = 4
+
+# 屏幕监视：定时截取同一区域，缩小后的灰度画面有变化才重新识别
+WATCH_INTERVAL: int = 1000
+WATCH_MIN_INTERVAL: int = 200
+WATCH_MAX_INTERVAL: int = 60000
+WATCH_DIFF_SCALE: int = 4
+WATCH_DIFF_THRESHOLD: int = 24
+WATCH_BAND_MIN_GAP: int = 2
+WATCH_BAND_PADDING: int = 6
+# 变化的行带超过区域高度的这个比例时直接整块重新识别
+WATCH_FULL_REFRESH_RATIO: float = 0.6
+
+# 识别任务调度：数值越小优先级越高，同类任务的新请求替换旧请求
+JOB_PRIORITY_INTERACTIVE: int = 0
+JOB_PRIORITY_BACKGROUND: int = 1
+JOB_KIND_RECOGNIZE: str = "recognize"
+JOB_KIND_RECHECK: str = "recheck"
+JOB_KIND_WATCH: str = "watch"
+JOB_KIND_PAGES: str = "pages"
+JOB_CANCELLED_ERROR: str = "任务已取消"
+
+# 界面识别进程的监管：单个任务的超时（秒）和进程崩溃或超时后的总尝试次数
+WORKER_JOB_TIMEOUT: float = 120.0
+WORKER_JOB_ATTEMPTS: int = 2
+WORKER_CRASHED_ERROR: str = "识别进程异常退出（退出码: {exitcode}）"
+WORKER_TIMEOUT_ERROR: str = "识别超过 {timeout:.0f} 秒未完成"
+# 设置为 1 时额外保持一个已预热的备用识别进程，识别进程出错时直接顶替，多占一份模型内存
+WORKER_STANDBY: bool = os.environ.get("SNAPSUM4J_STANDBY_WORKER") == "1"
+
+# 多页 TIFF/GIF 逐页识别：识别当前页时最多预先解码的页数
+PAGE_PREFETCH: int = 1
+PAGE_STREAM_POLL_INTERVAL: float = 0.1
+
+# 基准测试：合成图片的版式、字体、DPI 和噪声组合
+SYNTHETIC_KIND_COLUMN: str = "column"
+SYNTHETIC_KIND_TABLE: str = "table"
+SYNTHETIC_KIND_INVOICE: str = "invoice"
+SYNTHETIC_KIND_SCROLLED: str = "scrolled"
+SYNTHETIC_KINDS: tuple[str, ...] = (
+    SYNTHETIC_KIND_COLUMN,
+    SYNTHETIC_KIND_TABLE,
+    SYNTHETIC_KIND_INVOICE,
+    SYNTHETIC_KIND_SCROLLED,
+)
+# default 为 Pillow 自带字体，其余按文件名在系统字体目录中查找，找不到时跳过
+SYNTHETIC_DEFAULT_FONT: str = "default"
+SYNTHETIC_FONTS: tuple[str, ...] = (
+    SYNTHETIC_DEFAULT_FONT,
+    "DejaVuSans.ttf",
+    "DejaVuSansMono.ttf",
+    "arial.ttf",
+)
+SYNTHETIC_FONT_POINTS: int = 12
+SYNTHETIC_ROWS: tuple[int, ...] = (5, 20, 60)
+SYNTHETIC_DPIS: tuple[int, ...] = (96, 144)
+SYNTHETIC_NOISE_LEVELS: tuple[float, ...] = (0.0, 12.0)
+SYNTHETIC_TABLE_COLUMNS: int = 4
+SYNTHETIC_SCROLL_FACTOR: int = 3
+BENCHMARK_REPEAT: int = 3
+BENCHMARK_SEED: int = 20240601
+# 对比基线时允许的变化：延迟和内存按相对比例，准确率按绝对差值，超过即视为退化
+BENCHMARK_LATENCY_TOLERANCE: float = 0.10
+BENCHMARK_MEMORY_TOLERANCE: float = 0.10
+BENCHMARK_ACCURACY_TOLERANCE: float = 0.005
+
+# 分阶段耗时追踪：每次识别请求写一行JSON，文件超过上限后轮转
+TRACE_STAGE_CAPTURE: str = "capture"
+TRACE_STAGE_SHARE: str = "share"
+TRACE_STAGE_QUEUE: str = "queue"
+TRACE_STAGE_WORKER: str = "worker"
+TRACE_STAGE_DECODE: str = "decode"
+TRACE_STAGE_CACHE: str = "cache"
+TRACE_STAGE_SPLIT: str = "split"
+TRACE_STAGE_TRIM: str = "trim"
+TRACE_STAGE_OCR: str = "ocr"
+TRACE_STAGE_DETECT: str = "detect"
+TRACE_STAGE_RECOGNIZE: str = "recognize"
+TRACE_STAGE_FILTER: str = "filter"
+TRACE_STAGE_RETURN: str = "return"
+TRACE_STAGE_UI: str = "ui"
+# 设为 None 则不写追踪文件
+TRACE_FILE: str | None = os.environ.get("SNAPSUM4J_TRACE_FILE") or os.path.join(
+    os.path.expanduser("~"), ".snapsum4j", "trace", "trace.jsonl"
+)
+TRACE_MAX_BYTES: int = 5 * 1024 * 1024
+TRACE_BACKUP_COUNT: int = 3
+# 设置后子进程用 cProfile 记录每次模型推理，按进程号和时间写入该目录下的 .prof 文件
+PROFILE_DIR: str | None = os.environ.get("SNAPSUM4J_PROFILE_DIR") or None
+
+# 推理参数校准：在内置的合成图片上比较线程数、MKL-DNN 和识别批大小的组合，结果按机器保存
+TUNING_VERSION: int = 1
+TUNING_DIR: str = os.path.join(os.path.expanduser("~"), ".snapsum4j", "tuning")
+# 本机还没有校准结果时先校准再加载模型（会明显延长首次启动时间）；
+# 界面的识别进程在加载前校准，批量识别和服务在启动进程池前由主进程校准一次
+TUNE_ON_STARTUP: bool = os.environ.get("SNAPSUM4J_AUTO_TUNE") == "1"
+TUNING_THREAD_CANDIDATES: tuple[int, ...] = (1, 2, 4, 8)
+TUNING_BATCH_SIZES: tuple[int, ...] = (1, 4, 8, 16)
+TUNING_REPEAT: int = 3
+TUNING_SAMPLE_ROWS: int = 20
+# 按可用内存计算进程数时每个识别进程的预估占用，以及留给系统和界面的内存
+WORKER_MEMORY_ESTIMATES: dict[str, int] = {
+    OCR_BACKEND_PADDLE: 1536 * 1024 * 1024,
+    OCR_BACKEND_ONNX: 512 * 1024 * 1024,
+}
+WORKER_MEMORY_RESERVE: int = 1024 * 1024 * 1024
+# 共享模型时每个识别进程在继承的权重之外的预估占用（占 WORKER_MEMORY_ESTIMATES 的比例）；
+# ONNX Runtime 会话在创建时就启动线程池，fork 后不可用，所以只有 Paddle 引擎支持共享
+WORKER_SHARED_MEMORY_RATIO: float = 0.4
+SHARED_MODEL_BACKENDS: tuple[str, ...] = (OCR_BACKEND_PADDLE,)
+# 识别进程常驻内存超过预估占用的这个倍数时，在发回当前结果后退出，由进程池重新启动
+WORKER_RSS_BUDGET_RATIO: float = 2.0
+
+# 识别守护进程：只监听本机，多个客户端共用一份已加载的模型
+DAEMON_HOST: str = "127.0.0.1"
+DAEMON_PORT: int = 8765
+# 设置后界面连接该地址的守护进程（如 http://127.0.0.1:8765），不再自己启动识别进程
+DAEMON_URL: str | None = os.environ.get("SNAPSUM4J_DAEMON_URL") or None
+# 正在识别的请求之外最多排队的请求数，超过时返回 503
+DAEMON_MAX_QUEUE: int = 16
+DAEMON_MAX_BODY: int = 64 * 1024 * 1024
+DAEMON_REQUEST_TIMEOUT: float = 120.0
+DAEMON_HEALTH_POLL_INTERVAL: float = 0.5
+DAEMON_BUSY_ERROR: str = "识别服务繁忙，请稍后重试"
+DAEMON_HEALTH_OK: str = "ok"
+DAEMON_HEALTH_LOADING: str = "loading"
+DAEMON_HEALTH_FAILED: str = "failed"
+# 守护进程的微批处理：窗口内到达的同选项请求合并成一次识别，窗口为 0 时不合并
+DAEMON_BATCH_WINDOW: float = 0.005
+DAEMON_BATCH_MAX_IMAGES: int = 16
+# 合并的请求最多等待的时间，按识别进程的单任务超时和重试次数计算；超时后返回错误，释放处理线程和排队名额
+DAEMON_BATCH_WAIT_TIMEOUT: float = WORKER_JOB_TIMEOUT * WORKER_JOB_ATTEMPTS
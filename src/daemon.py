@@ -0,0 +1,460 @@
+import argparse
+import base64
+import io
+import json
+import multiprocessing
+import queue
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlsplit
+
+from PIL import Image
+
+from src.constant import (
+    CASCADE_ESCALATIONS,
+    DAEMON_BATCH_MAX_IMAGES,
+    DAEMON_BATCH_WINDOW,
+    DAEMON_BUSY_ERROR,
+    DAEMON_HEALTH_FAILED,
+    DAEMON_HEALTH_LOADING,
+    DAEMON_HEALTH_OK,
+    DAEMON_HOST,
+    DAEMON_MAX_BODY,
+    DAEMON_MAX_QUEUE,
+    DAEMON_PORT,
+    OCR_BACKEND,
+    OCR_BACKENDS,
+    SHARED_MODEL_BACKENDS,
+    WORKER_STATE_FAILED,
+    WORKER_STATE_READY,
+)
+from src.micro_batch import MicroBatcher
+from src.ocr_backend import backend_config_error
+from src.recognition import (
+    RecognitionOptions,
+    preload_models,
+    recheck_process,
+    recognition_process,
+    regions_recognition_process,
+)
+from src.shared_image import SharedImage, release_shared_image, share_image
+from src.tuning import plan_workers, startup_tuning
+from src.worker_memory import rss_budget
+from src.worker_supervisor import WorkerPool
+
+
+class RequestError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def decode_image(data: bytes) -> Image.Image:
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+        return image
+    except Exception as e:
+        raise RequestError(400, f"无法解码图片: {e}") from e
+
+
+def parse_options(values: dict[str, Any]) -> RecognitionOptions:
+    cascade = values.get("cascade")
+    if cascade is not None and cascade not in CASCADE_ESCALATIONS:
+        raise RequestError(400, f"未知的级联方式: {cascade}")
+    return RecognitionOptions(
+        fast_path=bool(values.get("fast_path", False)),
+        adaptive_det=bool(values.get("adaptive_det", True)),
+        cascade=cascade,
+        auto_trim=bool(values.get("auto_trim", True)),
+        table=bool(values.get("table", False)),
+    )
+
+
+def query_options(query: str) -> RecognitionOptions:
+    # 原始图片请求用查询参数传递选项：?fast=1&adaptive=0&trim=0&table=1&cascade=boxes
+    params = {key: values[-1] for key, values in parse_qs(query).items()}
+    return parse_options(
+        {
+            "fast_path": params.get("fast") == "1",
+            "adaptive_det": params.get("adaptive", "1") == "1",
+            "auto_trim": params.get("trim", "1") == "1",
+            "table": params.get("table") == "1",
+            "cascade": params.get("cascade"),
+        }
+    )
+
+
+class DaemonStats:
+    """
+    守护进程的并发限制和运行状态；识别进程的状态来自 init_worker 上报的状态队列
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_queue: int,
+        backend: str,
+        shared_models: bool = False,
+        rss_budget: int | None = None,
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.backend = backend
+        self.shared_models = shared_models
+        self.rss_budget = rss_budget
+        self.slots = threading.BoundedSemaphore(workers + max_queue)
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.in_flight = 0
+        self.served = 0
+        self.failed = 0
+        self.rejected = 0
+        self.ready_workers = 0
+        self.failed_workers = 0
+        self.last_error = ""
+        # 各识别进程最近一次任务结束时的常驻内存，以及因超出内存预算而重启过的进程
+        self.worker_rss: dict[int, int] = {}
+        self.recycled_pids: set[int] = set()
+
+    def update_worker_state(self, state: str, error: str):
+        with self.lock:
+            if state == WORKER_STATE_READY:
+                # 重启的识别进程会再次报告就绪
+                self.ready_workers = min(self.ready_workers + 1, self.workers)
+            elif state == WORKER_STATE_FAILED:
+                self.failed_workers += 1
+                self.last_error = error
+
+    def record_worker(self, trace: dict[str, Any] | None):
+        if not trace or trace.get("rss") is None:
+            return
+        with self.lock:
+            if trace["recycled"]:
+                self.worker_rss.pop(trace["pid"], None)
+                self.recycled_pids.add(trace["pid"])
+            else:
+                self.worker_rss[trace["pid"]] = trace["rss"]
+
+    def health(self) -> str:
+        with self.lock:
+            if self.ready_workers:
+                return DAEMON_HEALTH_OK
+            if self.failed_workers >= self.workers:
+                return DAEMON_HEALTH_FAILED
+            return DAEMON_HEALTH_LOADING
+
+    def snapshot(self) -> dict[str, Any]:
+        health = self.health()
+        with self.lock:
+            return {
+                "status": health,
+                "backend": self.backend,
+                "workers": self.workers,
+                "ready_workers": self.ready_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self.in_flight,
+                "served": self.served,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "shared_models": self.shared_models,
+                "rss_budget": self.rss_budget,
+                "worker_rss": {str(pid): rss for pid, rss in self.worker_rss.items()},
+                "recycled_workers": len(self.recycled_pids),
+                "uptime": time.time() - self.started,
+                "error": self.last_error,
+            }
+
+
+class RecognitionDaemon(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        pool: WorkerPool,
+        stats: DaemonStats,
+        batcher: MicroBatcher | None = None,
+    ):
+        super().__init__(address, DaemonRequestHandler)
+        self.pool = pool
+        self.stats = stats
+        self.batcher = batcher
+
+    def run_task(
+        self, task: Callable[..., dict[str, Any]], args: tuple[Any, ...]
+    ) -> dict[str, Any]:
+        result = self.apply(task, args)
+        self.stats.record_worker(result.get("trace"))
+        return result
+
+    def apply(
+        self, task: Callable[..., dict[str, Any]], args: tuple[Any, ...]
+    ) -> dict[str, Any]:
+        # 复核请求本来就很少，不参与合并
+        if self.batcher is None or task is recheck_process:
+            return self.pool.apply(task, args)
+        if task is recognition_process:
+            image, options = args
+            result = self.batcher.recognize([image], options)
+            if not result["success"]:
+                return result
+            (region,) = result["regions"]
+            return {
+                "success": True,
+                **region,
+                "elapsed_time": result["elapsed_time"],
+                "trace": result["trace"],
+                "batched_requests": result["batched_requests"],
+            }
+        images, options = args
+        return self.batcher.recognize(images, options)
+
+
+class DaemonRequestHandler(BaseHTTPRequestHandler):
+    server: RecognitionDaemon  # pyright: ignore[reportIncompatibleVariableOverride]
+
+    def send_json(self, status: int, body: dict[str, Any]):
+        data = json.dumps(body, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/health":
+            health = self.server.stats.health()
+            self.send_json(200 if health == DAEMON_HEALTH_OK else 503, {"status": health})
+        elif path == "/status":
+            self.send_json(200, self.server.stats.snapshot())
+        else:
+            self.send_json(404, {"success": False, "error": "未知的接口"})
+
+    def read_body(self) -> bytes:
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        # 负数长度会让 read 一直读到客户端关闭连接
+        if length < 0:
+            raise RequestError(400, "Content-Length 无效")
+        if length > DAEMON_MAX_BODY:
+            raise RequestError(413, "请求体过大")
+        return self.rfile.read(length)
+
+    def read_json(self) -> dict[str, Any]:
+        try:
+            body = json.loads(self.read_body())
+        except ValueError as e:
+            raise RequestError(400, f"无法解析JSON: {e}") from e
+        if not isinstance(body, dict):
+            raise RequestError(400, "请求体必须是JSON对象")
+        return body
+
+    def share_body_images(
+        self, body: dict[str, Any], shms: list[SharedMemory]
+    ) -> list[SharedImage]:
+        encoded = body.get("images", [])
+        if not isinstance(encoded, list) or not all(
+            isinstance(data, str) for data in encoded
+        ):
+            raise RequestError(400, "images 必须是base64字符串列表")
+        return self.share_images(encoded, shms)
+
+    def share_images(
+        self, encoded: list[str], shms: list[SharedMemory]
+    ) -> list[SharedImage]:
+        handles: list[SharedImage] = []
+        for data in encoded:
+            try:
+                image_bytes = base64.b64decode(data, validate=True)
+            except (TypeError, ValueError) as e:
+                raise RequestError(400, f"图片不是有效的base64: {e}") from e
+            shm, handle = share_image(decode_image(image_bytes))
+            shms.append(shm)
+            handles.append(handle)
+        return handles
+
+    def build_task(
+        self, path: str, query: str, shms: list[SharedMemory]
+    ) -> tuple[Callable[..., dict[str, Any]], tuple[Any, ...]]:
+        if path == "/recognize":
+            # 请求体就是图片文件本身，方便用 curl --data-binary 调用
+            shm, handle = share_image(decode_image(self.read_body()))
+            shms.append(shm)
+            return recognition_process, (handle, query_options(query))
+        if path == "/regions":
+            body = self.read_json()
+            values = body.get("options", {})
+            if not isinstance(values, dict):
+                raise RequestError(400, "options 必须是JSON对象")
+            options = parse_options(values)
+            return regions_recognition_process, (
+                self.share_body_images(body, shms),
+                options,
+            )
+        if path == "/recheck":
+            body = self.read_json()
+            return recheck_process, (self.share_body_images(body, shms),)
+        raise RequestError(404, "未知的接口")
+
+    def do_POST(self):
+        stats = self.server.stats
+        start_time = time.perf_counter()
+        if not stats.slots.acquire(blocking=False):
+            with stats.lock:
+                stats.rejected += 1
+            self.send_json(503, {"success": False, "error": DAEMON_BUSY_ERROR})
+            return
+        shms: list[SharedMemory] = []
+        with stats.lock:
+            stats.in_flight += 1
+        try:
+            url = urlsplit(self.path)
+            task, args = self.build_task(url.path, url.query, shms)
+            result = self.server.run_task(task, args)
+            status = 200
+        except RequestError as e:
+            result, status = {"success": False, "error": str(e)}, e.status
+        except Exception as e:
+            result, status = {"success": False, "error": str(e)}, 500
+        finally:
+            for shm in shms:
+                release_shared_image(shm)
+            with stats.lock:
+                stats.in_flight -= 1
+            stats.slots.release()
+        with stats.lock:
+            if result["success"]:
+                stats.served += 1
+            else:
+                stats.failed += 1
+        self.send_json(
+            status, {**result, "daemon_time": time.perf_counter() - start_time}
+        )
+
+
+def watch_worker_states(status_queue: Any, stats: DaemonStats):
+    while True:
+        try:
+            state, _, error = status_queue.get(timeout=1)
+        except queue.Empty:
+            continue
+        except (EOFError, OSError):
+            return
+        stats.update_worker_state(state, error)
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="SnapSum4J daemon",
+        description="启动本机识别服务，多个界面或脚本通过HTTP共用一份已加载的模型",
+    )
+    parser.add_argument("--host", default=DAEMON_HOST)
+    parser.add_argument("--port", type=int, default=DAEMON_PORT)
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        help="识别进程数，即同时识别的请求数（默认：按物理核心数、校准的线程数和可用内存计算）",
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=DAEMON_MAX_QUEUE,
+        help=f"识别中的请求之外最多排队的请求数，超过时返回503（默认：{DAEMON_MAX_QUEUE}）",
+    )
+    parser.add_argument(
+        "--batch-window",
+        type=float,
+        default=DAEMON_BATCH_WINDOW * 1000,
+        help="合并同选项请求的等待时间（毫秒），为0时每个请求单独识别"
+        f"（默认：{DAEMON_BATCH_WINDOW * 1000:g}）",
+    )
+    parser.add_argument(
+        "--batch-max-images",
+        type=int,
+        default=DAEMON_BATCH_MAX_IMAGES,
+        help=f"一次合并识别的最多图片数，凑满时不再等待（默认：{DAEMON_BATCH_MAX_IMAGES}）",
+    )
+    parser.add_argument(
+        "--share-models",
+        action="store_true",
+        help="在主进程中加载一次模型，识别进程以 fork 方式启动并与主进程写时复制共享模型权重"
+        "（仅 Linux/macOS 的 Paddle 引擎）",
+    )
+    parser.add_argument(
+        "--rss-budget",
+        type=int,
+        help="识别进程的常驻内存上限（MB），超过后在完成当前请求时重启该进程，0 表示不限制"
+        "（默认：预估占用的2倍）",
+    )
+    parser.add_argument("--backend", choices=OCR_BACKENDS, default=OCR_BACKEND)
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers 必须大于0")
+    if args.max_queue < 0:
+        parser.error("--max-queue 不能小于0")
+    if args.batch_window < 0:
+        parser.error("--batch-window 不能小于0")
+    if args.batch_max_images < 1:
+        parser.error("--batch-max-images 必须大于0")
+    if args.rss_budget is not None and args.rss_budget < 0:
+        parser.error("--rss-budget 不能小于0")
+    if args.share_models and args.backend not in SHARED_MODEL_BACKENDS:
+        parser.error(f"{args.backend} 引擎不支持 --share-models")
+    if args.share_models and "fork" not in multiprocessing.get_all_start_methods():
+        parser.error("当前系统不支持 fork，无法使用 --share-models")
+    if error := backend_config_error(args.backend):
+        parser.error(error)
+    return args
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    tuning = startup_tuning(args.backend)
+    workers = args.workers or plan_workers(
+        args.backend, tuning.cpu_threads if tuning else None, args.share_models
+    )
+    budget = rss_budget(args.backend, args.rss_budget)
+    stats = DaemonStats(
+        workers, args.max_queue, args.backend, args.share_models, budget
+    )
+    context = multiprocessing.get_context("fork" if args.share_models else None)
+    if args.share_models:
+        try:
+            preload_models(args.backend, tuning)
+        except Exception as e:
+            print(f"Error loading shared OCR models: {e}", file=sys.stderr)
+            return 1
+    status_queue = context.Queue()
+    with WorkerPool(
+        workers, (status_queue, None, args.backend, tuning, False), context, budget
+    ) as pool:
+        threading.Thread(
+            target=watch_worker_states, args=(status_queue, stats), daemon=True
+        ).start()
+        batcher = None
+        if args.batch_window > 0:
+            batcher = MicroBatcher(
+                pool, args.batch_window / 1000, args.batch_max_images
+            )
+        server = RecognitionDaemon((args.host, args.port), pool, stats, batcher)
+        print(
+            f"SnapSum4J daemon listening on http://{args.host}:{server.server_port} "
+            f"({workers} workers)",
+            file=sys.stderr,
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+    return 0
@@ -0,0 +1,175 @@
+import base64
+import io
+import json
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Any, Callable
+
+import numpy as np
+from PIL import Image
+
+from src.constant import (
+    DAEMON_HEALTH_FAILED,
+    DAEMON_HEALTH_OK,
+    DAEMON_HEALTH_POLL_INTERVAL,
+    DAEMON_REQUEST_TIMEOUT,
+    WORKER_STATE_FAILED,
+    WORKER_STATE_LOADING,
+    WORKER_STATE_READY,
+)
+from src.recognition import (
+    RecognitionOptions,
+    recheck_process,
+    recognition_process,
+    regions_recognition_process,
+)
+from src.shared_image import SharedImage, load_shared_image
+
+
+def encode_image(image: str | SharedImage) -> bytes:
+    if isinstance(image, str):
+        with open(image, "rb") as f:
+            return f.read()
+    array: np.ndarray = load_shared_image(image)
+    buffer = io.BytesIO()
+    # 本机传输，压缩级别低一些换取更快的编码
+    Image.fromarray(np.ascontiguousarray(array[:, :, ::-1])).save(
+        buffer, "PNG", compress_level=1
+    )
+    return buffer.getvalue()
+
+
+def options_query(options: RecognitionOptions) -> str:
+    params = {
+        "fast": int(options.fast_path),
+        "adaptive": int(options.adaptive_det),
+        "trim": int(options.auto_trim),
+        "table": int(options.table),
+    }
+    if options.cascade:
+        params["cascade"] = options.cascade  # pyright: ignore[reportArgumentType]
+    return urllib.parse.urlencode(params)
+
+
+class DaemonClient:
+    """
+    识别守护进程的客户端。apply_async 与进程池的同名方法一致，界面可以直接交给 JobScheduler 使用；
+    取消任务时守护进程仍会算完，结果由调度器丢弃
+    """
+
+    def __init__(self, url: str, status_queue: Any = None):
+        self.url = url.rstrip("/")
+        if status_queue is not None:
+            threading.Thread(
+                target=self.report_health, args=(status_queue,), daemon=True
+            ).start()
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: bytes | None = None,
+        content_type: str = "application/json",
+    ) -> dict[str, Any]:
+        request = urllib.request.Request(
+            self.url + path,
+            data=body,
+            method=method,
+            headers={"Content-Type": content_type},
+        )
+        try:
+            with urllib.request.urlopen(
+                request, timeout=DAEMON_REQUEST_TIMEOUT
+            ) as response:
+                return json.load(response)
+        except urllib.error.HTTPError as e:
+            # 守护进程的错误响应也是 JSON（如 503 繁忙）
+            with e:
+                return json.load(e)
+
+    def health(self) -> dict[str, Any]:
+        return self.request("GET", "/health")
+
+    def status(self) -> dict[str, Any]:
+        return self.request("GET", "/status")
+
+    def recognize(
+        self, image: bytes, options: RecognitionOptions | None = None
+    ) -> dict[str, Any]:
+        query = options_query(options or RecognitionOptions())
+        return self.request(
+            "POST", f"/recognize?{query}", image, "application/octet-stream"
+        )
+
+    def recognize_regions(
+        self, images: list[bytes], options: RecognitionOptions | None = None
+    ) -> dict[str, Any]:
+        options = options or RecognitionOptions()
+        body = {
+            "images": [base64.b64encode(image).decode() for image in images],
+            "options": {
+                "fast_path": options.fast_path,
+                "adaptive_det": options.adaptive_det,
+                "auto_trim": options.auto_trim,
+                "table": options.table,
+                "cascade": options.cascade,
+            },
+        }
+        return self.request("POST", "/regions", json.dumps(body).encode())
+
+    def recheck(self, images: list[bytes]) -> dict[str, Any]:
+        body = {"images": [base64.b64encode(image).decode() for image in images]}
+        return self.request("POST", "/recheck", json.dumps(body).encode())
+
+    def run_task(
+        self, task: Callable[..., dict[str, Any]], args: tuple[Any, ...]
+    ) -> dict[str, Any]:
+        # 把进程池任务转成对应的HTTP请求，共享内存中的图片在本进程编码后发送
+        if task is recognition_process:
+            image, *rest = args
+            return self.recognize(encode_image(image), *rest)
+        if task is regions_recognition_process:
+            images, *rest = args
+            return self.recognize_regions([encode_image(i) for i in images], *rest)
+        if task is recheck_process:
+            (images,) = args
+            return self.recheck([encode_image(image) for image in images])
+        raise ValueError(f"守护进程不支持的任务: {task.__name__}")
+
+    def apply_async(
+        self,
+        task: Callable[..., dict[str, Any]],
+        args: tuple[Any, ...],
+        callback: Callable[[dict[str, Any]], None],
+        error_callback: Callable[[BaseException], None],
+    ):
+        def run():
+            try:
+                result = self.run_task(task, args)
+            except Exception as e:
+                error_callback(e)
+                return
+            callback(result)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def report_health(self, status_queue: Any):
+        # 按界面识别进程的状态格式上报，守护进程的模型就绪后界面才显示“模型已就绪”
+        status_queue.put((WORKER_STATE_LOADING, 0.0, ""))
+        start_time = time.time()
+        while True:
+            try:
+                health = self.health()["status"]
+            except Exception as e:
+                status_queue.put((WORKER_STATE_FAILED, 0.0, str(e)))
+                return
+            if health == DAEMON_HEALTH_OK:
+                status_queue.put((WORKER_STATE_READY, time.time() - start_time, ""))
+                return
+            if health == DAEMON_HEALTH_FAILED:
+                status_queue.put((WORKER_STATE_FAILED, 0.0, self.status()["error"]))
+                return
+            time.sleep(DAEMON_HEALTH_POLL_INTERVAL)
@@ -0,0 +1,91 @@
+import tkinter as tk
+from decimal import Decimal, InvalidOperation
+from tkinter.scrolledtext import ScrolledText
+from typing import Any, Callable
+
+
+def parse_number(line: str) -> Decimal | None:
+    try:
+        number = Decimal(line.strip())
+    except InvalidOperation:
+        # 跳过非数字行
+        return None
+    return number if number.is_finite() else None
+
+
+class LineTotals:
+    """
+    按行保存解析后的数字，编辑时只重新解析被修改的行并增量更新总和
+    """
+
+    def __init__(self):
+        self.values: list[Decimal | None] = [None]
+        self.total = Decimal(0)
+
+    def replace(self, first: int, count: int, lines: list[str]):
+        added = [parse_number(line) for line in lines]
+        removed = self.values[first : first + count]
+        self.total += sum((value for value in added if value is not None), Decimal(0))
+        self.total -= sum((value for value in removed if value is not None), Decimal(0))
+        self.values[first : first + count] = added
+
+
+class DigitsText(ScrolledText):
+    def __init__(
+        self,
+        parent: tk.Misc,
+        on_total_changed: Callable[[Decimal], None],
+        **kwargs: Any,
+    ):
+        super().__init__(parent, **kwargs)
+        self.line_totals = LineTotals()
+        self.on_total_changed = on_total_changed
+        # 用代理命令替换 Tk 文本控件命令，拦截包括键盘编辑和粘贴在内的所有 insert/delete/replace
+        self.widget_command = f"{self._w}_widget"
+        self.tk.call("rename", self._w, self.widget_command)
+        self.tk.createcommand(self._w, self.proxy)
+
+    def line_of(self, index: str) -> int:
+        # "end" 在最后一个换行符之后，插入和删除实际发生在它前面的最后一行上
+        position = str(self.tk.call(self.widget_command, "index", index))
+        return min(int(position.split(".")[0]), self.line_count())
+
+    def line_count(self) -> int:
+        position = str(self.tk.call(self.widget_command, "index", "end -1c"))
+        return int(position.split(".")[0])
+
+    def proxy(self, command: str, *args: Any) -> Any:
+        if command not in ("insert", "delete", "replace"):
+            return self.tk.call(self.widget_command, command, *args)
+
+        if command == "insert":
+            indexes = [args[0]]
+        elif command == "delete":
+            # delete 可以带多个区间，只有一个下标时删除该字符（可能是换行符）
+            indexes = [*args]
+            if len(args) % 2 == 1:
+                indexes.append(f"{args[-1]} +1c")
+        else:
+            indexes = [args[0], args[1]]
+        # 多个区间时重新解析覆盖全部区间的连续行，区间之间未修改的行解析结果不变
+        lines = [self.line_of(str(index)) for index in indexes]
+        first, last = min(lines), max(lines)
+        line_count = self.line_count()
+
+        result = self.tk.call(self.widget_command, command, *args)
+
+        new_last = last + self.line_count() - line_count
+        text = str(
+            self.tk.call(self.widget_command, "get", f"{first}.0", f"{new_last}.end")
+        )
+        self.line_totals.replace(
+            first - 1, last - first + 1, text.split("\n")[: new_last - first + 1]
+        )
+        self.on_total_changed(self.line_totals.total)
+        return result
+
+    def set_lines(self, lines: list[str]):
+        # 一次性写入全部结果，避免逐行 insert 阻塞界面
+        self.delete(1.0, tk.END)
+        if lines:
+            self.insert(tk.END, "\n".join(lines) + "\n")
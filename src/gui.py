@@ -1,25 +1,54 @@
 import multiprocessing
 import os
+import queue
+import sys
 import time
 import tkinter as tk
-from multiprocessing.pool import Pool
+from decimal import Decimal
+from multiprocessing.shared_memory import SharedMemory
 from tkinter import messagebox
-from tkinter.scrolledtext import ScrolledText
-from typing import Any
+from typing import Any, Callable
 
 from PIL import Image
 
 from src.capture_window import CaptureScreen
-from src.constant import DET_MODEL_PATH, REC_MODEL_PATH, TEMP_FILE_NAME
-from src.gui_constant import (APP_TITLE, DELETE_TEMP_FILE_FAIL, DIGITS_DESC,
-                              DIGITS_DESC_PADY, DIGITS_PADY, DIGITS_TEXT_FONT,
-                              DIGITS_TEXT_HEIGHT, DIGITS_TEXT_PADX,
-                              DIGITS_TEXT_WIDTH, ERROR_IMAGE_NOT_FOUND,
-                              ERROR_NO_IMAGE_SELECTED, ERROR_TITLE,
-                              FAIL_RESULT_LABEL_COLOR, FAIL_RESULT_LABEL_TEXT,
-                              HEAD, HEADER_FONT, MAIN_FROM_PADX,
-                              MAIN_FROM_PADY, STATUS_LABEL_FONT,
-                              STATUS_LABEL_PADY, STATUS_RECOGNIZING_COLOR,
+from src.constant import (CASCADE_ESCALATION, DAEMON_URL, JOB_KIND_PAGES,
+                          JOB_KIND_RECHECK, JOB_KIND_RECOGNIZE, JOB_KIND_WATCH,
+                          JOB_PRIORITY_BACKGROUND, JOB_PRIORITY_INTERACTIVE,
+                          LOW_CONFIDENCE_THRESHOLD, OCR_BACKEND,
+                          RECHECK_PADDING, TRACE_FILE, TRACE_STAGE_DECODE,
+                          TRACE_STAGE_SHARE, TRACE_STAGE_UI, WATCH_INTERVAL,
+                          WATCH_MAX_INTERVAL, WATCH_MIN_INTERVAL,
+                          WORKER_STANDBY, WORKER_STATE_FAILED,
+                          WORKER_STATE_READY, WORKER_STATE_RESTARTING,
+                          WORKER_STATE_TUNING, WORKER_STATE_WARMING)
+from src.daemon_client import DaemonClient
+from src.digits_text import DigitsText
+from src.gui_constant import (APP_TITLE, CANCEL_BUTTON_PADY,
+                              CANCEL_BUTTON_TEXT, CANCEL_NONE_TEXT,
+                              CASCADE_PADY, CASCADE_TEXT, COLUMN_SUBTOTAL_TEXT,
+                              DIGITS_DESC, DIGITS_DESC_PADY, DIGITS_PADY,
+                              DIGITS_TEXT_FONT, DIGITS_TEXT_HEIGHT,
+                              DIGITS_TEXT_PADX, DIGITS_TEXT_WIDTH,
+                              ERROR_IMAGE_NOT_FOUND, ERROR_NO_IMAGE_SELECTED,
+                              ERROR_TITLE, FAIL_RESULT_LABEL_COLOR,
+                              FAIL_RESULT_LABEL_TEXT, FAST_PATH_PADY,
+                              FAST_PATH_TEXT, FREEZE_PADY, FREEZE_TEXT, HEAD,
+                              HEADER_FONT, LOW_CONFIDENCE_BACKGROUND,
+                              LOW_CONFIDENCE_TAG, MAIN_FROM_PADX,
+                              MAIN_FROM_PADY, MODEL_FAILED_TEXT,
+                              MODEL_LOADING_TEXT, MODEL_READY_TEXT,
+                              MODEL_STATUS_COLOR, MODEL_TUNING_TEXT,
+                              MODEL_WARMING_TEXT, PAGE_DONE_TEXT,
+                              PAGE_FAILED_LINE_TEXT, PAGE_POLL_INTERVAL,
+                              PAGE_SUBTOTAL_TEXT, PAGES_CONFIRM_MESSAGE,
+                              PAGES_CONFIRM_TITLE, PAGES_DONE_TEXT,
+                              PAGES_FAILED_TEXT, RECHECK_BUTTON_PADY,
+                              RECHECK_BUTTON_TEXT, RECHECK_DONE_TEXT,
+                              RECHECK_NONE_TEXT, REGION_SUBTOTAL_TEXT,
+                              SCREEN_FREEZE_DELAY, STATUS_LABEL_FONT,
+                              STATUS_LABEL_PADY, STATUS_QUEUED_TEXT,
+                              STATUS_RECOGNIZING_COLOR,
                               STATUS_RECOGNIZING_TEXT,
                               SUCCESS_RESULT_LABEL_COLOR,
                               SUCCESS_RESULT_LABEL_TEXT, SUM_LABEL_FONT,
@@ -27,79 +56,35 @@ from src.gui_constant import (APP_TITLE, DELETE_TEMP_FILE_FAIL, DIGITS_DESC,
                               SUM_PADY, SUM_RESULT_ENTRY_PADX, SUM_RESULT_FONT,
                               SUM_RESULT_WIDTH, SUM_STATUS_FAIL_COLOR,
                               SUM_STATUS_FAIL_TEXT, SUM_STATUS_SUCCESS_COLOR,
-                              SUM_STATUS_SUCCESS_TEXT, TITLE_LABEL_PADY,
-                              TOPMOST_PADY, WINDOW_HEIGHT, WINDOW_WIDTH)
+                              SUM_STATUS_SUCCESS_TEXT, TABLE_COLUMN_PADX,
+                              TABLE_COLUMN_TEXT, TABLE_COLUMNS_TEXT,
+                              TABLE_PADY, TABLE_REGION_COLUMN_TEXT, TABLE_TEXT,
+                              TITLE_LABEL_PADY, TOPMOST_PADY,
+                              TRACE_CHILDREN_SEPARATOR, TRACE_CHILDREN_TEXT,
+                              TRACE_PADY, TRACE_SEPARATOR, TRACE_STAGE_LABELS,
+                              TRACE_STAGE_TEXT, TRACE_TEXT, WATCH_FAILED_TEXT,
+                              WATCH_FRAME_PADY, WATCH_INTERVAL_INCREMENT,
+                              WATCH_INTERVAL_LABEL_TEXT, WATCH_INTERVAL_WIDTH,
+                              WATCH_START_TEXT, WATCH_STARTED_TEXT,
+                              WATCH_STOP_TEXT, WATCH_STOPPED_TEXT,
+                              WATCH_UPDATED_TEXT, WATCH_WIDGET_PADX,
+                              WINDOW_HEIGHT, WINDOW_WIDTH,
+                              WORKER_RESTARTING_TEXT,
+                              WORKER_STATUS_POLL_INTERVAL)
+from src.job_scheduler import JobScheduler
+from src.page_stream import PageStream, page_count
 from src.preview_window import PreviewWindow
+from src.recognition import (RecognitionOptions, cascade_unavailable_warning,
+                             is_number, recheck_process, recognition_process,
+                             regions_recognition_process)
+from src.screen_grab import screen_grabber
+from src.screen_watch import ScreenWatcher
+from src.shared_image import SharedImage, release_shared_image, share_image
 from src.topmost import TopmostButton
+from src.tracing import RequestTrace, TraceLog
 from src.upload import UploadFrame
-from src.utils import calculate_scaled_size
-
-# 全局变量，用于存储OCR实例（在子进程中初始化）
-global_ocr = None
-
-
-# 进程池初始化函数，确保每个子进程只加载一次模型
-def init_worker():
-    global global_ocr
-    if global_ocr is None:
-        from paddleocr import PaddleOCR
-
-        from .utils import \
-            get_resource_path  # pyright: ignore[reportUnknownVariableType]
-
-        global_ocr = PaddleOCR(
-            use_doc_orientation_classify=False,
-            use_doc_unwarping=False,
-            use_textline_orientation=False,
-            text_detection_model_dir=get_resource_path(DET_MODEL_PATH),
-            text_recognition_model_dir=get_resource_path(REC_MODEL_PATH),
-        )
-
-
-def recognition_process(image_path: str) -> dict[str, bool | float | int | list[Any]]:
-    try:
-        start_time = time.time()
-
-        global global_ocr
-        if global_ocr is None:
-            init_worker()
-        assert global_ocr is not None
-        result: list[Any] = (  # pyright: ignore[reportUnknownVariableType]
-            global_ocr.predict(  # pyright: ignore[reportUnknownMemberType, reportUnknownVariableType]
-                input=image_path
-            )
-        )
-
-        all_numbers: list[str] = []
-        if result:
-            rec_texts: list[str] = []
-            for res in result:
-                try:
-                    if hasattr(res, "rec_texts"):
-                        rec_texts.extend(
-                            res.rec_texts
-                        )  # pyright: ignore[reportUnknownMemberType]
-                    elif isinstance(res, dict) and "rec_texts" in res:
-                        rec_texts.extend(
-                            res[
-                                "rec_texts"
-                            ]  # pyright: ignore[reportUnknownMemberType, reportUnknownArgumentType]
-                        )
-                except Exception as e:
-                    print(f"Error accessing rec_texts: {e}")
-            for text in rec_texts:
-                if text.replace(".", "", 1).isdigit():
-                    all_numbers.append(text)
-        total_sum = sum(float(num) for num in all_numbers)
-        elapsed_time = time.time() - start_time
-        return {
-            "success": True,
-            "numbers": all_numbers,
-            "total": total_sum,
-            "elapsed_time": elapsed_time,
-        }
-    except Exception as e:
-        return {"success": False, "error": str(e)}  # pyright: ignore[reportReturnType]
+from src.utils import Box, RecItem
+from src.worker_supervisor import WorkerSupervisor
 
 
 class DigitRecognitionApp:
@@ -109,9 +94,21 @@ class DigitRecognitionApp:
         self.init_attributes()
         self.init_layout()
 
-        self.process_pool: Pool = multiprocessing.Pool(
-            processes=1, initializer=init_worker
-        )
+        self.worker_status_queue = multiprocessing.Queue()
+        self.cancel_event = multiprocessing.Event()
+        self.process_pool: WorkerSupervisor | DaemonClient
+        if DAEMON_URL:
+            # 连接已运行的识别守护进程，多个界面共用一份已预热的模型
+            self.process_pool = DaemonClient(DAEMON_URL, self.worker_status_queue)
+        else:
+            # 调度器同时只运行一个识别任务，多开进程只会多占一份模型内存；
+            # 单个进程按本机校准的线程数使用多核，批量识别才按核心数和内存开多个进程。
+            # 识别进程崩溃或超时时由监管线程重启并重试，界面不会一直停在“正在识别”
+            self.process_pool = WorkerSupervisor(
+                self.worker_status_queue, self.cancel_event, WORKER_STANDBY
+            )
+        self.scheduler = JobScheduler(self.process_pool, self.cancel_event)
+        self.poll_worker_status()
 
     def init_window(self):
         self.root.title(APP_TITLE)
@@ -122,8 +119,29 @@ class DigitRecognitionApp:
         self.image_path_var = tk.StringVar()
         self.sum_result_var = tk.StringVar()
         self.topmost_var = tk.BooleanVar(value=False)
+        self.fast_path_var = tk.BooleanVar(value=False)
+        self.cascade_var = tk.BooleanVar(value=False)
+        self.table_var = tk.BooleanVar(value=False)
+        # 表格模式最近一次的识别结果和每个区域各列是否参与求和，切换列时不重新识别
+        self.table_result: dict[str, Any] | None = None
+        self.column_vars: list[list[tk.BooleanVar]] = []
+        self.trace_var = tk.BooleanVar(value=False)
+        self.freeze_var = tk.BooleanVar(value=False)
+        self.trace_log = TraceLog(TRACE_FILE)
         self.status_var = tk.StringVar()
         self.photo = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.model_ready = False
+        self.model_load_time = 0.0
+        # 低置信度数字：(行标记, 区域序号, 文本, 置信度, 框)
+        self.low_confidence_entries: list[tuple[str, int, str, float, list[int]]] = []
+        self.last_sources: list[Image.Image | str] = []
+        self.watch_interval_var = tk.IntVar(value=WATCH_INTERVAL)
+        self.screen_watcher: ScreenWatcher | None = None
+        self.page_stream: PageStream | None = None
+        # 多页文档已完成页面的小计，识别失败的页面记为 None
+        self.page_totals: list[float | None] = []
 
     def init_layout(self):
         self.main_frame = tk.Frame(self.root, padx=MAIN_FROM_PADX, pady=MAIN_FROM_PADY)
@@ -133,6 +151,14 @@ class DigitRecognitionApp:
         self.init_digits()
         self.init_sum()
         self.init_topmost()
+        self.init_fast_path()
+        self.init_cascade()
+        self.init_table()
+        self.init_trace()
+        self.init_freeze()
+        self.init_recheck()
+        self.init_cancel()
+        self.init_watch()
         self.init_status()
 
     def init_title(self):
@@ -154,13 +180,17 @@ class DigitRecognitionApp:
         digit_frame.pack(fill=tk.BOTH, expand=True, pady=DIGITS_PADY)
         desc_label = tk.Label(digit_frame, text=DIGITS_DESC)
         desc_label.pack(anchor=tk.W, pady=DIGITS_DESC_PADY)
-        self.digits_text = ScrolledText(
+        self.digits_text = DigitsText(
             digit_frame,
+            self.on_total_changed,
             height=DIGITS_TEXT_HEIGHT,
             width=DIGITS_TEXT_WIDTH,
             font=DIGITS_TEXT_FONT,
         )
         self.digits_text.pack(fill=tk.BOTH, expand=True, padx=DIGITS_TEXT_PADX)
+        self.digits_text.tag_configure(
+            LOW_CONFIDENCE_TAG, background=LOW_CONFIDENCE_BACKGROUND
+        )
         self.digits_text.bind("<KeyRelease>", self.on_digits_modified)
 
     def init_sum(self):
@@ -188,6 +218,83 @@ class DigitRecognitionApp:
         )
         topmost_button.pack(anchor=tk.W, pady=TOPMOST_PADY)
 
+    def init_fast_path(self):
+        fast_path_button = tk.Checkbutton(
+            self.main_frame, text=FAST_PATH_TEXT, variable=self.fast_path_var
+        )
+        fast_path_button.pack(anchor=tk.W, pady=FAST_PATH_PADY)
+
+    def init_cascade(self):
+        cascade_button = tk.Checkbutton(
+            self.main_frame, text=CASCADE_TEXT, variable=self.cascade_var
+        )
+        cascade_button.pack(anchor=tk.W, pady=CASCADE_PADY)
+        # 连接守护进程时由服务端决定，本机没有轻量模型时禁用该选项并说明原因
+        warning = None if DAEMON_URL else cascade_unavailable_warning(OCR_BACKEND)
+        if warning:
+            cascade_button.config(
+                state=tk.DISABLED, text=f"{CASCADE_TEXT}（{warning}）"
+            )
+
+    def init_table(self):
+        table_button = tk.Checkbutton(
+            self.main_frame, text=TABLE_TEXT, variable=self.table_var
+        )
+        table_button.pack(anchor=tk.W, pady=TABLE_PADY)
+        # 表格模式识别完成后在这里列出各列
+        self.column_frame = tk.Frame(self.main_frame)
+        self.column_frame.pack(anchor=tk.W)
+
+    def init_trace(self):
+        trace_button = tk.Checkbutton(
+            self.main_frame, text=TRACE_TEXT, variable=self.trace_var
+        )
+        trace_button.pack(anchor=tk.W, pady=TRACE_PADY)
+
+    def init_freeze(self):
+        freeze_button = tk.Checkbutton(
+            self.main_frame, text=FREEZE_TEXT, variable=self.freeze_var
+        )
+        freeze_button.pack(anchor=tk.W, pady=FREEZE_PADY)
+
+    def recognition_options(self) -> RecognitionOptions:
+        return RecognitionOptions(
+            fast_path=self.fast_path_var.get(),
+            cascade=CASCADE_ESCALATION if self.cascade_var.get() else None,
+            table=self.table_var.get(),
+        )
+
+    def init_recheck(self):
+        recheck_button = tk.Button(
+            self.main_frame, text=RECHECK_BUTTON_TEXT, command=self.recheck_low_confidence
+        )
+        recheck_button.pack(anchor=tk.W, pady=RECHECK_BUTTON_PADY)
+
+    def init_cancel(self):
+        cancel_button = tk.Button(
+            self.main_frame, text=CANCEL_BUTTON_TEXT, command=self.cancel_jobs
+        )
+        cancel_button.pack(anchor=tk.W, pady=CANCEL_BUTTON_PADY)
+
+    def init_watch(self):
+        watch_frame = tk.Frame(self.main_frame)
+        watch_frame.pack(anchor=tk.W, pady=WATCH_FRAME_PADY)
+        self.watch_button = tk.Button(
+            watch_frame, text=WATCH_START_TEXT, command=self.toggle_screen_watch
+        )
+        self.watch_button.pack(side=tk.LEFT, padx=WATCH_WIDGET_PADX)
+        tk.Label(watch_frame, text=WATCH_INTERVAL_LABEL_TEXT).pack(
+            side=tk.LEFT, padx=WATCH_WIDGET_PADX
+        )
+        tk.Spinbox(
+            watch_frame,
+            from_=WATCH_MIN_INTERVAL,
+            to=WATCH_MAX_INTERVAL,
+            increment=WATCH_INTERVAL_INCREMENT,
+            textvariable=self.watch_interval_var,
+            width=WATCH_INTERVAL_WIDTH,
+        ).pack(side=tk.LEFT, padx=WATCH_WIDGET_PADX)
+
     def init_status(self):
         self.status_label = tk.Label(
             self.main_frame,
@@ -198,80 +305,493 @@ class DigitRecognitionApp:
         self.status_label.pack(anchor=tk.W, pady=STATUS_LABEL_PADY)
 
     def preview_and_select_region(self, image_path: str):
+        pages = page_count(image_path)
+        if pages > 1 and messagebox.askyesno(
+            PAGES_CONFIRM_TITLE, PAGES_CONFIRM_MESSAGE.format(pages=pages)
+        ):
+            self.recognize_pages(image_path)
+            return
         image = Image.open(image_path)
-        scaled_size = calculate_scaled_size(image)
         preview_window = PreviewWindow(
             self.root,
-            self.image_path_var,
             self.recognize_digits,
         )
-        preview_window.add_image(image, scaled_size)
+        preview_window.add_image(image)
+
+    def recognize_pages(self, image_path: str):
+        self.stop_page_stream()
+        stream = PageStream(image_path)
+        self.page_stream = stream
+        self.page_totals = []
+        self.clear_column_choices()
+        self.digits_text.set_lines([])
+        self.mark_low_confidence([], [])
+        self.submit_next_page(stream)
+
+    def submit_next_page(self, stream: PageStream):
+        # 已开始其他识别或另一个文档
+        if stream is not self.page_stream:
+            return
+        # 下一页还没解码完成时稍后再取，不在界面线程中等待
+        try:
+            page = stream.poll()
+        except queue.Empty:
+            self.root.after(PAGE_POLL_INTERVAL, self.submit_next_page, stream)
+            return
+        if page is None:
+            self.stop_page_stream()
+            self.status_label.config(fg=SUCCESS_RESULT_LABEL_COLOR)
+            self.status_var.set(
+                PAGES_DONE_TEXT.format(
+                    pages=stream.pages,
+                    total=sum(total for total in self.page_totals if total is not None),
+                    failed=self.page_totals.count(None),
+                )
+            )
+            return
+        if page.handle is None:
+            self.stop_page_stream()
+            self.status_label.config(fg=FAIL_RESULT_LABEL_COLOR)
+            self.status_var.set(PAGES_FAILED_TEXT + page.error)
+            return
+        trace = RequestTrace(JOB_KIND_PAGES)
+        trace.add(TRACE_STAGE_DECODE, page.decode_time)
+
+        def handle_result(result: dict[str, Any]):
+            self.update_ui_after_page(stream, page.index, result)
+
+        self.submit_job(
+            recognition_process,
+            (page.handle, self.recognition_options()),
+            [page.shm] if page.shm is not None else [],
+            handle_result,
+            JOB_KIND_PAGES,
+            trace=trace,
+        )
 
-    def recognize_digits(self):
-        image_path = self.image_path_var.get()
-        if not image_path:
-            messagebox.showerror(ERROR_TITLE, ERROR_NO_IMAGE_SELECTED)
+    def update_ui_after_page(
+        self, stream: PageStream, index: int, result: dict[str, Any]
+    ):
+        # 已开始识别另一个文档
+        if stream is not self.page_stream:
             return
-        if not os.path.exists(image_path):
-            messagebox.showerror(ERROR_TITLE, ERROR_IMAGE_NOT_FOUND)
+        if result.get("cancelled"):
+            self.stop_page_stream()
+            self.update_ui_after_recognition(result)
             return
+        if result["success"]:
+            self.page_totals.append(result["total"])
+            lines = [
+                PAGE_SUBTOTAL_TEXT.format(page=index + 1, total=result["total"]),
+                *result["numbers"],
+            ]
+        else:
+            self.page_totals.append(None)
+            lines = [PAGE_FAILED_LINE_TEXT.format(page=index + 1, error=result["error"])]
+        # 逐页追加，不覆盖已完成页面的结果和用户的修改
+        self.digits_text.insert(tk.END, "\n".join(lines) + "\n")
+        # 最后一页时随后由 submit_next_page 换成全部完成的提示
         self.status_label.config(fg=STATUS_RECOGNIZING_COLOR)
-        self.status_var.set(STATUS_RECOGNIZING_TEXT)
+        self.status_var.set(
+            PAGE_DONE_TEXT.format(
+                page=index + 1,
+                pages=stream.pages,
+                subtotal=result.get("total", 0.0),
+                total=sum(total for total in self.page_totals if total is not None),
+            )
+        )
+        self.submit_next_page(stream)
 
-        def handle_result(result: dict[str, bool | float | int | list[str]]):
-            self.update_ui_after_recognition(result)
+    def stop_page_stream(self):
+        if self.page_stream is not None:
+            self.page_stream.close()
+            self.page_stream = None
+
+    def recognize_digits(
+        self,
+        image: Image.Image | list[Image.Image] | None = None,
+        trace: RequestTrace | None = None,
+    ):
+        # 新的识别结果会替换文本框内容，正在逐页识别的文档不再继续追加
+        self.stop_page_stream()
+        shms: list[SharedMemory] = []
+        sources: list[Image.Image | str]
+        options = self.recognition_options()
+        trace = trace or RequestTrace(JOB_KIND_RECOGNIZE)
+        if image is None:
+            image_path = self.image_path_var.get()
+            if not image_path:
+                messagebox.showerror(ERROR_TITLE, ERROR_NO_IMAGE_SELECTED)
+                return
+            if not os.path.exists(image_path):
+                messagebox.showerror(ERROR_TITLE, ERROR_IMAGE_NOT_FOUND)
+                return
+            sources = [image_path]
+            task, args = recognition_process, (image_path, options)
+        elif isinstance(image, list):
+            # 多个框选区域在一次请求中批量识别
+            sources = [*image]
+            handles: list[SharedImage] = []
+            with trace.stage(TRACE_STAGE_SHARE):
+                for region in image:
+                    shm, handle = share_image(region)
+                    shms.append(shm)
+                    handles.append(handle)
+            task, args = regions_recognition_process, (handles, options)
+        else:
+            sources = [image]
+            with trace.stage(TRACE_STAGE_SHARE):
+                shm, handle = share_image(image)
+            shms.append(shm)
+            task, args = recognition_process, (handle, options)
+
+        def handle_result(result: dict[str, Any]):
+            self.update_ui_after_recognition(result, sources)
+
+        self.submit_job(task, args, shms, handle_result, trace=trace)
+
+    def submit_job(
+        self,
+        task: Callable[..., dict[str, Any]],
+        args: tuple[Any, ...],
+        shms: list[SharedMemory],
+        on_result: Callable[[dict[str, Any]], None],
+        kind: str = JOB_KIND_RECOGNIZE,
+        priority: int = JOB_PRIORITY_INTERACTIVE,
+        trace: RequestTrace | None = None,
+    ):
+        request_trace = trace or RequestTrace(kind)
+
+        def release_shared_images():
+            for shm in shms:
+                release_shared_image(shm)
+
+        def handle_result(result: dict[str, Any]):
+            request_trace.add_worker_trace(result, time.time())
+            with request_trace.stage(TRACE_STAGE_UI):
+                on_result(result)
+            self.trace_log.write(request_trace.to_record(result))
+            if result["success"] and self.trace_var.get():
+                self.status_var.set(
+                    f"{self.status_var.get()}\n"
+                    f"{self.format_trace(request_trace.stages)}"
+                )
 
-        self.process_pool.apply_async(
-            recognition_process, (image_path,), callback=handle_result
+        request_trace.mark_submitted()
+        self.scheduler.submit(
+            task, args, handle_result, release_shared_images, kind, priority
         )
+        self.show_recognizing_status()
+
+    def format_trace(self, stages: dict[str, float]) -> str:
+        # 只展开到子进程内的第一层阶段，更细的阶段只写入追踪文件
+        def format_stage(name: str, elapsed_time: float) -> str:
+            return TRACE_STAGE_TEXT.format(
+                stage=TRACE_STAGE_LABELS.get(name, name), elapsed=elapsed_time * 1000
+            )
+
+        parts: list[str] = []
+        for name, elapsed_time in stages.items():
+            if "." in name:
+                continue
+            text = format_stage(name, elapsed_time)
+            children = [
+                format_stage(child.split(".")[1], child_time)
+                for child, child_time in stages.items()
+                if child.startswith(f"{name}.") and child.count(".") == 1
+            ]
+            if children:
+                text += TRACE_CHILDREN_TEXT.format(
+                    children=TRACE_CHILDREN_SEPARATOR.join(children)
+                )
+            parts.append(text)
+        return TRACE_SEPARATOR.join(parts)
+
+    def cancel_jobs(self):
+        if not self.scheduler.pending():
+            self.status_label.config(fg=SUM_STATUS_SUCCESS_COLOR)
+            self.status_var.set(CANCEL_NONE_TEXT)
+            return
+        self.scheduler.cancel()
+
+    def show_recognizing_status(self):
+        self.status_label.config(fg=STATUS_RECOGNIZING_COLOR)
+        if self.model_ready:
+            self.status_var.set(STATUS_RECOGNIZING_TEXT)
+        else:
+            self.status_var.set(STATUS_QUEUED_TEXT.format(pending=self.scheduler.pending()))
+
+    def poll_worker_status(self):
+        while True:
+            try:
+                state, elapsed_time, error = self.worker_status_queue.get_nowait()
+            except queue.Empty:
+                break
+            self.handle_worker_state(state, elapsed_time, error)
+        self.root.after(WORKER_STATUS_POLL_INTERVAL, self.poll_worker_status)
+
+    def handle_worker_state(self, state: str, elapsed_time: float, error: str):
+        if state == WORKER_STATE_READY:
+            self.model_ready = True
+            if self.scheduler.pending():
+                self.show_recognizing_status()
+                return
+            self.status_label.config(fg=MODEL_STATUS_COLOR)
+            self.status_var.set(
+                MODEL_READY_TEXT.format(
+                    load_time=self.model_load_time, elapsed_time=elapsed_time
+                )
+            )
+            return
+        if state == WORKER_STATE_FAILED:
+            self.status_label.config(fg=FAIL_RESULT_LABEL_COLOR)
+            self.status_var.set(MODEL_FAILED_TEXT + error)
+            return
+        if state == WORKER_STATE_RESTARTING:
+            # 有备用进程时模型仍然就绪，否则随后会收到新进程的加载进度
+            self.status_label.config(fg=FAIL_RESULT_LABEL_COLOR)
+            self.status_var.set(WORKER_RESTARTING_TEXT.format(error=error))
+            return
+        self.model_ready = False
+        if self.scheduler.pending():
+            self.show_recognizing_status()
+            return
+        self.status_label.config(fg=MODEL_STATUS_COLOR)
+        if state == WORKER_STATE_WARMING:
+            self.model_load_time = elapsed_time
+            self.status_var.set(MODEL_WARMING_TEXT.format(elapsed_time=elapsed_time))
+        elif state == WORKER_STATE_TUNING:
+            self.status_var.set(MODEL_TUNING_TEXT)
+        else:
+            self.status_var.set(MODEL_LOADING_TEXT)
 
     def update_ui_after_recognition(
-        self, result: dict[str, bool | float | int | list[str]]
+        self,
+        result: dict[str, Any],
+        sources: list[Image.Image | str] | None = None,
     ):
         if result["success"]:
-            self.digits_text.delete(1.0, tk.END)
-            self.sum_result_var.set("")
             assert isinstance(result["numbers"], list)
-            for number in result["numbers"]:
-                self.digits_text.insert(tk.END, f"{number}\n")
-            self.sum_result_var.set(str(result["total"]))
+            self.show_column_choices(result)
+            self.show_regions(result, sources or [])
+            if result["cached"]:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
             self.status_label.config(fg=SUCCESS_RESULT_LABEL_COLOR)
             self.status_var.set(
                 SUCCESS_RESULT_LABEL_TEXT.format(
-                    elapsed_time=result["elapsed_time"], total=result["total"]
+                    elapsed_time=result["elapsed_time"],
+                    total=result["total"],
+                    cache_hits=self.cache_hits,
+                    cache_misses=self.cache_misses,
                 )
             )
         else:
             self.status_label.config(fg=FAIL_RESULT_LABEL_COLOR)
             assert isinstance(result["error"], str)
             self.status_var.set(FAIL_RESULT_LABEL_TEXT + result["error"])
-        self.delete_temp_file()
 
-    def delete_temp_file(self):
-        temp_file = self.image_path_var.get()
-        if temp_file and TEMP_FILE_NAME in temp_file:
-            try:
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
-            except Exception as e:
-                self.status_var.set(DELETE_TEMP_FILE_FAIL + str(e))
+    def show_regions(self, result: dict[str, Any], sources: list[Image.Image | str]):
+        lines: list[str] = []
+        # (行号, 区域序号, 文本, 置信度, 框)
+        entries: list[tuple[int, int, str, float, list[int]]] = []
+        regions = result.get("regions", [result])
+        for index, region in enumerate(regions):
+            if "regions" in result:
+                # 小计行不是数字，重新计算总和时会被跳过
+                lines.append(
+                    REGION_SUBTOTAL_TEXT.format(index=index + 1, total=region["total"])
+                )
+            # 表格模式按列分组，只列出勾选的列
+            groups: list[tuple[str | None, list[int]]] = [
+                (None, list(range(len(region["numbers"]))))
+            ]
+            if "table" in region:
+                table = region["table"]
+                groups = [
+                    (
+                        COLUMN_SUBTOTAL_TEXT.format(
+                            column=column + 1, total=table["column_totals"][column]
+                        ),
+                        positions,
+                    )
+                    for column, positions in enumerate(table["columns"])
+                    if self.column_vars[index][column].get()
+                ]
+            for header, positions in groups:
+                if header is not None:
+                    lines.append(header)
+                for position in positions:
+                    text = region["numbers"][position]
+                    lines.append(text)
+                    entries.append(
+                        (
+                            len(lines),
+                            index,
+                            text,
+                            region["scores"][position],
+                            region["boxes"][position],
+                        )
+                    )
+        self.digits_text.set_lines(lines)
+        self.mark_low_confidence(entries, sources)
+
+    def show_column_choices(self, result: dict[str, Any]):
+        self.clear_column_choices()
+        regions = result.get("regions", [result])
+        if not any("table" in region for region in regions):
+            return
+        self.table_result = result
+        tk.Label(self.column_frame, text=TABLE_COLUMNS_TEXT).pack(
+            side=tk.LEFT, padx=TABLE_COLUMN_PADX
+        )
+        for index, region in enumerate(regions):
+            variables: list[tk.BooleanVar] = []
+            for column, total in enumerate(region["table"]["column_totals"]):
+                variable = tk.BooleanVar(value=True)
+                if "regions" in result:
+                    text = TABLE_REGION_COLUMN_TEXT.format(
+                        region=index + 1, column=column + 1, total=total
+                    )
+                else:
+                    text = TABLE_COLUMN_TEXT.format(column=column + 1, total=total)
+                tk.Checkbutton(
+                    self.column_frame,
+                    text=text,
+                    variable=variable,
+                    command=self.on_columns_changed,
+                ).pack(side=tk.LEFT, padx=TABLE_COLUMN_PADX)
+                variables.append(variable)
+            self.column_vars.append(variables)
+
+    def clear_column_choices(self):
+        for child in self.column_frame.winfo_children():
+            child.destroy()
+        self.table_result = None
+        self.column_vars = []
+
+    def on_columns_changed(self):
+        # 只用上次的识别结果重新排列数字面板，总和随之更新
+        if self.table_result is not None:
+            self.show_regions(self.table_result, self.last_sources)
+
+    def mark_low_confidence(
+        self,
+        entries: list[tuple[int, int, str, float, list[int]]],
+        sources: list[Image.Image | str],
+    ):
+        for mark, *_ in self.low_confidence_entries:
+            self.digits_text.mark_unset(mark)
+        self.low_confidence_entries = []
+        self.last_sources = sources
+        for line, region_index, text, score, box in entries:
+            if score >= LOW_CONFIDENCE_THRESHOLD:
+                continue
+            # 用标记跟踪行位置，用户增删行后仍能找到对应的数字
+            mark = f"low_confidence_{len(self.low_confidence_entries)}"
+            self.digits_text.mark_set(mark, f"{line}.0")
+            self.digits_text.tag_add(LOW_CONFIDENCE_TAG, f"{line}.0", f"{line}.end")
+            self.low_confidence_entries.append(
+                (mark, region_index, text, score, box)
+            )
+
+    def recheck_low_confidence(self):
+        entries = list(self.low_confidence_entries)
+        if not entries or not self.last_sources:
+            self.status_label.config(fg=SUM_STATUS_SUCCESS_COLOR)
+            self.status_var.set(RECHECK_NONE_TEXT)
+            return
+        images: dict[int, Image.Image] = {}
+        shms: list[SharedMemory] = []
+        handles: list[SharedImage] = []
+        trace = RequestTrace(JOB_KIND_RECHECK)
+        for _, region_index, _, _, box in entries:
+            if region_index not in images:
+                source = self.last_sources[region_index]
+                images[region_index] = (
+                    Image.open(source) if isinstance(source, str) else source
+                )
+            image = images[region_index]
+            x1, y1, x2, y2 = box
+            with trace.stage(TRACE_STAGE_SHARE):
+                shm, handle = share_image(
+                    image.crop(
+                        (
+                            max(x1 - RECHECK_PADDING, 0),
+                            max(y1 - RECHECK_PADDING, 0),
+                            min(x2 + RECHECK_PADDING, image.width),
+                            min(y2 + RECHECK_PADDING, image.height),
+                        )
+                    )
+                )
+            shms.append(shm)
+            handles.append(handle)
+
+        def handle_result(result: dict[str, Any]):
+            self.apply_recheck(entries, result)
+
+        self.submit_job(
+            recheck_process,
+            (handles,),
+            shms,
+            handle_result,
+            JOB_KIND_RECHECK,
+            trace=trace,
+        )
+
+    def apply_recheck(
+        self,
+        entries: list[tuple[str, int, str, float, list[int]]],
+        result: dict[str, Any],
+    ):
+        if not result["success"]:
+            self.status_label.config(fg=FAIL_RESULT_LABEL_COLOR)
+            self.status_var.set(FAIL_RESULT_LABEL_TEXT + result["error"])
+            return
+        fixed = 0
+        for entry, text, score in zip(entries, result["texts"], result["scores"]):
+            mark, region_index, old_text, old_score, box = entry
+            if entry not in self.low_confidence_entries:
+                continue
+            line = self.digits_text.index(mark).split(".")[0]
+            current = self.digits_text.get(f"{line}.0", f"{line}.end")
+            # 用户已手动修改过的行不覆盖
+            if current != old_text or not is_number(text) or score <= old_score:
+                continue
+            self.digits_text.replace(f"{line}.0", f"{line}.end", text)
+            position = self.low_confidence_entries.index(entry)
+            if score >= LOW_CONFIDENCE_THRESHOLD:
+                self.digits_text.mark_unset(mark)
+                self.low_confidence_entries.pop(position)
+            else:
+                self.digits_text.tag_add(
+                    LOW_CONFIDENCE_TAG, f"{line}.0", f"{line}.end"
+                )
+                self.low_confidence_entries[position] = (
+                    mark,
+                    region_index,
+                    text,
+                    score,
+                    box,
+                )
+            fixed += 1
+        self.status_label.config(fg=SUCCESS_RESULT_LABEL_COLOR)
+        self.status_var.set(
+            RECHECK_DONE_TEXT.format(
+                elapsed_time=result["elapsed_time"],
+                fixed=fixed,
+                remaining=len(self.low_confidence_entries),
+            )
+        )
+
+    def on_total_changed(self, total: Decimal):
+        self.sum_result_var.set(str(float(total)))
 
     def calculate_sum(self):
+        # 总和已在每次编辑时按修改的行增量更新，这里只刷新状态
         try:
-            text_content = self.digits_text.get(1.0, tk.END)
-            lines = text_content.strip().split("\n")
-            numbers: list[float] = []
-            for line in lines:
-                line = line.strip()
-                if line:
-                    try:
-                        number = float(line)
-                        numbers.append(number)
-                    except ValueError:
-                        # 跳过非数字行
-                        pass
-            total_sum = sum(numbers)
-            self.sum_result_var.set(str(total_sum))
+            self.on_total_changed(self.digits_text.line_totals.total)
             self.status_label.config(fg=SUM_STATUS_SUCCESS_COLOR)
             self.status_var.set(SUM_STATUS_SUCCESS_TEXT)
         except Exception as e:
@@ -282,12 +802,127 @@ class DigitRecognitionApp:
         self.calculate_sum()
 
     def capture_screen_region(self):
+        self.open_capture_window()
+
+    def open_capture_window(self, on_region_selected: Callable[[Box], None] | None = None):
         self.root.iconify()
+        if self.freeze_var.get():
+            # 等主窗口最小化后再截取整个屏幕，冻结的画面中不会出现主窗口
+            self.root.after(
+                SCREEN_FREEZE_DELAY, self.show_capture_window, on_region_selected, True
+            )
+        else:
+            self.show_capture_window(on_region_selected, False)
+
+    def show_capture_window(
+        self, on_region_selected: Callable[[Box], None] | None, freeze: bool
+    ):
+        frozen_frame = None
+        if freeze:
+            try:
+                frozen_frame = screen_grabber().grab_screen()
+            except Exception as e:
+                # 冻结失败时退回到松开鼠标后再截图
+                print(f"Error freezing screen: {e}", file=sys.stderr)
         screen_width = self.root.winfo_screenwidth()
         screen_height = self.root.winfo_screenheight()
         capture_window = CaptureScreen(
-            self.root, self.image_path_var, self.status_var, self.recognize_digits
+            self.root,
+            self.status_var,
+            self.recognize_digits,
+            on_region_selected,
+            frozen_frame,
         )
-
         canvas = capture_window.create_canvas(screen_width, screen_height)
         capture_window.handle_select_region_events(canvas)
+
+    def toggle_screen_watch(self):
+        if self.screen_watcher is not None:
+            self.stop_screen_watch()
+            self.status_label.config(fg=SUM_STATUS_SUCCESS_COLOR)
+            self.status_var.set(WATCH_STOPPED_TEXT)
+            return
+        self.open_capture_window(self.start_screen_watch)
+
+    def start_screen_watch(self, region: Box):
+        self.stop_page_stream()
+        try:
+            interval = self.watch_interval_var.get()
+        except tk.TclError:
+            interval = WATCH_INTERVAL
+        interval = min(max(interval, WATCH_MIN_INTERVAL), WATCH_MAX_INTERVAL)
+        self.screen_watcher = ScreenWatcher(
+            self.root,
+            region,
+            interval,
+            self.recognize_watch_bands,
+            self.update_ui_after_watch,
+            self.on_watch_error,
+        )
+        self.clear_column_choices()
+        self.screen_watcher.start()
+        self.watch_button.config(text=WATCH_STOP_TEXT)
+        self.status_label.config(fg=SUCCESS_RESULT_LABEL_COLOR)
+        self.status_var.set(
+            WATCH_STARTED_TEXT.format(
+                width=region[2] - region[0], height=region[3] - region[1]
+            )
+        )
+
+    def stop_screen_watch(self):
+        if self.screen_watcher is not None:
+            self.screen_watcher.stop()
+            self.screen_watcher = None
+        self.watch_button.config(text=WATCH_START_TEXT)
+
+    def recognize_watch_bands(
+        self,
+        bands: list[Image.Image],
+        on_result: Callable[[dict[str, Any]], None],
+    ):
+        shms: list[SharedMemory] = []
+        handles: list[SharedImage] = []
+        trace = RequestTrace(JOB_KIND_WATCH)
+        with trace.stage(TRACE_STAGE_SHARE):
+            for band in bands:
+                shm, handle = share_image(band)
+                shms.append(shm)
+                handles.append(handle)
+        options = self.recognition_options()
+        # 监视画面的识别让位于用户主动发起的识别
+        self.submit_job(
+            regions_recognition_process,
+            (handles, options),
+            shms,
+            on_result,
+            JOB_KIND_WATCH,
+            JOB_PRIORITY_BACKGROUND,
+            trace,
+        )
+
+    def update_ui_after_watch(
+        self, items: list[RecItem], frame: Image.Image, bands: int, elapsed_time: float
+    ):
+        self.digits_text.set_lines([text for text, _, _ in items])
+        self.mark_low_confidence(
+            [
+                (line, 0, text, score, list(box))
+                for line, (text, score, box) in enumerate(items, start=1)
+            ],
+            [frame],
+        )
+        self.status_label.config(fg=SUCCESS_RESULT_LABEL_COLOR)
+        self.status_var.set(
+            WATCH_UPDATED_TEXT.format(
+                bands=bands,
+                elapsed_time=elapsed_time,
+                total=self.sum_result_var.get(),
+            )
+        )
+
+    def on_watch_error(self, error: str):
+        if self.screen_watcher is not None and self.screen_watcher.after_id is None:
+            # 截图失败，监视已停止
+            self.stop_screen_watch()
+        self.status_label.config(fg=FAIL_RESULT_LABEL_COLOR)
+        self.status_var.set(WATCH_FAILED_TEXT + error)
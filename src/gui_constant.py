@@ -1,3 +1,10 @@
+from src.constant import (TRACE_STAGE_CACHE, TRACE_STAGE_CAPTURE,
+                          TRACE_STAGE_DECODE, TRACE_STAGE_FILTER,
+                          TRACE_STAGE_OCR, TRACE_STAGE_QUEUE,
+                          TRACE_STAGE_RETURN, TRACE_STAGE_SHARE,
+                          TRACE_STAGE_TRIM, TRACE_STAGE_UI,
+                          TRACE_STAGE_WORKER)
+
 APP_TITLE: str = "SnapSum4J"
 
 WINDOW_WIDTH: int = 600
@@ -38,13 +45,71 @@ SUM_RESULT_ENTRY_PADX: int = 5
 TOPMOST_TEXT: str = "窗口置顶"
 TOPMOST_PADY: int = 5
 
+FAST_PATH_TEXT: str = "单列数字快速识别（跳过文字检测）"
+FAST_PATH_PADY: int = 5
+
+CASCADE_TEXT: str = "轻量模型优先（置信度不足时自动改用服务端模型）"
+CASCADE_PADY: int = 5
+
+TABLE_TEXT: str = "表格模式（按列分组，可选择参与求和的列）"
+TABLE_PADY: int = 5
+TABLE_COLUMNS_TEXT: str = "参与求和的列:"
+TABLE_COLUMN_TEXT: str = "列 {column}（{total}）"
+TABLE_REGION_COLUMN_TEXT: str = "区域 {region} 列 {column}（{total}）"
+TABLE_COLUMN_PADX: int = 5
+
+TRACE_TEXT: str = "在状态栏显示各阶段耗时"
+TRACE_PADY: int = 5
+
+FREEZE_TEXT: str = "截图时冻结画面（在打开遮罩时的整屏画面上框选）"
+FREEZE_PADY: int = 5
+TRACE_STAGE_LABELS: dict[str, str] = {
+    TRACE_STAGE_CAPTURE: "截图",
+    TRACE_STAGE_SHARE: "共享内存",
+    TRACE_STAGE_QUEUE: "排队",
+    TRACE_STAGE_WORKER: "识别进程",
+    TRACE_STAGE_DECODE: "解码",
+    TRACE_STAGE_CACHE: "缓存",
+    TRACE_STAGE_TRIM: "裁边",
+    TRACE_STAGE_OCR: "OCR",
+    TRACE_STAGE_FILTER: "筛选数字",
+    TRACE_STAGE_RETURN: "回传",
+    TRACE_STAGE_UI: "界面",
+}
+TRACE_STAGE_TEXT: str = "{stage} {elapsed:.0f}ms"
+TRACE_CHILDREN_TEXT: str = "（{children}）"
+TRACE_CHILDREN_SEPARATOR: str = "，"
+TRACE_SEPARATOR: str = " · "
+
+RECHECK_BUTTON_TEXT: str = "复查低置信度数字"
+RECHECK_BUTTON_PADY: int = 5
+RECHECK_NONE_TEXT: str = "没有需要复查的低置信度数字"
+RECHECK_DONE_TEXT: str = "复查完成，耗时: {elapsed_time:.2f} 秒，修正 {fixed} 个，仍有 {remaining} 个低置信度数字"
+CANCEL_BUTTON_TEXT: str = "取消识别"
+CANCEL_BUTTON_PADY: int = 5
+CANCEL_NONE_TEXT: str = "没有正在进行的识别任务"
+LOW_CONFIDENCE_TAG: str = "low_confidence"
+LOW_CONFIDENCE_BACKGROUND: str = "#fff3b0"
+
+WATCH_FRAME_PADY: int = 5
+WATCH_START_TEXT: str = "监视屏幕区域"
+WATCH_STOP_TEXT: str = "停止监视"
+WATCH_INTERVAL_LABEL_TEXT: str = "刷新间隔(毫秒):"
+WATCH_INTERVAL_WIDTH: int = 7
+WATCH_INTERVAL_INCREMENT: int = 100
+WATCH_WIDGET_PADX: int = 5
+WATCH_STARTED_TEXT: str = "正在监视屏幕区域: {width}x{height}，画面变化时自动重新识别"
+WATCH_UPDATED_TEXT: str = "画面已变化，重新识别 {bands} 个行带，耗时: {elapsed_time:.2f} 秒，总和: {total}"
+WATCH_STOPPED_TEXT: str = "已停止监视屏幕区域"
+WATCH_FAILED_TEXT: str = "监视屏幕区域失败: "
+
 STATUS_LABEL_FONT: tuple[str, int] = ("微软雅黑", 9)
 STATUS_LABEL_PADY: int = 5
 
 CHOSEN_IMAGE_DESC: str = "已选择图片:"
 
 PREVIEW_WINDOW_TITLE: str = "图片预览 - 请框选要识别的区域"
-PREVIEW_WINDOW_RELAX_HEIGHT: int = 100
+PREVIEW_WINDOW_RELAX_HEIGHT: int = 260
 
 PREVIEW_OUTLINE_COLOR: str = "red"
 PREVIEW_OUTLINE_WIDTH: int = 2
@@ -52,13 +117,25 @@ PREVIEW_WARNING_TITLE: str = "提示"
 PREVIEW_WARNING_MESSAGE: str = "请选择一个更大的区域"
 PREVIEW_CONFIRM_WARNING_TITLE: str = "提示"
 PREVIEW_CONFIRM_WARNING_MESSAGE: str = "请先选择一个区域"
-PREVIEW_BUTTON_FRAME_PADY: int = 20
+PREVIEW_BUTTON_FRAME_PADY: int = 10
 PREVIEW_CONFIRM_BUTTON_TEXT: str = "确认选择"
 PREVIEW_CONFIRM_BUTTON_FONT: tuple[str, int] = ("微软雅黑", 12)
 PREVIEW_CONFIRM_BUTTON_WIDTH: int = 15
 PREVIEW_CONFIRM_BUTTON_PADY: int = 10
-PREVIEW_HINT_TEXT: str = "提示: 按住鼠标左键拖拽选择要识别的区域，可反复选择直到点击确认"
+PREVIEW_HINT_TEXT: str = "提示: 按住鼠标左键拖拽添加识别区域，右键点击区域删除，Ctrl+滚轮缩放，可在列表中调整顺序，完成后点击确认"
 PREVIEW_HINT_PADY: int = 10
+PREVIEW_REGION_FRAME_PADY: int = 5
+PREVIEW_REGION_LIST_HEIGHT: int = 4
+PREVIEW_REGION_LIST_WIDTH: int = 30
+PREVIEW_REGION_ITEM_TEXT: str = "区域 {index}: {width}x{height}"
+PREVIEW_REGION_UP_TEXT: str = "上移"
+PREVIEW_REGION_DOWN_TEXT: str = "下移"
+PREVIEW_REGION_REMOVE_TEXT: str = "删除"
+PREVIEW_REGION_BUTTON_PADX: int = 5
+PREVIEW_REGION_LABEL_OFFSET: int = 4
+PREVIEW_REGION_LABEL_FONT: tuple[str, int, str] = ("微软雅黑", 12, "bold")
+PREVIEW_TILE_TAG: str = "preview_tile"
+PREVIEW_SCROLL_UNITS: int = 3
 PREVIEW_ERROR_TITLE: str = "错误"
 PREVIEW_ERROR_MESSAGE: str = "无法加载图片: "
 
@@ -68,14 +145,31 @@ TOPMOST_DISABLE_MESSAGE: str = "窗口已取消置顶"
 SCREEN_CAPTURE_WARNING_TITLE: str = "提示"
 SCREEN_CAPTURE_WARNING_MESSAGE: str = "请选择一个更大的区域"
 SCREEN_CAPTURE_CANCEL_DELAY: int = 100
+SCREEN_CAPTURE_ALPHA: float = 0.3
+# 冻结画面时等主窗口最小化完成再截取整个屏幕（毫秒）
+SCREEN_FREEZE_DELAY: int = 200
+SCREEN_CAPTURE_SUCCESS_TEXT: str = "已截取屏幕区域: {width}x{height}"
+
+REGION_SUBTOTAL_TEXT: str = "# 区域 {index} 小计: {total}"
+COLUMN_SUBTOTAL_TEXT: str = "# 列 {column} 小计: {total}"
+
+# 逐页识别时下一页尚未解码完成的重试间隔（毫秒）
+PAGE_POLL_INTERVAL: int = 20
+PAGES_CONFIRM_TITLE: str = "多页文档"
+PAGES_CONFIRM_MESSAGE: str = "该文件共 {pages} 页，是否逐页识别全部页面？\n选择“否”只框选第一页。"
+PAGE_SUBTOTAL_TEXT: str = "# 第 {page} 页 小计: {total}"
+PAGE_FAILED_LINE_TEXT: str = "# 第 {page} 页 识别失败: {error}"
+PAGE_DONE_TEXT: str = "第 {page}/{pages} 页识别完成，本页小计: {subtotal}，累计总和: {total}，正在识别下一页..."
+PAGES_DONE_TEXT: str = "全部 {pages} 页识别完成，总和: {total}，失败 {failed} 页"
+PAGES_FAILED_TEXT: str = "读取多页文档失败: "
 
 SUCCESS_RESULT_LABEL_COLOR: str = "blue"
-SUCCESS_RESULT_LABEL_TEXT: str = "识别完成，耗时: {elapsed_time:.2f} 秒，总和: {total}"
+SUCCESS_RESULT_LABEL_TEXT: str = (
+    "识别完成，耗时: {elapsed_time:.2f} 秒，总和: {total}，缓存命中/未命中: {cache_hits}/{cache_misses}"
+)
 FAIL_RESULT_LABEL_COLOR: str = "red"
 FAIL_RESULT_LABEL_TEXT: str = "识别失败: "
 
-DELETE_TEMP_FILE_FAIL: str = "删除临时文件失败: "
-
 SUM_STATUS_SUCCESS_COLOR: str = "blue"
 SUM_STATUS_SUCCESS_TEXT: str = "计算完成"
 SUM_STATUS_FAIL_COLOR: str = "red"
@@ -87,3 +181,13 @@ ERROR_IMAGE_NOT_FOUND: str = "选择的图片文件不存在"
 
 STATUS_RECOGNIZING_COLOR: str = "red"
 STATUS_RECOGNIZING_TEXT: str = "正在识别数字..."
+
+WORKER_STATUS_POLL_INTERVAL: int = 200
+MODEL_TUNING_TEXT: str = "首次启动，正在校准本机的推理参数..."
+MODEL_LOADING_TEXT: str = "正在加载识别模型..."
+MODEL_WARMING_TEXT: str = "模型加载完成，耗时: {elapsed_time:.2f} 秒，正在预热..."
+MODEL_READY_TEXT: str = "模型已就绪，加载耗时: {load_time:.2f} 秒，预热耗时: {elapsed_time:.2f} 秒"
+MODEL_FAILED_TEXT: str = "模型加载失败: "
+WORKER_RESTARTING_TEXT: str = "{error}，正在重启识别进程并重试..."
+MODEL_STATUS_COLOR: str = "gray"
+STATUS_QUEUED_TEXT: str = "模型尚未就绪，已排队 {pending} 个识别请求..."
@@ -0,0 +1,160 @@
+import tkinter as tk
+from collections import OrderedDict
+
+from PIL import Image, ImageTk
+
+from src.constant import (
+    PREVIEW_MAX_ZOOM,
+    PREVIEW_MIN_ZOOM,
+    PREVIEW_PYRAMID_MIN_SIDE,
+    PREVIEW_TILE_CACHE_SIZE,
+    PREVIEW_TILE_SIZE,
+)
+from src.gui_constant import PREVIEW_TILE_TAG
+
+
+class ImagePyramid:
+    """
+    按需生成的多分辨率图层：第 k 层是原图缩小 2^k 倍，缩小显示时从最接近的图层取像素
+    """
+
+    def __init__(self, image: Image.Image):
+        self.levels: list[Image.Image] = [image]
+
+    def level_for(self, zoom: float) -> tuple[Image.Image, int]:
+        index = 0
+        while 2 ** (index + 1) <= 1 / zoom:
+            if index + 1 == len(self.levels):
+                previous = self.levels[-1]
+                if min(previous.size) // 2 < PREVIEW_PYRAMID_MIN_SIDE:
+                    break
+                self.levels.append(previous.reduce(2))
+            index += 1
+        return self.levels[index], 2**index
+
+
+class ImageViewport:
+    """
+    只渲染画布可见区域内的切片，已渲染的切片按 LRU 缓存，内存占用与图片大小无关
+    """
+
+    def __init__(self, canvas: tk.Canvas, image: Image.Image, zoom: float):
+        self.canvas = canvas
+        self.image = image
+        self.pyramid = ImagePyramid(image)
+        self.zoom = zoom
+        self.tiles: OrderedDict[tuple[float, int, int], ImageTk.PhotoImage] = (
+            OrderedDict()
+        )
+        # 画布上正在显示的切片：(画布图片ID, 切片)，持有引用避免被 LRU 淘汰后回收
+        self.tile_items: dict[tuple[int, int], tuple[int, ImageTk.PhotoImage]] = {}
+        self.render_pending = False
+        self.update_scroll_region()
+
+    def update_scroll_region(self):
+        width, height = self.display_size()
+        self.canvas.configure(scrollregion=(0, 0, width, height))
+
+    def display_size(self) -> tuple[int, int]:
+        return (
+            max(int(self.image.width * self.zoom), 1),
+            max(int(self.image.height * self.zoom), 1),
+        )
+
+    def to_image(self, x: float, y: float) -> tuple[int, int]:
+        return (
+            min(max(int(x / self.zoom), 0), self.image.width),
+            min(max(int(y / self.zoom), 0), self.image.height),
+        )
+
+    def to_canvas(self, x: float, y: float) -> tuple[float, float]:
+        return x * self.zoom, y * self.zoom
+
+    def set_zoom(self, zoom: float, anchor_x: int, anchor_y: int):
+        """
+        以窗口内 (anchor_x, anchor_y) 处的像素为中心缩放
+        """
+        zoom = min(max(zoom, PREVIEW_MIN_ZOOM), PREVIEW_MAX_ZOOM)
+        if zoom == self.zoom:
+            return
+        image_x = self.canvas.canvasx(anchor_x) / self.zoom
+        image_y = self.canvas.canvasy(anchor_y) / self.zoom
+        self.zoom = zoom
+        for item, _ in self.tile_items.values():
+            self.canvas.delete(item)
+        self.tile_items.clear()
+        self.update_scroll_region()
+        width, height = self.display_size()
+        self.canvas.xview_moveto(max(image_x * zoom - anchor_x, 0) / width)
+        self.canvas.yview_moveto(max(image_y * zoom - anchor_y, 0) / height)
+        self.schedule_render()
+
+    def schedule_render(self):
+        # 滚动和缩放事件可能连续触发，合并到空闲时渲染一次
+        if not self.render_pending:
+            self.render_pending = True
+            self.canvas.after_idle(self.render)
+
+    def render_tile(self, column: int, row: int) -> ImageTk.PhotoImage:
+        key = (self.zoom, column, row)
+        tile = self.tiles.get(key)
+        if tile is not None:
+            self.tiles.move_to_end(key)
+            return tile
+        width, height = self.display_size()
+        left = column * PREVIEW_TILE_SIZE
+        top = row * PREVIEW_TILE_SIZE
+        right = min(left + PREVIEW_TILE_SIZE, width)
+        bottom = min(top + PREVIEW_TILE_SIZE, height)
+        level, scale = self.pyramid.level_for(self.zoom)
+        factor = self.zoom * scale
+        tile = ImageTk.PhotoImage(
+            level.resize(
+                (right - left, bottom - top),
+                Image.Resampling.BILINEAR,
+                box=(
+                    left / factor,
+                    top / factor,
+                    min(right / factor, level.width),
+                    min(bottom / factor, level.height),
+                ),
+            )
+        )
+        self.tiles[key] = tile
+        while len(self.tiles) > PREVIEW_TILE_CACHE_SIZE:
+            self.tiles.popitem(last=False)
+        return tile
+
+    def render(self):
+        self.render_pending = False
+        width, height = self.display_size()
+        left = max(int(self.canvas.canvasx(0)), 0)
+        top = max(int(self.canvas.canvasy(0)), 0)
+        right = min(left + self.canvas.winfo_width(), width)
+        bottom = min(top + self.canvas.winfo_height(), height)
+
+        visible = {
+            (column, row)
+            for row in range(
+                top // PREVIEW_TILE_SIZE, (bottom - 1) // PREVIEW_TILE_SIZE + 1
+            )
+            for column in range(
+                left // PREVIEW_TILE_SIZE, (right - 1) // PREVIEW_TILE_SIZE + 1
+            )
+        }
+        for position in list(self.tile_items):
+            if position not in visible:
+                self.canvas.delete(self.tile_items.pop(position)[0])
+        for column, row in visible:
+            if (column, row) in self.tile_items:
+                continue
+            tile = self.render_tile(column, row)
+            item = self.canvas.create_image(  # type: ignore[reportUnknownMemberType]
+                column * PREVIEW_TILE_SIZE,
+                row * PREVIEW_TILE_SIZE,
+                anchor=tk.NW,
+                image=tile,
+                tags=PREVIEW_TILE_TAG,
+            )
+            self.tile_items[(column, row)] = (item, tile)
+        self.canvas.tag_lower(PREVIEW_TILE_TAG)
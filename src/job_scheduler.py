@@ -0,0 +1,118 @@
+import heapq
+import itertools
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from src.constant import JOB_CANCELLED_ERROR, JOB_PRIORITY_INTERACTIVE
+from src.daemon_client import DaemonClient
+from src.worker_supervisor import WorkerSupervisor
+
+
+@dataclass(order=True)
+class Job:
+    priority: int
+    job_id: int
+    task: Callable[..., dict[str, Any]] = field(compare=False)
+    args: tuple[Any, ...] = field(compare=False)
+    on_result: Callable[[dict[str, Any]], None] = field(compare=False)
+    # 无论结果如何都会调用，用来释放共享内存等资源
+    on_done: Callable[[], None] = field(compare=False)
+    kind: str = field(compare=False)
+    cancelled: bool = field(default=False, compare=False)
+
+
+class JobScheduler:
+    """
+    在进程池前面排队识别任务：进程池里同时只运行一个任务，其余任务按优先级排队，
+    同类的新请求会替换还在排队或正在运行的旧请求，只有最新的结果会回调到界面
+    """
+
+    def __init__(self, pool: WorkerSupervisor | DaemonClient, cancel_event: Any):
+        self.pool = pool
+        # 子进程在各识别阶段之间检查这个事件，提前结束被取消的任务
+        self.cancel_event = cancel_event
+        self.queue: list[Job] = []
+        self.running: Job | None = None
+        self.job_ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def pending(self) -> int:
+        with self.lock:
+            return len(self.queue) + (self.running is not None)
+
+    def submit(
+        self,
+        task: Callable[..., dict[str, Any]],
+        args: tuple[Any, ...],
+        on_result: Callable[[dict[str, Any]], None],
+        on_done: Callable[[], None],
+        kind: str,
+        priority: int = JOB_PRIORITY_INTERACTIVE,
+        supersede: bool = True,
+    ) -> int:
+        job = Job(priority, next(self.job_ids), task, args, on_result, on_done, kind)
+        superseded: list[Job] = []
+        with self.lock:
+            if supersede:
+                superseded = [queued for queued in self.queue if queued.kind == kind]
+                self.queue = [queued for queued in self.queue if queued.kind != kind]
+                heapq.heapify(self.queue)
+                if self.running is not None and self.running.kind == kind:
+                    self.stop_running()
+            heapq.heappush(self.queue, job)
+            self.dispatch()
+        for stale in superseded:
+            stale.on_done()
+        return job.job_id
+
+    def cancel(self):
+        """
+        取消正在运行和排队中的全部任务，被取消的任务立即以失败结果回调
+        """
+        with self.lock:
+            cancelled = self.queue
+            self.queue = []
+            running = self.running
+            if running is not None and not running.cancelled:
+                self.stop_running()
+            else:
+                running = None
+        for job in cancelled:
+            job.on_done()
+        for job in ([running] if running is not None else []) + cancelled:
+            job.on_result(
+                {"success": False, "cancelled": True, "error": JOB_CANCELLED_ERROR}
+            )
+
+    def stop_running(self):
+        # 调用方需持有 self.lock。结果返回后直接丢弃，同时通知子进程尽早结束
+        assert self.running is not None
+        self.running.cancelled = True
+        self.cancel_event.set()
+
+    def dispatch(self):
+        # 调用方需持有 self.lock；被取消的任务还占着子进程时不派发，避免新任务清掉取消信号
+        if self.running is not None or not self.queue:
+            return
+        job = heapq.heappop(self.queue)
+        self.running = job
+        self.cancel_event.clear()
+
+        def handle_result(result: dict[str, Any]):
+            self.finish(job, result)
+
+        def handle_error(error: BaseException):
+            self.finish(job, {"success": False, "error": str(error)})
+
+        self.pool.apply_async(
+            job.task, job.args, callback=handle_result, error_callback=handle_error
+        )
+
+    def finish(self, job: Job, result: dict[str, Any]):
+        with self.lock:
+            self.running = None
+            self.dispatch()
+        job.on_done()
+        if not job.cancelled:
+            job.on_result(result)
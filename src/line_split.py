@@ -0,0 +1,111 @@
+import numpy as np
+
+from src.constant import (
+    LINE_INK_THRESHOLD,
+    LINE_MAX_COLUMN_GAP_RATIO,
+    LINE_MAX_HEIGHT_RATIO,
+    LINE_MIN_GAP,
+    LINE_MIN_HEIGHT,
+    LINE_PADDING,
+    TRIM_PADDING,
+    TRIM_UNIFORM_TOLERANCE,
+)
+from src.utils import Box
+
+
+def find_runs(mask: np.ndarray, min_gap: int) -> list[tuple[int, int]]:
+    """
+    返回 mask 中连续为 True 的区间 [start, end)，间隔小于 min_gap 的区间会被合并
+    """
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    runs: list[tuple[int, int]] = []
+    for start, end in zip(edges[::2].tolist(), edges[1::2].tolist()):
+        if runs and start - runs[-1][1] < min_gap:
+            runs[-1] = (runs[-1][0], end)
+        else:
+            runs.append((start, end))
+    return runs
+
+
+def ink_mask(image: np.ndarray) -> np.ndarray:
+    gray = image.mean(axis=2) if image.ndim == 3 else image.astype(np.float32)
+    background = np.median(gray)
+    return np.abs(gray - background) > LINE_INK_THRESHOLD
+
+
+def leading_uniform(lines: np.ndarray) -> int:
+    # 从第一行（列）开始，与它颜色相同的连续行（列）数
+    if not len(lines):
+        return 0
+    uniform = (np.abs(lines - np.median(lines[0])) <= TRIM_UNIFORM_TOLERANCE).all(axis=1)
+    varied = np.flatnonzero(~uniform)
+    return int(varied[0]) if len(varied) else len(lines)
+
+
+def content_box(image: np.ndarray) -> Box | None:
+    """
+    先从四边去掉颜色均匀的边框（如窗口标题栏、纯色边距），再在剩余区域内按墨迹的水平/垂直投影
+    找出有内容的范围，外扩 TRIM_PADDING 后返回；没有任何内容时返回 None
+    """
+    gray = image.mean(axis=2) if image.ndim == 3 else image.astype(np.float32)
+    height, width = gray.shape
+    top = leading_uniform(gray)
+    bottom = height - leading_uniform(gray[top:][::-1])
+    if bottom <= top:
+        return None
+    left = leading_uniform(gray[top:bottom].T)
+    right = width - leading_uniform(gray[top:bottom, left:][:, ::-1].T)
+    # 背景色按整张图隔行隔列采样估计，大图上也只需要一次很快的阈值运算
+    background = np.median(gray[::4, ::4])
+    mask = np.abs(gray[top:bottom, left:right] - background) > LINE_INK_THRESHOLD
+    rows = np.flatnonzero(mask.any(axis=1))
+    if not len(rows):
+        return None
+    columns = np.flatnonzero(mask.any(axis=0))
+    return (
+        max(left + int(columns[0]) - TRIM_PADDING, 0),
+        max(top + int(rows[0]) - TRIM_PADDING, 0),
+        min(left + int(columns[-1]) + 1 + TRIM_PADDING, width),
+        min(top + int(rows[-1]) + 1 + TRIM_PADDING, height),
+    )
+
+
+def split_text_lines(image: np.ndarray) -> list[Box] | None:
+    """
+    用水平投影把单列数字区域切成文本行并返回每行的框；版面不像单列文本时返回 None，由调用方回退到完整识别流程
+    """
+    mask = ink_mask(image)
+    rows = [
+        run
+        for run in find_runs(mask.any(axis=1), LINE_MIN_GAP)
+        if run[1] - run[0] >= LINE_MIN_HEIGHT
+    ]
+    if not rows:
+        return None
+
+    heights = np.array([end - start for start, end in rows])
+    if heights.max() > LINE_MAX_HEIGHT_RATIO * np.median(heights):
+        return None
+
+    height, width = mask.shape
+    line_boxes: list[Box] = []
+    for start, end in rows:
+        line_height = end - start
+        columns = find_runs(
+            mask[start:end].any(axis=0),
+            int(LINE_MAX_COLUMN_GAP_RATIO * line_height),
+        )
+        # 同一行内出现大段空白说明有多列内容，单行识别会把它们拼在一起
+        if len(columns) != 1:
+            return None
+        left, right = columns[0]
+        line_boxes.append(
+            (
+                max(left - LINE_PADDING, 0),
+                max(start - LINE_PADDING, 0),
+                min(right + LINE_PADDING, width),
+                min(end + LINE_PADDING, height),
+            )
+        )
+    return line_boxes
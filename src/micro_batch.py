@@ -0,0 +1,119 @@
+import threading
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.constant import DAEMON_BATCH_WAIT_TIMEOUT, WORKER_TIMEOUT_ERROR
+from src.recognition import (
+    RecognitionOptions,
+    regions_recognition_process,
+    regions_result,
+)
+from src.shared_image import SharedImage
+from src.worker_supervisor import WorkerPool
+
+
+@dataclass
+class PendingRequest:
+    images: list[SharedImage]
+    done: threading.Event = field(default_factory=threading.Event)
+    result: dict[str, Any] = field(default_factory=dict)
+
+
+class MicroBatcher:
+    """
+    把短时间窗口内到达的、选项相同的识别请求合并成一次子进程调用：所有图片一起检测，
+    检测出的文本行合并成识别批次（按宽高比排序后分批），结果再按请求拆分。
+    凑满 max_images 张图片时立即发出，否则最多等待 window 秒。
+    批次 timeout 秒内没有结果时，其中的请求以超时错误返回
+    """
+
+    def __init__(
+        self,
+        pool: WorkerPool,
+        window: float,
+        max_images: int,
+        timeout: float = DAEMON_BATCH_WAIT_TIMEOUT,
+    ):
+        self.pool = pool
+        self.window = window
+        self.max_images = max_images
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.pending: dict[RecognitionOptions, list[PendingRequest]] = {}
+
+    def recognize(
+        self, images: list[SharedImage], options: RecognitionOptions
+    ) -> dict[str, Any]:
+        """
+        阻塞直到所在批次识别完成，返回与 regions_recognition_process 相同格式的结果
+        """
+        request = PendingRequest(images)
+        with self.lock:
+            batch = self.pending.setdefault(options, [])
+            batch.append(request)
+            if len(batch) == 1:
+                timer = threading.Timer(self.window, self.flush, (options, batch))
+                timer.daemon = True
+                timer.start()
+            full = sum(len(pending.images) for pending in batch) >= self.max_images
+        if full:
+            self.flush(options, batch)
+        if not request.done.wait(self.timeout):
+            return {
+                "success": False,
+                "error": WORKER_TIMEOUT_ERROR.format(timeout=self.timeout),
+            }
+        return request.result
+
+    def flush(self, options: RecognitionOptions, batch: list[PendingRequest]):
+        with self.lock:
+            # 批次已因凑满而提前发出时，计时器到点后什么也不做
+            if self.pending.get(options) is not batch:
+                return
+            del self.pending[options]
+
+        def handle_result(result: dict[str, Any]):
+            self.scatter(batch, result)
+
+        def handle_error(error: BaseException):
+            self.scatter(batch, {"success": False, "error": str(error)})
+
+        try:
+            self.pool.apply_async(
+                regions_recognition_process,
+                ([image for pending in batch for image in pending.images], options),
+                callback=handle_result,
+                error_callback=handle_error,
+            )
+        except Exception as e:
+            handle_error(e)
+
+    def scatter(self, batch: list[PendingRequest], result: dict[str, Any]):
+        try:
+            results = self.split(batch, result)
+        except Exception as e:
+            # 结果格式异常时也要唤醒批次中的所有请求，否则它们一直占着处理线程和排队名额
+            error = {"success": False, "error": f"无法拆分合并识别的结果: {e}"}
+            results = [error] * len(batch)
+        for pending, pending_result in zip(batch, results):
+            pending.result = pending_result
+            pending.done.set()
+
+    def split(
+        self, batch: list[PendingRequest], result: dict[str, Any]
+    ) -> list[dict[str, Any]]:
+        if not result["success"]:
+            return [result] * len(batch)
+        results: list[dict[str, Any]] = []
+        cursor = 0
+        for pending in batch:
+            regions = result["regions"][cursor : cursor + len(pending.images)]
+            cursor += len(pending.images)
+            results.append(
+                {
+                    **regions_result(regions, result["elapsed_time"]),
+                    "trace": result.get("trace"),
+                    "batched_requests": len(batch),
+                }
+            )
+        return results
@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import sys
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from src.constant import (
+    MODEL_TIER_ACCURATE,
+    MODEL_TIERS,
+    OCR_BACKEND_ONNX,
+    OCR_BACKEND_PADDLE,
+    REC_BATCH_SIZE,
+)
+from src.utils import RecItem, get_resource_path
+
+OCR_OPTIONS: dict[str, Any] = {
+    "use_doc_orientation_classify": False,
+    "use_doc_unwarping": False,
+    "use_textline_orientation": False,
+}
+
+
+@dataclass(frozen=True)
+class WorkerTuning:
+    """
+    子进程的推理参数，由 tuning 模块在本机校准后保存；None 表示使用推理库的默认值
+    """
+
+    cpu_threads: int | None = None
+    enable_mkldnn: bool | None = None
+    rec_batch_size: int = REC_BATCH_SIZE
+    # 批量识别时每个进程的线程数，多进程并行时吞吐量最高的线程数通常小于单进程的最佳值
+    batch_cpu_threads: int | None = None
+
+
+class OcrBackend(ABC):
+    """
+    OCR 引擎接口：加载模型、预热、批量完整识别（检测+识别）以及只识别已切好的文本行
+    """
+
+    name: str = ""
+
+    def __init__(
+        self, tier: str = MODEL_TIER_ACCURATE, tuning: WorkerTuning | None = None
+    ):
+        self.tier = tier
+        self.tuning = tuning or WorkerTuning()
+        self.det_model_path, self.rec_model_path, self.rec_model_name = MODEL_TIERS[
+            tier
+        ]
+
+    def available(self) -> bool:
+        # 模型目录不存在时（如没有下载级联识别用的轻量模型）无法加载
+        return all(
+            os.path.isdir(get_resource_path(model_path))
+            for model_path in (self.det_model_path, self.rec_model_path)
+        )
+
+    @abstractmethod
+    def load(self):
+        ...
+
+    def warm_up(self, image: np.ndarray):
+        self.predict([image], {})
+
+    @abstractmethod
+    def predict(
+        self, images: list[str | np.ndarray], det_options: dict[str, Any]
+    ) -> list[list[RecItem]]:
+        """
+        一次调用处理所有图片，返回每张图片的 [(文本, 置信度, 框)]，与输入一一对应
+        """
+
+    @abstractmethod
+    def recognize(self, strips: list[np.ndarray]) -> list[tuple[str, float]]:
+        ...
+
+    @abstractmethod
+    def identity(self) -> str:
+        """
+        参与结果缓存的键，模型或会改变识别结果的推理参数（如 MKL-DNN 开关）变化后旧缓存不再命中；
+        线程数和批大小只影响速度，不参与
+        """
+
+
+def extract_rec_items(res: Any) -> list[RecItem]:
+    try:
+        if hasattr(res, "rec_texts"):
+            texts = res.rec_texts  # pyright: ignore[reportUnknownMemberType]
+            scores = res.rec_scores  # pyright: ignore[reportUnknownMemberType]
+            boxes = res.rec_boxes  # pyright: ignore[reportUnknownMemberType]
+        elif isinstance(res, dict) and "rec_texts" in res:
+            texts = res["rec_texts"]  # pyright: ignore[reportUnknownVariableType]
+            scores = res["rec_scores"]  # pyright: ignore[reportUnknownVariableType]
+            boxes = res["rec_boxes"]  # pyright: ignore[reportUnknownVariableType]
+        else:
+            return []
+        return [
+            (text, float(score), (int(box[0]), int(box[1]), int(box[2]), int(box[3])))
+            for text, score, box in zip(texts, scores, boxes)  # pyright: ignore[reportUnknownArgumentType]
+        ]
+    except Exception as e:
+        print(f"Error accessing rec_texts: {e}", file=sys.stderr)
+        return []
+
+
+class PaddleBackend(OcrBackend):
+    name = OCR_BACKEND_PADDLE
+
+    def __init__(
+        self, tier: str = MODEL_TIER_ACCURATE, tuning: WorkerTuning | None = None
+    ):
+        super().__init__(tier, tuning)
+        self.ocr: Any = None
+        self.rec_model: Any = None
+
+    def predictor_options(self) -> dict[str, Any]:
+        options: dict[str, Any] = {}
+        if self.tuning.cpu_threads is not None:
+            options["cpu_threads"] = self.tuning.cpu_threads
+        if self.tuning.enable_mkldnn is not None:
+            options["enable_mkldnn"] = self.tuning.enable_mkldnn
+        return options
+
+    def load(self):
+        from paddleocr import PaddleOCR
+
+        self.ocr = PaddleOCR(
+            **OCR_OPTIONS,
+            **self.predictor_options(),
+            text_detection_model_dir=get_resource_path(self.det_model_path),
+            text_recognition_model_dir=get_resource_path(self.rec_model_path),
+            text_recognition_batch_size=self.tuning.rec_batch_size,
+        )
+
+    def predict(
+        self, images: list[str | np.ndarray], det_options: dict[str, Any]
+    ) -> list[list[RecItem]]:
+        if not images:
+            return []
+        result: list[Any] = self.ocr.predict(input=images, **det_options)
+        return [extract_rec_items(res) for res in result]
+
+    def recognize(self, strips: list[np.ndarray]) -> list[tuple[str, float]]:
+        if not strips:
+            return []
+        # 仅在第一次走快速识别或复查时加载单独的识别模型
+        if self.rec_model is None:
+            from paddleocr import TextRecognition
+
+            self.rec_model = TextRecognition(
+                **self.predictor_options(),
+                model_name=self.rec_model_name,
+                model_dir=get_resource_path(self.rec_model_path),
+            )
+        result: list[Any] = self.rec_model.predict(
+            input=strips, batch_size=self.tuning.rec_batch_size
+        )
+        return [(res["rec_text"], float(res["rec_score"])) for res in result]
+
+    def identity(self) -> str:
+        digest = hashlib.sha256(self.name.encode())
+        digest.update(json.dumps(OCR_OPTIONS, sort_keys=True).encode())
+        # MKL-DNN 与原生 CPU 内核的数值误差不同，可能改变识别出的文字或置信度
+        digest.update(f"mkldnn:{self.tuning.enable_mkldnn}".encode())
+        for model_path in (self.det_model_path, self.rec_model_path):
+            digest.update(model_path.encode())
+            config_path = os.path.join(get_resource_path(model_path), "inference.yml")
+            if os.path.exists(config_path):
+                with open(config_path, "rb") as f:
+                    digest.update(f.read())
+        return digest.hexdigest()
+
+
+def create_backend(
+    name: str, tier: str = MODEL_TIER_ACCURATE, tuning: WorkerTuning | None = None
+) -> OcrBackend:
+    if name == OCR_BACKEND_PADDLE:
+        return PaddleBackend(tier, tuning)
+    if name == OCR_BACKEND_ONNX:
+        # 只在选用时导入，避免未安装 onnxruntime 的环境报错
+        from src.onnx_backend import OnnxBackend
+
+        return OnnxBackend(tier, tuning)
+    raise ValueError(f"未知的OCR引擎: {name}")
+
+
+def backend_config_error(name: str) -> str | None:
+    """
+    命令行启动时先创建一次引擎（不加载模型），尽早报出引擎依赖缺失或配置无效，
+    不必等到识别进程加载模型时才失败
+    """
+    try:
+        create_backend(name)
+    except (ImportError, ValueError) as e:
+        return str(e)
+    return None
@@ -0,0 +1,284 @@
+import hashlib
+import json
+import math
+import os
+from typing import Any
+
+import cv2
+import numpy as np
+import onnxruntime as ort
+
+from src.constant import (
+    MODEL_TIER_ACCURATE,
+    OCR_BACKEND_ONNX,
+    ONNX_DET_MAX_SIDE_LIMIT,
+    ONNX_DET_MIN_BOX_SIZE,
+    ONNX_GRAPH_OPTIMIZATION,
+    ONNX_INTER_OP_THREADS,
+    ONNX_INTRA_OP_THREADS,
+    ONNX_MODEL_FILE,
+    TRACE_STAGE_DETECT,
+    TRACE_STAGE_RECOGNIZE,
+)
+from src.ocr_backend import OcrBackend, WorkerTuning
+from src.shared_image import load_image_file
+from src.tracing import stage
+from src.utils import Box, RecItem, get_resource_path
+
+GRAPH_OPTIMIZATION_LEVELS: dict[str, Any] = {
+    "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+
+def parse_thread_count(name: str, value: str) -> int:
+    # 配置来自环境变量，创建引擎时就报出无效值，而不是等到创建会话时才失败
+    if not value.strip().isdigit():
+        raise ValueError(f"{name} 必须是不小于0的整数: {value}")
+    return int(value)
+
+
+def load_model_config(model_path: str) -> dict[str, Any]:
+    # config.json 与 inference.yml 内容相同，用标准库即可读取，不依赖 PyYAML
+    with open(
+        os.path.join(get_resource_path(model_path), "config.json"), encoding="utf-8"
+    ) as f:
+        return json.load(f)
+
+
+def find_transform(config: dict[str, Any], name: str) -> dict[str, Any]:
+    for op in config["PreProcess"]["transform_ops"]:
+        if name in op:
+            return op[name] or {}
+    return {}
+
+
+def resize_for_det(
+    image: np.ndarray, det_options: dict[str, Any], resize_long: int
+) -> tuple[np.ndarray, float, float]:
+    """
+    与 PaddleOCR 的 DetResizeForTest 一致：按限制类型缩放后把宽高取整到 32 的倍数
+    """
+    height, width = image.shape[:2]
+    limit_type = det_options.get("text_det_limit_type")
+    limit_side_len = det_options.get("text_det_limit_side_len", resize_long)
+    if limit_type == "max":
+        ratio = min(limit_side_len / max(height, width), 1.0)
+    elif limit_type == "min":
+        ratio = max(limit_side_len / min(height, width), 1.0)
+    else:
+        ratio = resize_long / max(height, width)
+    ratio = min(ratio, ONNX_DET_MAX_SIDE_LIMIT / max(height, width))
+    resized_height = max(int(round(height * ratio / 32)) * 32, 32)
+    resized_width = max(int(round(width * ratio / 32)) * 32, 32)
+    resized = cv2.resize(image, (resized_width, resized_height))
+    return resized, resized_height / height, resized_width / width
+
+
+class OnnxBackend(OcrBackend):
+    """
+    用 ONNX Runtime 在CPU上运行 PP-OCRv5 的检测和识别模型，前后处理用 NumPy/OpenCV 实现，
+    不需要导入 Paddle，启动更快、内存占用更小
+    """
+
+    name = OCR_BACKEND_ONNX
+
+    def __init__(
+        self,
+        tier: str = MODEL_TIER_ACCURATE,
+        tuning: WorkerTuning | None = None,
+        inter_op_threads: int | None = None,
+        graph_optimization: str | None = None,
+    ):
+        super().__init__(tier, tuning)
+        # 参数为 None 时使用 constant 中的配置（可由环境变量覆盖）；
+        # 有校准结果时算子内线程数以校准结果为准，MKL-DNN 选项对该引擎无效
+        self.intra_op_threads = (
+            parse_thread_count("SNAPSUM4J_ONNX_INTRA_OP_THREADS", ONNX_INTRA_OP_THREADS)
+            if self.tuning.cpu_threads is None
+            else self.tuning.cpu_threads
+        )
+        self.inter_op_threads = (
+            parse_thread_count("SNAPSUM4J_ONNX_INTER_OP_THREADS", ONNX_INTER_OP_THREADS)
+            if inter_op_threads is None
+            else inter_op_threads
+        )
+        graph_optimization = graph_optimization or ONNX_GRAPH_OPTIMIZATION
+        if graph_optimization not in GRAPH_OPTIMIZATION_LEVELS:
+            raise ValueError(
+                f"未知的图优化级别: {graph_optimization}"
+                f"（可选: {'/'.join(GRAPH_OPTIMIZATION_LEVELS)}）"
+            )
+        self.graph_optimization = graph_optimization
+        self.det_session: Any = None
+        self.rec_session: Any = None
+
+    def model_file(self, model_path: str) -> str:
+        return os.path.join(get_resource_path(model_path), ONNX_MODEL_FILE)
+
+    def available(self) -> bool:
+        return all(
+            os.path.exists(self.model_file(model_path))
+            for model_path in (self.det_model_path, self.rec_model_path)
+        )
+
+    def create_session(self, model_path: str) -> Any:
+        model_file = self.model_file(model_path)
+        if not os.path.exists(model_file):
+            raise FileNotFoundError(
+                f"未找到ONNX模型 {model_file}，请先用 paddle2onnx 导出 {model_path}"
+            )
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.intra_op_threads
+        options.inter_op_num_threads = self.inter_op_threads
+        options.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS[
+            self.graph_optimization
+        ]
+        return ort.InferenceSession(
+            model_file, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+
+    def load(self):
+        det_config = load_model_config(self.det_model_path)
+        normalize = find_transform(det_config, "NormalizeImage")
+        self.det_mean = np.array(normalize["mean"], dtype=np.float32)
+        self.det_std = np.array(normalize["std"], dtype=np.float32)
+        self.det_resize_long = int(
+            find_transform(det_config, "DetResizeForTest")["resize_long"]
+        )
+        self.det_postprocess = det_config["PostProcess"]
+
+        rec_config = load_model_config(self.rec_model_path)
+        _, self.rec_height, self.rec_min_width = find_transform(
+            rec_config, "RecResizeImg"
+        )["image_shape"]
+        # CTC 解码：第 0 类是空白，字典末尾追加空格
+        self.characters = ["", *rec_config["PostProcess"]["character_dict"], " "]
+
+        self.det_session = self.create_session(self.det_model_path)
+        self.rec_session = self.create_session(self.rec_model_path)
+
+    def detect(self, image: np.ndarray, det_options: dict[str, Any]) -> list[Box]:
+        resized, ratio_h, ratio_w = resize_for_det(
+            image, det_options, self.det_resize_long
+        )
+        tensor = (resized.astype(np.float32) / 255.0 - self.det_mean) / self.det_std
+        tensor = tensor.transpose(2, 0, 1)[np.newaxis]
+        input_name = self.det_session.get_inputs()[0].name
+        prob = self.det_session.run(None, {input_name: tensor})[0][0, 0]
+
+        # DB 后处理：二值化后取连通域的外接框，用区域平均概率过滤，再按 unclip_ratio 外扩
+        bitmap = (prob > self.det_postprocess["thresh"]).astype(np.uint8)
+        count, labels, stats, _ = cv2.connectedComponentsWithStats(
+            bitmap, connectivity=4
+        )
+        sums = np.bincount(labels.ravel(), weights=prob.ravel(), minlength=count)
+        height, width = image.shape[:2]
+        boxes: list[Box] = []
+        for label in range(1, min(count, self.det_postprocess["max_candidates"] + 1)):
+            x, y, w, h, area = stats[label].tolist()
+            if min(w, h) < ONNX_DET_MIN_BOX_SIZE:
+                continue
+            if sums[label] / area < self.det_postprocess["box_thresh"]:
+                continue
+            distance = w * h * self.det_postprocess["unclip_ratio"] / (2 * (w + h))
+            boxes.append(
+                (
+                    max(int((x - distance) / ratio_w), 0),
+                    max(int((y - distance) / ratio_h), 0),
+                    min(int(math.ceil((x + w + distance) / ratio_w)), width),
+                    min(int(math.ceil((y + h + distance) / ratio_h)), height),
+                )
+            )
+        boxes.sort(key=lambda box: (box[1], box[0]))
+        return boxes
+
+    def recognize(self, strips: list[np.ndarray]) -> list[tuple[str, float]]:
+        if not strips:
+            return []
+        results: list[tuple[str, float]] = [("", 0.0)] * len(strips)
+        # 按宽高比排序后分批，减少同一批次内的填充
+        order = sorted(
+            range(len(strips)), key=lambda i: strips[i].shape[1] / strips[i].shape[0]
+        )
+        input_name = self.rec_session.get_inputs()[0].name
+        batch_size = self.tuning.rec_batch_size
+        for start in range(0, len(order), batch_size):
+            indexes = order[start : start + batch_size]
+            max_ratio = max(
+                self.rec_min_width / self.rec_height,
+                *(strips[i].shape[1] / strips[i].shape[0] for i in indexes),
+            )
+            batch_width = int(math.ceil(self.rec_height * max_ratio))
+            batch = np.zeros(
+                (len(indexes), 3, self.rec_height, batch_width), dtype=np.float32
+            )
+            for row, index in enumerate(indexes):
+                strip = strips[index]
+                resized_width = min(
+                    batch_width,
+                    int(math.ceil(self.rec_height * strip.shape[1] / strip.shape[0])),
+                )
+                resized = cv2.resize(strip, (resized_width, self.rec_height))
+                normalized = (resized.astype(np.float32) / 255.0 - 0.5) / 0.5
+                batch[row, :, :, :resized_width] = normalized.transpose(2, 0, 1)
+            preds = self.rec_session.run(None, {input_name: batch})[0]
+            for index, text_score in zip(indexes, self.ctc_decode(preds)):
+                results[index] = text_score
+        return results
+
+    def ctc_decode(self, preds: np.ndarray) -> list[tuple[str, float]]:
+        decoded: list[tuple[str, float]] = []
+        for indices, probs in zip(preds.argmax(axis=2), preds.max(axis=2)):
+            keep = indices != 0
+            keep[1:] &= indices[1:] != indices[:-1]
+            text = "".join(self.characters[i] for i in indices[keep].tolist())
+            decoded.append((text, float(probs[keep].mean()) if keep.any() else 0.0))
+        return decoded
+
+    def predict(
+        self, images: list[str | np.ndarray], det_options: dict[str, Any]
+    ) -> list[list[RecItem]]:
+        arrays = [
+            load_image_file(image) if isinstance(image, str) else image
+            for image in images
+        ]
+        with stage(TRACE_STAGE_DETECT):
+            all_boxes = [self.detect(image, det_options) for image in arrays]
+        # 所有图片的文本行合并成一次批量识别
+        strips = [
+            image[y1:y2, x1:x2]
+            for image, boxes in zip(arrays, all_boxes)
+            for x1, y1, x2, y2 in boxes
+        ]
+        with stage(TRACE_STAGE_RECOGNIZE):
+            rec_results = self.recognize(strips)
+        outputs: list[list[RecItem]] = []
+        cursor = 0
+        for boxes in all_boxes:
+            outputs.append(
+                [
+                    (text, score, box)
+                    for (text, score), box in zip(
+                        rec_results[cursor : cursor + len(boxes)], boxes
+                    )
+                    if text
+                ]
+            )
+            cursor += len(boxes)
+        return outputs
+
+    def identity(self) -> str:
+        digest = hashlib.sha256(self.name.encode())
+        # 图优化会融合算子，数值误差可能改变识别结果
+        digest.update(f"graph_optimization:{self.graph_optimization}".encode())
+        for model_path in (self.det_model_path, self.rec_model_path):
+            digest.update(model_path.encode())
+            model_file = self.model_file(model_path)
+            # 模型文件较大，用大小和修改时间代替内容哈希
+            if os.path.exists(model_file):
+                stat = os.stat(model_file)
+                digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return digest.hexdigest()
@@ -0,0 +1,92 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+
+from PIL import Image
+
+from src.constant import PAGE_PREFETCH, PAGE_STREAM_POLL_INTERVAL
+from src.shared_image import SharedImage, release_shared_image, share_image
+
+
+def page_count(image_path: str) -> int:
+    try:
+        with Image.open(image_path) as image:
+            return getattr(image, "n_frames", 1)
+    except Exception:
+        # 无法读取的文件交给预览窗口报错
+        return 1
+
+
+@dataclass
+class DecodedPage:
+    index: int
+    shm: SharedMemory | None = None
+    handle: SharedImage | None = None
+    decode_time: float = 0.0
+    error: str = ""
+
+
+class PageStream:
+    """
+    逐页读取多页 TIFF/GIF：后台线程用 seek 每次只解码一页并写入共享内存，最多预读 PAGE_PREFETCH 页。
+    识别第 N 页时第 N+1 页已在解码，整个文档不会同时留在内存中
+    """
+
+    def __init__(self, image_path: str):
+        self.image_path = image_path
+        self.pages = page_count(image_path)
+        # 全部页面读完后放入 None
+        self.queue: queue.Queue[DecodedPage | None] = queue.Queue(maxsize=PAGE_PREFETCH)
+        self.stopped = threading.Event()
+        threading.Thread(target=self.read, daemon=True).start()
+
+    def read(self):
+        try:
+            with Image.open(self.image_path) as image:
+                for index in range(self.pages):
+                    if self.stopped.is_set():
+                        return
+                    start_time = time.perf_counter()
+                    image.seek(index)
+                    shm, handle = share_image(image)
+                    page = DecodedPage(
+                        index, shm, handle, time.perf_counter() - start_time
+                    )
+                    if not self.offer(page):
+                        release_shared_image(shm)
+                        return
+        except Exception as e:
+            self.offer(DecodedPage(index=-1, error=str(e)))
+            return
+        self.offer(None)
+
+    def offer(self, page: DecodedPage | None) -> bool:
+        # 识别跟不上解码时在这里等待，关闭后放弃
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(page, timeout=PAGE_STREAM_POLL_INTERVAL)
+            except queue.Full:
+                continue
+            if self.stopped.is_set():
+                # 放入时恰好被关闭，由这里释放
+                self.close()
+            return True
+        return False
+
+    def poll(self) -> DecodedPage | None:
+        """
+        不阻塞地取下一页：还没解码完成时抛出 queue.Empty，返回 None 表示已读完全部页面
+        """
+        return self.queue.get_nowait()
+
+    def close(self):
+        self.stopped.set()
+        while True:
+            try:
+                page = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            if page is not None:
+                release_shared_image(page.shm)
@@ -1,11 +1,14 @@
-import os
 import tkinter as tk
 from tkinter import messagebox
 from typing import Callable
 
-from PIL import Image, ImageTk
+from PIL import Image
 
-from src.constant import PREVIEW_RECT_MIN_LENGTH, SCALE_FACTOR, TEMP_FILE_NAME
+from src.constant import (
+    PREVIEW_MAX_SCREEN_RATIO,
+    PREVIEW_RECT_MIN_LENGTH,
+    PREVIEW_ZOOM_STEP,
+)
 from src.gui_constant import (
     PREVIEW_BUTTON_FRAME_PADY,
     PREVIEW_CONFIRM_BUTTON_FONT,
@@ -20,32 +23,56 @@ from src.gui_constant import (
     PREVIEW_HINT_TEXT,
     PREVIEW_OUTLINE_COLOR,
     PREVIEW_OUTLINE_WIDTH,
+    PREVIEW_REGION_BUTTON_PADX,
+    PREVIEW_REGION_DOWN_TEXT,
+    PREVIEW_REGION_FRAME_PADY,
+    PREVIEW_REGION_ITEM_TEXT,
+    PREVIEW_REGION_LABEL_FONT,
+    PREVIEW_REGION_LABEL_OFFSET,
+    PREVIEW_REGION_LIST_HEIGHT,
+    PREVIEW_REGION_LIST_WIDTH,
+    PREVIEW_REGION_REMOVE_TEXT,
+    PREVIEW_REGION_UP_TEXT,
+    PREVIEW_SCROLL_UNITS,
     PREVIEW_WARNING_MESSAGE,
     PREVIEW_WARNING_TITLE,
     PREVIEW_WINDOW_RELAX_HEIGHT,
     PREVIEW_WINDOW_TITLE,
 )
+from src.image_viewport import ImageViewport
+from src.utils import calculate_initial_zoom
 
 
 class PreviewWindow(tk.Toplevel):
     def __init__(
         self,
         root: tk.Tk,
-        image_path_var: tk.StringVar,
-        recognize_digits: Callable[[], None],
+        recognize_digits: Callable[[Image.Image | list[Image.Image]], None],
     ):
         super().__init__(root)
         self.root = root
-        self.image_path_var = image_path_var
         self.recognize_digits = recognize_digits
+        # 已框选的区域：(原图坐标, 矩形框ID, 序号标签ID)，按识别顺序排列
+        self.regions: list[tuple[tuple[int, int, int, int], int, int]] = []
 
-    def add_image(self, image: Image.Image, scaled_size: tuple[int, int]):
+    def add_image(self, image: Image.Image):
         try:
-            self.photo = ImageTk.PhotoImage(image.resize(scaled_size))
             self.enable_root(False)
-            self.create_preview_window(scaled_size)
-            canvas = self.create_canvas(scaled_size)
+            max_size = (
+                int(self.winfo_screenwidth() * PREVIEW_MAX_SCREEN_RATIO),
+                int(self.winfo_screenheight() * PREVIEW_MAX_SCREEN_RATIO)
+                - PREVIEW_WINDOW_RELAX_HEIGHT,
+            )
+            zoom = calculate_initial_zoom(image.size, max_size)
+            view_size = (
+                max(int(image.width * zoom), 1),
+                max(int(image.height * zoom), 1),
+            )
+            self.create_preview_window(view_size)
+            canvas = self.create_canvas(image, zoom, view_size)
+            self.handle_view_events(canvas)
             on_confirm = self.handle_select_region_events(canvas, image)
+            self.create_region_panel(canvas)
             self.create_confirm_button(on_confirm)
             self.create_hint_label()
         except Exception as e:
@@ -60,11 +87,9 @@ class PreviewWindow(tk.Toplevel):
             "-disabled", not enabled
         )
 
-    def create_preview_window(self, scaled_size: tuple[int, int]):
+    def create_preview_window(self, view_size: tuple[int, int]):
         self.title(PREVIEW_WINDOW_TITLE)
-        self.geometry(
-            f"{scaled_size[0]}x{scaled_size[1] + PREVIEW_WINDOW_RELAX_HEIGHT}"
-        )
+        self.geometry(f"{view_size[0]}x{view_size[1] + PREVIEW_WINDOW_RELAX_HEIGHT}")
         self.resizable(True, True)
 
         def on_window_close():
@@ -77,14 +102,11 @@ class PreviewWindow(tk.Toplevel):
         start_x = None
         start_y = None
         rect = None
-        selected_region = None
 
         def on_mouse_down(event: tk.Event):
             nonlocal start_x, start_y, rect
             start_x = int(canvas.canvasx(event.x))  # type: ignore[reportUnknownMemberType]
             start_y = int(canvas.canvasy(event.y))  # type: ignore[reportUnknownMemberType]
-            if rect:
-                canvas.delete(rect)
             rect = canvas.create_rectangle(
                 start_x,
                 start_y,
@@ -105,7 +127,7 @@ class PreviewWindow(tk.Toplevel):
                 canvas.coords(rect, start_x, start_y, current_x, current_y)
 
         def on_mouse_up(event: tk.Event):
-            nonlocal selected_region, start_x, start_y
+            nonlocal start_x, start_y, rect
             if start_x is not None and start_y is not None:
                 end_x = int(canvas.canvasx(event.x))  # type: ignore[reportUnknownMemberType]
                 end_y = int(canvas.canvasy(event.y))  # type: ignore[reportUnknownMemberType]
@@ -123,33 +145,43 @@ class PreviewWindow(tk.Toplevel):
                     x2 - x1 > PREVIEW_RECT_MIN_LENGTH
                     and y2 - y1 > PREVIEW_RECT_MIN_LENGTH
                 ):
-                    selected_region = (x1, y1, x2, y2)
+                    image_x1, image_y1 = self.viewport.to_image(x1, y1)
+                    image_x2, image_y2 = self.viewport.to_image(x2, y2)
+                    self.add_region(
+                        canvas, (image_x1, image_y1, image_x2, image_y2), rect
+                    )
                 else:
-                    selected_region = None
+                    canvas.delete(rect)
                     messagebox.showinfo(
                         PREVIEW_WARNING_TITLE,
                         PREVIEW_WARNING_MESSAGE,
                     )
 
+                rect = None
                 start_x = None
                 start_y = None
 
+        def on_right_click(event: tk.Event):
+            x, y = self.viewport.to_image(
+                canvas.canvasx(event.x),  # type: ignore[reportUnknownMemberType]
+                canvas.canvasy(event.y),  # type: ignore[reportUnknownMemberType]
+            )
+            # 重叠时删除最后添加的那个区域
+            for index in reversed(range(len(self.regions))):
+                x1, y1, x2, y2 = self.regions[index][0]
+                if x1 <= x <= x2 and y1 <= y <= y2:
+                    self.remove_region(canvas, index)
+                    break
+
         def on_confirm():
-            nonlocal selected_region
-            if selected_region:
-                original_x1 = int(selected_region[0] / SCALE_FACTOR)
-                original_y1 = int(selected_region[1] / SCALE_FACTOR)
-                original_x2 = int(selected_region[2] / SCALE_FACTOR)
-                original_y2 = int(selected_region[3] / SCALE_FACTOR)
-                cropped_image = image.crop(
-                    (original_x1, original_y1, original_x2, original_y2)
-                )
-                temp_file = os.path.join(os.path.abspath("."), TEMP_FILE_NAME)
-                cropped_image.save(temp_file)
-                self.image_path_var.set(temp_file)
+            if self.regions:
+                cropped_images = [image.crop(coords) for coords, _, _ in self.regions]
                 self.destroy()
                 self.enable_root(True)
-                self.recognize_digits()
+                if len(cropped_images) == 1:
+                    self.recognize_digits(cropped_images[0])
+                else:
+                    self.recognize_digits(cropped_images)
             else:
                 messagebox.showinfo(
                     PREVIEW_CONFIRM_WARNING_TITLE,
@@ -159,20 +191,159 @@ class PreviewWindow(tk.Toplevel):
         canvas.bind("<Button-1>", on_mouse_down)
         canvas.bind("<B1-Motion>", on_mouse_move)
         canvas.bind("<ButtonRelease-1>", on_mouse_up)
+        canvas.bind("<Button-3>", on_right_click)
         return on_confirm
 
+    def add_region(
+        self, canvas: tk.Canvas, coords: tuple[int, int, int, int], rect: int
+    ):
+        x, y = self.viewport.to_canvas(coords[0], coords[1])
+        label = canvas.create_text(
+            x + PREVIEW_REGION_LABEL_OFFSET,
+            y + PREVIEW_REGION_LABEL_OFFSET,
+            anchor=tk.NW,
+            fill=PREVIEW_OUTLINE_COLOR,
+            font=PREVIEW_REGION_LABEL_FONT,
+        )
+        self.regions.append((coords, rect, label))
+        self.refresh_regions(canvas)
+
+    def remove_region(self, canvas: tk.Canvas, index: int):
+        _, rect, label = self.regions.pop(index)
+        canvas.delete(rect)
+        canvas.delete(label)
+        self.refresh_regions(canvas)
+
+    def move_region(self, canvas: tk.Canvas, index: int, offset: int):
+        target = index + offset
+        if 0 <= target < len(self.regions):
+            self.regions[index], self.regions[target] = (
+                self.regions[target],
+                self.regions[index],
+            )
+            self.refresh_regions(canvas)
+            self.region_listbox.selection_set(target)
+
+    def refresh_regions(self, canvas: tk.Canvas):
+        self.region_listbox.delete(0, tk.END)
+        for index, (coords, _, label) in enumerate(self.regions):
+            canvas.itemconfigure(label, text=str(index + 1))
+            self.region_listbox.insert(
+                tk.END,
+                PREVIEW_REGION_ITEM_TEXT.format(
+                    index=index + 1,
+                    width=coords[2] - coords[0],
+                    height=coords[3] - coords[1],
+                ),
+            )
+
+    def redraw_regions(self, canvas: tk.Canvas):
+        # 缩放后按原图坐标重新摆放矩形框和序号标签
+        for coords, rect, label in self.regions:
+            x1, y1 = self.viewport.to_canvas(coords[0], coords[1])
+            x2, y2 = self.viewport.to_canvas(coords[2], coords[3])
+            canvas.coords(rect, x1, y1, x2, y2)
+            canvas.coords(
+                label,
+                x1 + PREVIEW_REGION_LABEL_OFFSET,
+                y1 + PREVIEW_REGION_LABEL_OFFSET,
+            )
+
+    def create_region_panel(self, canvas: tk.Canvas):
+        region_frame = tk.Frame(self)
+        region_frame.pack(pady=PREVIEW_REGION_FRAME_PADY)
+        self.region_listbox = tk.Listbox(
+            region_frame,
+            height=PREVIEW_REGION_LIST_HEIGHT,
+            width=PREVIEW_REGION_LIST_WIDTH,
+            exportselection=False,
+        )
+        self.region_listbox.pack(side=tk.LEFT, padx=PREVIEW_REGION_BUTTON_PADX)
+
+        def selected_index() -> int | None:
+            selection = self.region_listbox.curselection()
+            return selection[0] if selection else None
+
+        def on_move(offset: int):
+            index = selected_index()
+            if index is not None:
+                self.move_region(canvas, index, offset)
+
+        def on_remove():
+            index = selected_index()
+            if index is not None:
+                self.remove_region(canvas, index)
+
+        for text, command in (
+            (PREVIEW_REGION_UP_TEXT, lambda: on_move(-1)),
+            (PREVIEW_REGION_DOWN_TEXT, lambda: on_move(1)),
+            (PREVIEW_REGION_REMOVE_TEXT, on_remove),
+        ):
+            tk.Button(region_frame, text=text, command=command).pack(
+                side=tk.LEFT, padx=PREVIEW_REGION_BUTTON_PADX
+            )
+
     def create_canvas(
         self,
-        scaled_size: tuple[int, int],
+        image: Image.Image,
+        zoom: float,
+        view_size: tuple[int, int],
     ):
-        canvas = tk.Canvas(self, width=scaled_size[0], height=scaled_size[1])
-        canvas.pack()
-        assert (
-            self.photo is not None
-        ), "photo must be initialized before calling create_canvas"
-        canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)  # type: ignore[reportUnknownMemberType]
+        canvas_frame = tk.Frame(self)
+        canvas_frame.pack(fill=tk.BOTH, expand=True)
+        canvas_frame.rowconfigure(0, weight=1)
+        canvas_frame.columnconfigure(0, weight=1)
+
+        canvas = tk.Canvas(
+            canvas_frame, width=view_size[0], height=view_size[1], highlightthickness=0
+        )
+        x_scrollbar = tk.Scrollbar(
+            canvas_frame, orient=tk.HORIZONTAL, command=canvas.xview
+        )
+        y_scrollbar = tk.Scrollbar(
+            canvas_frame, orient=tk.VERTICAL, command=canvas.yview
+        )
+        canvas.grid(row=0, column=0, sticky=tk.NSEW)
+        y_scrollbar.grid(row=0, column=1, sticky=tk.NS)
+        x_scrollbar.grid(row=1, column=0, sticky=tk.EW)
+        # 只把可见区域的切片画到画布上，不再为整张放大图创建 PhotoImage
+        self.viewport = ImageViewport(canvas, image, zoom)
+
+        def on_scroll(scrollbar: tk.Scrollbar, first: str, last: str):
+            scrollbar.set(first, last)
+            self.viewport.schedule_render()
+
+        canvas.configure(
+            xscrollcommand=lambda first, last: on_scroll(x_scrollbar, first, last),
+            yscrollcommand=lambda first, last: on_scroll(y_scrollbar, first, last),
+        )
         return canvas
 
+    def handle_view_events(self, canvas: tk.Canvas):
+        def on_zoom(event: tk.Event, direction: int):
+            factor = PREVIEW_ZOOM_STEP if direction > 0 else 1 / PREVIEW_ZOOM_STEP
+            self.viewport.set_zoom(self.viewport.zoom * factor, event.x, event.y)
+            self.redraw_regions(canvas)
+
+        def on_scroll(direction: int, horizontal: bool = False):
+            units = -PREVIEW_SCROLL_UNITS if direction > 0 else PREVIEW_SCROLL_UNITS
+            if horizontal:
+                canvas.xview_scroll(units, "units")
+            else:
+                canvas.yview_scroll(units, "units")
+
+        canvas.bind("<Configure>", lambda _: self.viewport.schedule_render())
+        # Windows/macOS 使用 MouseWheel 事件，Linux(X11) 使用 Button-4/5
+        canvas.bind("<Control-MouseWheel>", lambda e: on_zoom(e, e.delta))
+        canvas.bind("<Control-Button-4>", lambda e: on_zoom(e, 1))
+        canvas.bind("<Control-Button-5>", lambda e: on_zoom(e, -1))
+        canvas.bind("<MouseWheel>", lambda e: on_scroll(e.delta))
+        canvas.bind("<Shift-MouseWheel>", lambda e: on_scroll(e.delta, True))
+        canvas.bind("<Button-4>", lambda _: on_scroll(1))
+        canvas.bind("<Button-5>", lambda _: on_scroll(-1))
+        canvas.bind("<Shift-Button-4>", lambda _: on_scroll(1, True))
+        canvas.bind("<Shift-Button-5>", lambda _: on_scroll(-1, True))
+
     def create_confirm_button(self, on_confirm: Callable[[], None]):
         button_frame = tk.Frame(self)
         button_frame.pack(pady=PREVIEW_BUTTON_FRAME_PADY)
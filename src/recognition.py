@@ -0,0 +1,577 @@
+import hashlib
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Sequence
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageOps
+
+from src.constant import (
+    CASCADE_BOX_PADDING,
+    CASCADE_ESCALATE_IMAGE,
+    CASCADE_MIN_SCORE,
+    CASCADE_NUMERIC_RATIO,
+    CASCADE_UNAVAILABLE_WARNING,
+    DET_TILE_OVERLAP,
+    DET_TILE_SIZE,
+    DET_TILE_TRIGGER_SIDE,
+    JOB_CANCELLED_ERROR,
+    MODEL_TIER_ACCURATE,
+    MODEL_TIER_FAST,
+    MODEL_TIERS,
+    OCR_BACKEND,
+    PIPELINE_FULL,
+    PIPELINE_REC_ONLY,
+    PIPELINE_TILED,
+    RECHECK_SCALE,
+    RESULT_CACHE_DIR,
+    RESULT_CACHE_DISK_MAX_ENTRIES,
+    RESULT_CACHE_MAX_ENTRIES,
+    RESULT_CACHE_VERSION,
+    TRACE_STAGE_CACHE,
+    TRACE_STAGE_DECODE,
+    TRACE_STAGE_FILTER,
+    TRACE_STAGE_OCR,
+    TRACE_STAGE_SPLIT,
+    TRACE_STAGE_TRIM,
+    TUNE_ON_STARTUP,
+    WARMUP_IMAGE_SIZE,
+    WARMUP_IMAGE_TEXT,
+    WORKER_STATE_FAILED,
+    WORKER_STATE_LOADING,
+    WORKER_STATE_READY,
+    WORKER_STATE_TUNING,
+    WORKER_STATE_WARMING,
+)
+from src.line_split import content_box, split_text_lines
+from src.ocr_backend import OcrBackend, WorkerTuning, create_backend
+from src.result_cache import RecognitionCache
+from src.shared_image import (
+    SharedImage,
+    load_image_file,
+    load_shared_image,
+    to_bgr_array,
+)
+from src.table_layout import table_layout
+from src.tiling import merge_tile_results, plan_tiles
+from src.tracing import stage, traced
+from src.tuning import load_tuning, tune
+from src.utils import Box, RecItem
+
+# 全局变量，用于存储OCR引擎（在子进程中初始化）
+# 按模型档位保存已加载的引擎，准确档在进程初始化时加载，快速档在第一次级联识别时加载
+global_backends: dict[str, OcrBackend] = {}
+global_backend_name: str = OCR_BACKEND
+# 本机校准得到的推理参数，None 表示使用推理库的默认值
+global_tuning: WorkerTuning | None = None
+# 没有校准结果时是否在加载模型前自动校准；进程池的识别进程由主进程统一校准，不自行校准
+global_auto_tune: bool = TUNE_ON_STARTUP
+global_cache: RecognitionCache | None = None
+# GUI 取消或替换当前任务时被置位
+global_cancel_event: Any = None
+# 调用 preload_models 的进程号；其他进程中不为 None 说明模型是经 fork 继承的
+global_preloaded_by: int | None = None
+
+ADAPTIVE_DET_OPTIONS: dict[str, Any] = {
+    "text_det_limit_type": "max",
+    "text_det_limit_side_len": DET_TILE_SIZE,
+}
+
+
+@dataclass(frozen=True)
+class RecognitionOptions:
+    # 单列数字跳过文字检测
+    fast_path: bool = False
+    # 大图切片检测、小图不放大
+    adaptive_det: bool = True
+    # 级联识别的升级范围（boxes/image），None 表示只用服务端模型
+    cascade: str | None = None
+    # 检测前裁掉空白边缘，只把有内容的范围送去识别
+    auto_trim: bool = True
+    # 按框的位置把数字聚成列和行，分别求小计
+    table: bool = False
+
+    def cache_tag(self) -> str:
+        # 表格布局由缓存的数字和框直接算出，开关表格模式仍然命中同一条缓存
+        values = asdict(self)
+        del values["table"]
+        return json.dumps(values, sort_keys=True)
+
+
+def model_identity(backend_name: str, tuning: WorkerTuning | None = None) -> str:
+    # 引擎、任一档位的模型配置或影响结果的推理参数变化后，旧的缓存结果不再命中
+    digest = hashlib.sha256(str(RESULT_CACHE_VERSION).encode())
+    for tier in MODEL_TIERS:
+        digest.update(create_backend(backend_name, tier, tuning).identity().encode())
+    return digest.hexdigest()
+
+
+def report_worker_state(
+    status_queue: Any, state: str, elapsed_time: float = 0.0, error: str = ""
+):
+    if status_queue is not None:
+        status_queue.put((state, elapsed_time, error))
+
+
+def create_warmup_image() -> np.ndarray:
+    # 画一行数字，保证预热时检测和识别两个模型都会真正执行一次
+    image = Image.new("RGB", WARMUP_IMAGE_SIZE, "white")
+    ImageDraw.Draw(image).text((10, 10), WARMUP_IMAGE_TEXT, fill="black")
+    return to_bgr_array(image)
+
+
+def load_models(status_queue: Any = None) -> OcrBackend:
+    global global_cache, global_tuning
+    if global_tuning is None:
+        global_tuning = load_tuning(global_backend_name)
+    if global_tuning is None and global_auto_tune:
+        report_worker_state(status_queue, WORKER_STATE_TUNING)
+        global_tuning = tune(global_backend_name)
+    report_worker_state(status_queue, WORKER_STATE_LOADING)
+    start_time = time.time()
+    if global_cache is None:
+        global_cache = RecognitionCache(
+            RESULT_CACHE_MAX_ENTRIES,
+            RESULT_CACHE_DIR,
+            model_identity(global_backend_name, global_tuning),
+            RESULT_CACHE_VERSION,
+            RESULT_CACHE_DISK_MAX_ENTRIES,
+        )
+    backend = create_backend(global_backend_name, MODEL_TIER_ACCURATE, global_tuning)
+    backend.load()
+    report_worker_state(status_queue, WORKER_STATE_WARMING, time.time() - start_time)
+    return backend
+
+
+def warm_up_backend(status_queue: Any, backend: OcrBackend):
+    start_time = time.time()
+    backend.warm_up(create_warmup_image())
+    report_worker_state(status_queue, WORKER_STATE_READY, time.time() - start_time)
+
+
+def preload_models(backend_name: str, tuning: WorkerTuning | None = None):
+    """
+    在父进程中加载准确档模型但不预热（预热会创建推理线程池，fork 出的子进程无法使用），
+    之后以 fork 方式启动的识别进程直接继承已加载的模型，权重所在的内存页与父进程写时复制共享
+    """
+    global global_auto_tune, global_backend_name, global_preloaded_by, global_tuning
+    global_backend_name = backend_name
+    global_auto_tune = False
+    if tuning is not None:
+        global_tuning = tuning
+    global_backends[MODEL_TIER_ACCURATE] = load_models()
+    global_preloaded_by = os.getpid()
+
+
+# 进程池初始化函数，确保每个子进程只加载一次模型
+def init_worker(
+    status_queue: Any = None,
+    cancel_event: Any = None,
+    backend_name: str | None = None,
+    tuning: WorkerTuning | None = None,
+    auto_tune: bool | None = None,
+):
+    global global_auto_tune, global_backend_name, global_cancel_event
+    global global_preloaded_by, global_tuning
+    if auto_tune is not None:
+        global_auto_tune = auto_tune
+    if cancel_event is not None:
+        global_cancel_event = cancel_event
+    if backend_name is not None:
+        global_backend_name = backend_name
+    if tuning is not None:
+        global_tuning = tuning
+    if global_preloaded_by not in (None, os.getpid()):
+        # 模型已由父进程加载并经 fork 继承，只需在本进程预热
+        global_preloaded_by = os.getpid()
+        try:
+            warm_up_backend(status_queue, global_backends[MODEL_TIER_ACCURATE])
+        except Exception as e:
+            print(f"Error warming up shared OCR worker: {e}", file=sys.stderr)
+            report_worker_state(status_queue, WORKER_STATE_FAILED, error=str(e))
+        return
+    if MODEL_TIER_ACCURATE not in global_backends:
+        try:
+            backend = load_models(status_queue)
+            warm_up_backend(status_queue, backend)
+            global_backends[MODEL_TIER_ACCURATE] = backend
+        except Exception as e:
+            # 初始化失败时不抛出，避免进程池反复重启子进程；识别时会再次尝试加载
+            print(f"Error initializing OCR worker: {e}", file=sys.stderr)
+            report_worker_state(status_queue, WORKER_STATE_FAILED, error=str(e))
+
+
+def disable_result_cache():
+    # 基准测试需要每次都真正执行识别；在 init_worker 之前调用
+    global global_cache
+    global_cache = RecognitionCache(0, None, "")
+
+
+def check_cancelled():
+    # 只能在识别阶段之间检查，单次模型推理无法中途打断
+    if global_cancel_event is not None and global_cancel_event.is_set():
+        raise RuntimeError(JOB_CANCELLED_ERROR)
+
+
+def is_number(text: str) -> bool:
+    return text.replace(".", "", 1).isdigit()
+
+
+def looks_numeric(text: str) -> bool:
+    digits = sum(char.isdigit() for char in text)
+    return digits > 0 and digits >= CASCADE_NUMERIC_RATIO * len(text)
+
+
+def needs_escalation(text: str, score: float) -> bool:
+    # 置信度不足的数字，或者看起来是数字却不是合法格式（如 1O5、12..3）的文本
+    if is_number(text):
+        return score < CASCADE_MIN_SCORE
+    return looks_numeric(text)
+
+
+def tier_available(tier: str, backend_name: str | None = None) -> bool:
+    return create_backend(backend_name or global_backend_name, tier).available()
+
+
+def cascade_unavailable_warning(backend_name: str | None = None) -> str | None:
+    if tier_available(MODEL_TIER_FAST, backend_name):
+        return None
+    det_model_path, rec_model_path, _ = MODEL_TIERS[MODEL_TIER_FAST]
+    return CASCADE_UNAVAILABLE_WARNING.format(det=det_model_path, rec=rec_model_path)
+
+
+def get_backend(tier: str) -> OcrBackend:
+    backend = global_backends.get(tier)
+    if backend is None:
+        backend = create_backend(global_backend_name, tier, global_tuning)
+        backend.load()
+        global_backends[tier] = backend
+    return backend
+
+
+def recognize_lines(
+    strips: list[np.ndarray], backend: OcrBackend
+) -> list[tuple[str, float]]:
+    return backend.recognize(strips)
+
+
+def predict_items(
+    inputs: list[str | np.ndarray], adaptive_det: bool, backend: OcrBackend
+) -> list[list[RecItem]]:
+    # 一次 predict 调用处理所有图片，结果与输入一一对应
+    return backend.predict(inputs, ADAPTIVE_DET_OPTIONS if adaptive_det else {})
+
+
+def recognize_images(
+    images: list[str | np.ndarray], options: RecognitionOptions, backend: OcrBackend
+) -> list[tuple[str, list[RecItem]]]:
+    """
+    批量识别多张图片，返回每张图片的 (识别流程, [(文本, 置信度, 框)])。
+    单列快速识别的所有文本行合并成一个识别批次；其余图片以及大图切片合并成一次完整流程调用
+    """
+    outputs: dict[int, tuple[str, list[RecItem]]] = {}
+    if options.fast_path:
+        line_jobs: list[tuple[int, list[Box]]] = []
+        strips: list[np.ndarray] = []
+        for index, image in enumerate(images):
+            assert isinstance(image, np.ndarray)
+            with stage(TRACE_STAGE_SPLIT):
+                line_boxes = split_text_lines(image)
+            if line_boxes:
+                line_jobs.append((index, line_boxes))
+                strips.extend(image[y1:y2, x1:x2] for x1, y1, x2, y2 in line_boxes)
+        line_results = recognize_lines(strips, backend)
+        cursor = 0
+        for index, line_boxes in line_jobs:
+            outputs[index] = (
+                PIPELINE_REC_ONLY,
+                [
+                    (text, score, box)
+                    for (text, score), box in zip(
+                        line_results[cursor : cursor + len(line_boxes)], line_boxes
+                    )
+                ],
+            )
+            cursor += len(line_boxes)
+        check_cancelled()
+
+    inputs: list[str | np.ndarray] = []
+    plans: list[tuple[int, list[Box] | None]] = []
+    for index, image in enumerate(images):
+        if index in outputs:
+            continue
+        # 超大图按原始分辨率切片检测；其余图片只缩小不放大，小截图不再被放大到960
+        if options.adaptive_det:
+            assert isinstance(image, np.ndarray)
+            height, width = image.shape[:2]
+            if max(height, width) > DET_TILE_TRIGGER_SIDE:
+                tiles = plan_tiles(width, height, DET_TILE_SIZE, DET_TILE_OVERLAP)
+                inputs.extend(image[y1:y2, x1:x2] for x1, y1, x2, y2 in tiles)
+                plans.append((index, tiles))
+                continue
+        inputs.append(image)
+        plans.append((index, None))
+
+    items = predict_items(inputs, options.adaptive_det, backend)
+    cursor = 0
+    for index, tiles in plans:
+        if tiles is None:
+            outputs[index] = (PIPELINE_FULL, items[cursor])
+            cursor += 1
+            continue
+        height, width = images[index].shape[:2]  # pyright: ignore[reportAttributeAccessIssue]
+        merged = merge_tile_results(
+            list(zip(tiles, items[cursor : cursor + len(tiles)])), width, height
+        )
+        outputs[index] = (PIPELINE_TILED, merged)
+        cursor += len(tiles)
+    return [outputs[index] for index in range(len(images))]
+
+
+def cascade_images(
+    images: list[np.ndarray], options: RecognitionOptions
+) -> list[tuple[str, list[RecItem], list[str]]]:
+    """
+    先用快速档模型识别，只把没通过置信度或数字格式检查的文本框（或整张图）交给准确档模型，
+    返回每张图片的 (识别流程, [(文本, 置信度, 框)], 每个文本来自的模型档位)
+    """
+    outputs = [
+        (pipeline, items, [MODEL_TIER_FAST] * len(items))
+        for pipeline, items in recognize_images(
+            images, options, get_backend(MODEL_TIER_FAST)
+        )
+    ]
+    check_cancelled()
+
+    whole_images: list[int] = []
+    box_jobs: list[tuple[int, int]] = []
+    strips: list[np.ndarray] = []
+    for index, (_, items, _) in enumerate(outputs):
+        failing = [
+            position
+            for position, (text, score, _) in enumerate(items)
+            if needs_escalation(text, score)
+        ]
+        # 快速档什么都没检测到时也可能是漏检，整张图交给准确档
+        if not items or (failing and options.cascade == CASCADE_ESCALATE_IMAGE):
+            whole_images.append(index)
+            continue
+        image = images[index]
+        for position in failing:
+            x1, y1, x2, y2 = items[position][2]
+            box_jobs.append((index, position))
+            strips.append(
+                image[
+                    max(y1 - CASCADE_BOX_PADDING, 0) : y2 + CASCADE_BOX_PADDING,
+                    max(x1 - CASCADE_BOX_PADDING, 0) : x2 + CASCADE_BOX_PADDING,
+                ]
+            )
+    if not whole_images and not box_jobs:
+        return outputs
+
+    accurate = get_backend(MODEL_TIER_ACCURATE)
+    for (index, position), (text, score) in zip(
+        box_jobs, recognize_lines(strips, accurate)
+    ):
+        items, tiers = outputs[index][1], outputs[index][2]
+        items[position] = (text, score, items[position][2])
+        tiers[position] = MODEL_TIER_ACCURATE
+    for index, (pipeline, items) in zip(
+        whole_images,
+        recognize_images([images[index] for index in whole_images], options, accurate),
+    ):
+        outputs[index] = (pipeline, items, [MODEL_TIER_ACCURATE] * len(items))
+    return outputs
+
+
+def trim_image(image: np.ndarray) -> tuple[np.ndarray, Box, int]:
+    """
+    裁掉空白边缘，返回 (裁剪后的图片, 裁剪框, 裁掉的像素数)；没有内容的图片保持原样，由识别流程给出空结果
+    """
+    height, width = image.shape[:2]
+    x1, y1, x2, y2 = content_box(image) or (0, 0, width, height)
+    removed = width * height - (x2 - x1) * (y2 - y1)
+    return image[y1:y2, x1:x2], (x1, y1, x2, y2), removed
+
+
+def offset_items(items: list[RecItem], dx: int, dy: int) -> list[RecItem]:
+    return [
+        (text, score, (x1 + dx, y1 + dy, x2 + dx, y2 + dy))
+        for text, score, (x1, y1, x2, y2) in items
+    ]
+
+
+def ensure_worker() -> RecognitionCache:
+    if MODEL_TIER_ACCURATE not in global_backends or global_cache is None:
+        init_worker()
+    if MODEL_TIER_ACCURATE not in global_backends:
+        raise RuntimeError("OCR模型加载失败")
+    assert global_cache is not None
+    return global_cache
+
+
+def recognize_sources(
+    sources: Sequence[str | SharedImage], options: RecognitionOptions
+) -> list[dict[str, Any]]:
+    cache = ensure_worker()
+
+    # 文件路径交给PaddleOCR自行解码，共享内存中的像素直接作为ndarray输入
+    with stage(TRACE_STAGE_DECODE):
+        ocr_inputs = [
+            source if isinstance(source, str) else load_shared_image(source)
+            for source in sources
+        ]
+    cache_tag = options.cache_tag()
+    regions: list[dict[str, Any] | None] = []
+    with stage(TRACE_STAGE_CACHE):
+        keys = [cache.make_key(ocr_input, cache_tag) for ocr_input in ocr_inputs]
+        for key in keys:
+            cached = cache.get(key)
+            regions.append(None if cached is None else {**cached, "cached": True})
+
+    misses = [index for index, region in enumerate(regions) if region is None]
+    if misses:
+        check_cancelled()
+        images = [ocr_inputs[index] for index in misses]
+        if (
+            options.fast_path
+            or options.adaptive_det
+            or options.cascade
+            or options.auto_trim
+        ):
+            with stage(TRACE_STAGE_DECODE):
+                images = [
+                    load_image_file(image) if isinstance(image, str) else image
+                    for image in images
+                ]
+        # 裁边后的框坐标相对于裁剪框，写入结果前换算回原图
+        offsets = [(0, 0)] * len(images)
+        trimmed_pixels = [0] * len(images)
+        if options.auto_trim:
+            with stage(TRACE_STAGE_TRIM):
+                trims = [trim_image(image) for image in images]  # pyright: ignore[reportArgumentType]
+            images = [image for image, _, _ in trims]
+            offsets = [(x1, y1) for _, (x1, y1, _, _), _ in trims]
+            trimmed_pixels = [removed for _, _, removed in trims]
+        with stage(TRACE_STAGE_OCR, profile=True):
+            # 没有轻量模型时级联识别退化为只用服务端模型
+            if options.cascade and tier_available(MODEL_TIER_FAST):
+                outputs = cascade_images(images, options)  # pyright: ignore[reportArgumentType]
+            else:
+                outputs = [
+                    (pipeline, items, [MODEL_TIER_ACCURATE] * len(items))
+                    for pipeline, items in recognize_images(
+                        images, options, global_backends[MODEL_TIER_ACCURATE]
+                    )
+                ]
+        for position, (index, (pipeline, rec_items, tiers)) in enumerate(
+            zip(misses, outputs)
+        ):
+            with stage(TRACE_STAGE_FILTER):
+                number_items = [
+                    (item, tier)
+                    for item, tier in zip(
+                        offset_items(rec_items, *offsets[position]), tiers
+                    )
+                    if is_number(item[0])
+                ]
+                region = {
+                    "numbers": [text for (text, _, _), _ in number_items],
+                    "scores": [score for (_, score, _), _ in number_items],
+                    "boxes": [list(box) for (_, _, box), _ in number_items],
+                    "tiers": [tier for _, tier in number_items],
+                    "total": sum(float(text) for (text, _, _), _ in number_items),
+                    "pipeline": pipeline,
+                    "trimmed_pixels": trimmed_pixels[position],
+                }
+            with stage(TRACE_STAGE_CACHE):
+                cache.put(keys[index], region)
+            regions[index] = {**region, "cached": False}
+    if options.table:
+        regions = [
+            {**region, "table": table_layout(region["numbers"], region["boxes"])}  # pyright: ignore[reportOptionalSubscript]
+            for region in regions
+        ]
+    return regions  # pyright: ignore[reportReturnType]
+
+
+def enhance_for_recheck(image: np.ndarray) -> np.ndarray:
+    # 放大并增强对比度后重新识别，小字号和浅色数字更容易识别正确
+    enhanced = Image.fromarray(np.ascontiguousarray(image[:, :, ::-1]))
+    enhanced = enhanced.resize(
+        (enhanced.width * RECHECK_SCALE, enhanced.height * RECHECK_SCALE),
+        Image.Resampling.LANCZOS,
+    )
+    enhanced = ImageOps.autocontrast(ImageOps.grayscale(enhanced))
+    return to_bgr_array(enhanced.filter(ImageFilter.SHARPEN))
+
+
+@traced
+def recognition_process(
+    image: str | SharedImage, options: RecognitionOptions | None = None
+) -> dict[str, bool | float | int | str | list[Any]]:
+    try:
+        start_time = time.time()
+        region = recognize_sources([image], options or RecognitionOptions())[0]
+        elapsed_time = time.time() - start_time
+        return {"success": True, **region, "elapsed_time": elapsed_time}
+    except Exception as e:
+        return {"success": False, "error": str(e)}  # pyright: ignore[reportReturnType]
+
+
+def regions_result(
+    regions: list[dict[str, Any]], elapsed_time: float
+) -> dict[str, Any]:
+    return {
+        "success": True,
+        "regions": regions,
+        "numbers": [num for region in regions for num in region["numbers"]],
+        "tiers": [tier for region in regions for tier in region["tiers"]],
+        "total": sum(region["total"] for region in regions),
+        "elapsed_time": elapsed_time,
+        "cached": all(region["cached"] for region in regions),
+        "trimmed_pixels": sum(region["trimmed_pixels"] for region in regions),
+    }
+
+
+@traced
+def regions_recognition_process(
+    images: list[SharedImage], options: RecognitionOptions | None = None
+) -> dict[str, bool | float | int | str | list[Any]]:
+    """
+    一次请求识别多个框选区域，返回各区域的小计和全部区域的总和
+    """
+    try:
+        start_time = time.time()
+        regions = recognize_sources(images, options or RecognitionOptions())
+        return regions_result(regions, time.time() - start_time)
+    except Exception as e:
+        return {"success": False, "error": str(e)}  # pyright: ignore[reportReturnType]
+
+
+@traced
+def recheck_process(
+    images: list[SharedImage],
+) -> dict[str, bool | float | int | str | list[Any]]:
+    """
+    只对低置信度数字所在的小图重新识别，不再跑整张图的检测
+    """
+    try:
+        start_time = time.time()
+        ensure_worker()
+        check_cancelled()
+        with stage(TRACE_STAGE_DECODE):
+            strips = [enhance_for_recheck(load_shared_image(image)) for image in images]
+        with stage(TRACE_STAGE_OCR, profile=True):
+            rec_results = recognize_lines(strips, global_backends[MODEL_TIER_ACCURATE])
+        return {
+            "success": True,
+            "texts": [text for text, _ in rec_results],
+            "scores": [score for _, score in rec_results],
+            "elapsed_time": time.time() - start_time,
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}  # pyright: ignore[reportReturnType]
@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+from collections import OrderedDict
+from typing import Any
+
+import numpy as np
+
+from src.constant import RESULT_CACHE_PRUNE_RATIO
+
+
+class RecognitionCache:
+    """
+    以图片内容哈希 + 模型/配置标识为键的识别结果缓存：内存中按LRU淘汰，可选落盘以便重启后复用。
+    磁盘缓存按版本分目录存放，旧版本的目录在启动时删除；文件数超过 max_disk_entries 时
+    按修改时间（读取命中时会刷新）淘汰最久未用的条目，0 表示不限制
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        cache_dir: str | None,
+        identity: str,
+        version: int = 0,
+        max_disk_entries: int = 0,
+    ):
+        self.max_entries = max_entries
+        self.cache_dir = os.path.join(cache_dir, f"v{version}") if cache_dir else None
+        self.identity = identity
+        self.max_disk_entries = max_disk_entries
+        self.entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        # 本进程估计的磁盘条目数，第一次写入时统计；多个进程共用目录时淘汰前会重新统计
+        self.disk_entries: int | None = None
+        if cache_dir:
+            remove_stale_versions(cache_dir, f"v{version}")
+
+    def make_key(self, image: str | np.ndarray, *extra: str) -> str:
+        digest = hashlib.sha256(self.identity.encode())
+        for part in extra:
+            digest.update(part.encode())
+        if isinstance(image, str):
+            with open(image, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+        else:
+            digest.update(f"{image.shape}{image.dtype.str}".encode())
+            digest.update(np.ascontiguousarray(image).data)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+            return value
+        value = self.load(key)
+        if value is not None:
+            self.remember(key, value)
+        return value
+
+    def put(self, key: str, value: dict[str, Any]):
+        self.remember(key, value)
+        self.store(key, value)
+
+    def remember(self, key: str, value: dict[str, Any]):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def disk_path(self, key: str) -> str | None:
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def load(self, key: str) -> dict[str, Any] | None:
+        path = self.disk_path(key)
+        if path is None or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)
+            return value
+        except (OSError, ValueError) as e:
+            print(f"Error reading result cache: {e}", file=sys.stderr)
+            return None
+
+    def store(self, key: str, value: dict[str, Any]):
+        path = self.disk_path(key)
+        if path is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error writing result cache: {e}", file=sys.stderr)
+            return
+        if not self.max_disk_entries:
+            return
+        if self.disk_entries is None:
+            self.disk_entries = len(self.disk_files())
+        else:
+            self.disk_entries += 1
+        if self.disk_entries > self.max_disk_entries:
+            self.prune()
+
+    def disk_files(self) -> list[tuple[float, str]]:
+        assert self.cache_dir is not None
+        files: list[tuple[float, str]] = []
+        try:
+            shards = [entry for entry in os.scandir(self.cache_dir) if entry.is_dir()]
+        except OSError:
+            return files
+        for shard in shards:
+            try:
+                for entry in os.scandir(shard.path):
+                    if entry.name.endswith(".json"):
+                        files.append((entry.stat().st_mtime, entry.path))
+            except OSError:
+                # 其他进程正在淘汰同一目录
+                continue
+        return files
+
+    def prune(self):
+        # 一次删到上限的一定比例以下，避免每次写入都重新扫描目录
+        files = sorted(self.disk_files())
+        keep = int(self.max_disk_entries * RESULT_CACHE_PRUNE_RATIO)
+        for _, path in files[: max(len(files) - keep, 0)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.disk_entries = min(len(files), keep)
+
+
+def remove_stale_versions(cache_dir: str, current: str):
+    # 目录中除当前版本外的内容都是旧版本（包括不分版本目录时的旧布局）写入的缓存
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return
+    for name in names:
+        if name == current:
+            continue
+        path = os.path.join(cache_dir, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,222 @@
+import ctypes
+import ctypes.util
+import os
+import sys
+from abc import ABC, abstractmethod
+from typing import Any
+
+from PIL import Image
+
+from src.constant import (
+    CAPTURE_BACKEND,
+    CAPTURE_BACKEND_AUTO,
+    CAPTURE_BACKEND_PYAUTOGUI,
+    CAPTURE_BACKEND_X11,
+)
+from src.utils import Box
+
+X11_ALL_PLANES: int = 0xFFFFFFFF
+X11_Z_PIXMAP: int = 2
+X11_LSB_FIRST: int = 0
+
+
+class XImage(ctypes.Structure):
+    # 只声明用到的前几个字段，XImage 总是通过 XGetImage 返回的指针访问
+    _fields_ = [
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int),
+        ("data", ctypes.c_void_p),
+        ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int),
+        ("bitmap_bit_order", ctypes.c_int),
+        ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int),
+        ("bytes_per_line", ctypes.c_int),
+        ("bits_per_pixel", ctypes.c_int),
+        ("red_mask", ctypes.c_ulong),
+        ("green_mask", ctypes.c_ulong),
+        ("blue_mask", ctypes.c_ulong),
+    ]
+
+
+class XErrorEvent(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("display", ctypes.c_void_p),
+        ("resourceid", ctypes.c_ulong),
+        ("serial", ctypes.c_ulong),
+        ("error_code", ctypes.c_ubyte),
+        ("request_code", ctypes.c_ubyte),
+        ("minor_code", ctypes.c_ubyte),
+    ]
+
+
+X_ERROR_HANDLER = ctypes.CFUNCTYPE(
+    ctypes.c_int, ctypes.c_void_p, ctypes.POINTER(XErrorEvent)
+)
+
+
+class ScreenGrabber(ABC):
+    """
+    截图接口：按屏幕坐标截取一个区域，或截取整个屏幕用于冻结画面
+    """
+
+    name: str = ""
+
+    @abstractmethod
+    def grab(self, region: Box) -> Image.Image:
+        ...
+
+    @abstractmethod
+    def grab_screen(self) -> Image.Image:
+        ...
+
+
+class PyAutoGuiGrabber(ScreenGrabber):
+    name = CAPTURE_BACKEND_PYAUTOGUI
+
+    def __init__(self):
+        import pyautogui
+
+        self.pyautogui = pyautogui
+
+    def grab(self, region: Box) -> Image.Image:
+        x1, y1, x2, y2 = region
+        return self.pyautogui.screenshot(region=(x1, y1, x2 - x1, y2 - y1))
+
+    def grab_screen(self) -> Image.Image:
+        return self.pyautogui.screenshot()
+
+
+class X11Grabber(ScreenGrabber):
+    """
+    通过 libX11 的 XGetImage 只读取所选区域的像素，不经过外部截图程序和 PNG 文件，
+    也不先截整个屏幕再裁剪。显示连接在第一次截图时建立并一直复用，只能在界面线程中使用
+    """
+
+    name = CAPTURE_BACKEND_X11
+
+    def __init__(self):
+        library = ctypes.util.find_library("X11")
+        if library is None:
+            raise OSError("找不到 libX11")
+        self.xlib = ctypes.cdll.LoadLibrary(library)
+        self.xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self.xlib.XOpenDisplay.restype = ctypes.c_void_p
+        self.xlib.XDefaultScreen.argtypes = [ctypes.c_void_p]
+        self.xlib.XDefaultScreen.restype = ctypes.c_int
+        self.xlib.XRootWindow.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.xlib.XRootWindow.restype = ctypes.c_ulong
+        self.xlib.XDisplayWidth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.xlib.XDisplayWidth.restype = ctypes.c_int
+        self.xlib.XDisplayHeight.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.xlib.XDisplayHeight.restype = ctypes.c_int
+        self.xlib.XGetImage.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_ulong,
+            ctypes.c_int,
+            ctypes.c_int,
+            ctypes.c_uint,
+            ctypes.c_uint,
+            ctypes.c_ulong,
+            ctypes.c_int,
+        ]
+        self.xlib.XGetImage.restype = ctypes.POINTER(XImage)
+        self.xlib.XDestroyImage.argtypes = [ctypes.POINTER(XImage)]
+        self.xlib.XSetErrorHandler.argtypes = [X_ERROR_HANDLER]
+        self.xlib.XSetErrorHandler.restype = ctypes.c_void_p
+        self.display = self.xlib.XOpenDisplay(None)
+        if not self.display:
+            raise OSError(f"无法连接 X 显示: {os.environ.get('DISPLAY', '')}")
+        screen = self.xlib.XDefaultScreen(self.display)
+        self.root = self.xlib.XRootWindow(self.display, screen)
+        self.width = self.xlib.XDisplayWidth(self.display, screen)
+        self.height = self.xlib.XDisplayHeight(self.display, screen)
+        # Xlib 默认的错误处理会直接结束进程，这里只记下错误码，由 grab 抛出异常
+        self.error_code = 0
+        self.error_handler = X_ERROR_HANDLER(self.on_error)
+        self.xlib.XSetErrorHandler(self.error_handler)
+
+    def on_error(self, display: Any, event: Any) -> int:
+        self.error_code = event.contents.error_code
+        return 0
+
+    def grab(self, region: Box) -> Image.Image:
+        # 超出屏幕的部分会让 XGetImage 报错，先裁到屏幕范围内
+        x1, y1 = max(region[0], 0), max(region[1], 0)
+        x2, y2 = min(region[2], self.width), min(region[3], self.height)
+        if x2 <= x1 or y2 <= y1:
+            raise ValueError(f"截图区域不在屏幕内: {region}")
+        self.error_code = 0
+        pointer = self.xlib.XGetImage(
+            self.display,
+            self.root,
+            x1,
+            y1,
+            x2 - x1,
+            y2 - y1,
+            X11_ALL_PLANES,
+            X11_Z_PIXMAP,
+        )
+        if not pointer:
+            raise OSError(f"XGetImage 失败，错误码: {self.error_code}")
+        try:
+            image = pointer.contents
+            if image.bits_per_pixel != 32 or (
+                image.red_mask,
+                image.green_mask,
+                image.blue_mask,
+            ) != (0xFF0000, 0xFF00, 0xFF):
+                raise OSError(f"不支持的像素格式: {image.bits_per_pixel} 位")
+            size = image.bytes_per_line * image.height
+            data = (ctypes.c_char * size).from_address(image.data)
+            # 直接从 X 服务器返回的缓冲区解码为 RGB，解码时已复制，之后可以释放 XImage
+            return Image.frombytes(
+                "RGB",
+                (image.width, image.height),
+                data,
+                "raw",
+                "BGRX" if image.byte_order == X11_LSB_FIRST else "XRGB",
+                image.bytes_per_line,
+                1,
+            )
+        finally:
+            self.xlib.XDestroyImage(pointer)
+
+    def grab_screen(self) -> Image.Image:
+        return self.grab((0, 0, self.width, self.height))
+
+
+def create_grabber(name: str = CAPTURE_BACKEND) -> ScreenGrabber:
+    if name == CAPTURE_BACKEND_X11:
+        return X11Grabber()
+    if name == CAPTURE_BACKEND_PYAUTOGUI:
+        return PyAutoGuiGrabber()
+    if name != CAPTURE_BACKEND_AUTO:
+        raise ValueError(f"未知的截图方式: {name}")
+    # Wayland 下通过 XWayland 只能读到 X11 窗口，交给 pyautogui 处理
+    if (
+        sys.platform.startswith("linux")
+        and os.environ.get("DISPLAY")
+        and not os.environ.get("WAYLAND_DISPLAY")
+    ):
+        try:
+            return X11Grabber()
+        except OSError as e:
+            print(f"X11 screen capture unavailable: {e}", file=sys.stderr)
+    return PyAutoGuiGrabber()
+
+
+global_grabber: ScreenGrabber | None = None
+
+
+def screen_grabber() -> ScreenGrabber:
+    """
+    界面中截图和屏幕监视共用的截图方式，第一次截图时创建
+    """
+    global global_grabber
+    if global_grabber is None:
+        global_grabber = create_grabber()
+    return global_grabber
@@ -0,0 +1,152 @@
+import tkinter as tk
+from typing import Any, Callable
+
+import numpy as np
+from PIL import Image
+
+from src.constant import (
+    WATCH_BAND_MIN_GAP,
+    WATCH_BAND_PADDING,
+    WATCH_DIFF_SCALE,
+    WATCH_DIFF_THRESHOLD,
+    WATCH_FULL_REFRESH_RATIO,
+)
+from src.line_split import find_runs
+from src.screen_grab import screen_grabber
+from src.utils import Box, RecItem
+
+
+def downscale_gray(frame: Image.Image) -> np.ndarray:
+    return np.asarray(frame.convert("L").reduce(WATCH_DIFF_SCALE), dtype=np.int16)
+
+
+def expand_band(top: int, bottom: int, items: list[RecItem]) -> tuple[int, int]:
+    # 行带必须完整包含与它相交的已识别数字，否则数字会被切断或重复计入
+    changed = True
+    while changed:
+        changed = False
+        for _, _, (_, y1, _, y2) in items:
+            if y1 < bottom and y2 > top and (y1 < top or y2 > bottom):
+                top, bottom = min(top, y1), max(bottom, y2)
+                changed = True
+    return top, bottom
+
+
+def changed_bands(
+    previous: np.ndarray, current: np.ndarray, height: int, items: list[RecItem]
+) -> list[tuple[int, int]]:
+    """
+    比较两帧缩小后的灰度画面，返回需要重新识别的行带 [top, bottom)（原始分辨率坐标）
+    """
+    if previous.shape != current.shape:
+        return [(0, height)]
+    rows = (np.abs(current - previous) > WATCH_DIFF_THRESHOLD).any(axis=1)
+    bands: list[tuple[int, int]] = []
+    for start, end in find_runs(rows, WATCH_BAND_MIN_GAP):
+        top, bottom = expand_band(
+            max(start * WATCH_DIFF_SCALE - WATCH_BAND_PADDING, 0),
+            min(end * WATCH_DIFF_SCALE + WATCH_BAND_PADDING, height),
+            items,
+        )
+        if bands and top <= bands[-1][1]:
+            top, bottom = expand_band(bands[-1][0], max(bottom, bands[-1][1]), items)
+            bands.pop()
+        bands.append((top, bottom))
+    if sum(bottom - top for top, bottom in bands) > WATCH_FULL_REFRESH_RATIO * height:
+        return [(0, height)]
+    return bands
+
+
+class ScreenWatcher:
+    """
+    定时截取同一屏幕区域，只有画面变化时才把变化的行带送去识别，画面静止时不调用OCR
+    """
+
+    def __init__(
+        self,
+        root: tk.Tk,
+        region: Box,
+        interval: int,
+        recognize_bands: Callable[
+            [list[Image.Image], Callable[[dict[str, Any]], None]], None
+        ],
+        on_update: Callable[[list[RecItem], Image.Image, int, float], None],
+        on_error: Callable[[str], None],
+    ):
+        self.root = root
+        self.region = region
+        self.interval = interval
+        self.recognize_bands = recognize_bands
+        self.on_update = on_update
+        self.on_error = on_error
+        # 当前区域内的数字，框坐标相对于监视区域
+        self.items: list[RecItem] = []
+        # 最近一次送去识别的画面（缩小后的灰度图），用来判断画面是否变化
+        self.baseline: np.ndarray | None = None
+        self.busy = False
+        self.after_id: str | None = None
+
+    def start(self):
+        self.after_id = self.root.after(self.interval, self.tick)
+
+    def stop(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def tick(self):
+        self.after_id = self.root.after(self.interval, self.tick)
+        # 上一次识别还没返回时不截图，避免请求堆积
+        if self.busy:
+            return
+        try:
+            frame = screen_grabber().grab(self.region)
+        except Exception as e:
+            self.stop()
+            self.on_error(str(e))
+            return
+        small = downscale_gray(frame)
+        if self.baseline is None:
+            bands = [(0, frame.height)]
+        else:
+            bands = changed_bands(self.baseline, small, frame.height, self.items)
+            if not bands:
+                return
+        self.baseline = small
+        self.busy = True
+
+        def handle_result(result: dict[str, Any]):
+            self.apply_result(frame, bands, result)
+
+        self.recognize_bands(
+            [frame.crop((0, top, frame.width, bottom)) for top, bottom in bands],
+            handle_result,
+        )
+
+    def apply_result(
+        self,
+        frame: Image.Image,
+        bands: list[tuple[int, int]],
+        result: dict[str, Any],
+    ):
+        self.busy = False
+        if self.after_id is None:
+            return
+        if not result["success"]:
+            # 下一次截图时整块重新识别
+            self.baseline = None
+            self.on_error(result["error"])
+            return
+        items = [
+            item
+            for item in self.items
+            if not any(item[2][1] < bottom and item[2][3] > top for top, bottom in bands)
+        ]
+        for (top, _), region in zip(bands, result["regions"]):
+            for text, score, (bx1, by1, bx2, by2) in zip(
+                region["numbers"], region["scores"], region["boxes"]
+            ):
+                items.append((text, score, (bx1, by1 + top, bx2, by2 + top)))
+        items.sort(key=lambda item: (item[2][1], item[2][0]))
+        self.items = items
+        self.on_update(items, frame, len(bands), result["elapsed_time"])
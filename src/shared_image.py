@@ -0,0 +1,53 @@
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+from PIL import Image
+
+
+# 通过共享内存在GUI进程和识别子进程之间传递图片像素，避免PNG编码/解码和磁盘读写
+@dataclass(frozen=True)
+class SharedImage:
+    name: str
+    shape: tuple[int, ...]
+    dtype: str
+
+
+def to_bgr_array(image: Image.Image) -> np.ndarray:
+    # PaddleOCR 将 ndarray 输入视为 BGR 顺序
+    return np.ascontiguousarray(np.asarray(image.convert("RGB"))[:, :, ::-1])
+
+
+def load_image_file(image_path: str) -> np.ndarray:
+    with Image.open(image_path) as image:
+        return to_bgr_array(image)
+
+
+def share_image(image: Image.Image) -> tuple[shared_memory.SharedMemory, SharedImage]:
+    array = to_bgr_array(image)
+    shm = shared_memory.SharedMemory(create=True, size=array.nbytes)
+    buffer = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    buffer[:] = array
+    del buffer
+    return shm, SharedImage(shm.name, array.shape, array.dtype.str)
+
+
+def load_shared_image(handle: SharedImage) -> np.ndarray:
+    shm = shared_memory.SharedMemory(name=handle.name)
+    try:
+        buffer = np.ndarray(handle.shape, dtype=np.dtype(handle.dtype), buffer=shm.buf)
+        array = buffer.copy()
+        del buffer
+        return array
+    finally:
+        shm.close()
+
+
+def release_shared_image(shm: shared_memory.SharedMemory | None):
+    if shm is None:
+        return
+    try:
+        shm.close()
+        shm.unlink()
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,244 @@
+import itertools
+import random
+import zlib
+from dataclasses import dataclass
+from decimal import Decimal
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from src.constant import (
+    SYNTHETIC_DEFAULT_FONT,
+    SYNTHETIC_FONT_POINTS,
+    SYNTHETIC_KIND_COLUMN,
+    SYNTHETIC_KIND_INVOICE,
+    SYNTHETIC_KIND_SCROLLED,
+    SYNTHETIC_KIND_TABLE,
+    SYNTHETIC_SCROLL_FACTOR,
+    SYNTHETIC_TABLE_COLUMNS,
+)
+
+# 标签和表头只用不含数字的英文单词，避免被计入总和，也不依赖中文字体
+LABEL_WORDS: tuple[str, ...] = (
+    "Widget",
+    "Service",
+    "Shipping",
+    "License",
+    "Support",
+    "Hardware",
+    "Travel",
+    "Consulting",
+)
+HEADER_WORDS: tuple[str, ...] = ("North", "South", "East", "West", "Central")
+
+Font = ImageFont.FreeTypeFont | ImageFont.ImageFont
+
+
+@dataclass(frozen=True)
+class SyntheticCase:
+    kind: str
+    rows: int
+    font: str
+    dpi: int
+    noise: float
+    seed: int
+
+    @property
+    def name(self) -> str:
+        return f"{self.kind}-r{self.rows}-{self.font}-{self.dpi}dpi-n{self.noise:g}"
+
+
+@dataclass
+class SyntheticSample:
+    image: Image.Image
+    # 图中所有数字，按阅读顺序排列
+    numbers: list[str]
+    total: Decimal
+
+
+def load_font(name: str, dpi: int) -> Font:
+    size = round(SYNTHETIC_FONT_POINTS * dpi / 72)
+    if name == SYNTHETIC_DEFAULT_FONT:
+        return ImageFont.load_default(size)
+    # 找不到字体时抛出 OSError，由调用方跳过该字体
+    return ImageFont.truetype(name, size)
+
+
+def random_number(rng: random.Random) -> str:
+    if rng.random() < 0.5:
+        return str(rng.randint(0, 99999))
+    return f"{rng.randint(0, 99999)}.{rng.randint(0, 99):02d}"
+
+
+def text_width(font: Font, text: str) -> int:
+    left, _, right, _ = font.getbbox(text)
+    return int(right - left)
+
+
+def line_height(font: Font) -> int:
+    _, top, _, bottom = font.getbbox("0123456789")
+    return int((bottom - top) * 2)
+
+
+def draw_column(rng: random.Random, rows: int, font: Font) -> tuple[Image.Image, list[str]]:
+    numbers = [random_number(rng) for _ in range(rows)]
+    height = line_height(font)
+    width = max(text_width(font, number) for number in numbers)
+    margin = height
+    image = Image.new("RGB", (width + 2 * margin, rows * height + 2 * margin), "white")
+    draw = ImageDraw.Draw(image)
+    for row, number in enumerate(numbers):
+        # 右对齐，和报表中的金额列一致
+        x = margin + width - text_width(font, number)
+        draw.text((x, margin + row * height), number, fill="black", font=font)
+    return image, numbers
+
+
+def draw_table(rng: random.Random, rows: int, font: Font) -> tuple[Image.Image, list[str]]:
+    columns = SYNTHETIC_TABLE_COLUMNS
+    cells = [[random_number(rng) for _ in range(columns)] for _ in range(rows)]
+    headers = [HEADER_WORDS[column % len(HEADER_WORDS)] for column in range(columns)]
+    height = line_height(font)
+    cell_width = max(
+        max(text_width(font, text) for row in cells for text in row),
+        max(text_width(font, header) for header in headers),
+    ) + height
+    image = Image.new(
+        "RGB", (columns * cell_width + 1, (rows + 1) * height + 1), "white"
+    )
+    draw = ImageDraw.Draw(image)
+    for row, texts in enumerate([headers, *cells]):
+        for column, text in enumerate(texts):
+            draw.text(
+                (column * cell_width + height // 2, row * height + height // 4),
+                text,
+                fill="black",
+                font=font,
+            )
+    for row in range(rows + 2):
+        draw.line([(0, row * height), (columns * cell_width, row * height)], "gray")
+    for column in range(columns + 1):
+        draw.line(
+            [(column * cell_width, 0), (column * cell_width, (rows + 1) * height)],
+            "gray",
+        )
+    return image, [text for row in cells for text in row]
+
+
+def draw_invoice(
+    rng: random.Random, rows: int, font: Font
+) -> tuple[Image.Image, list[str]]:
+    labels = [rng.choice(LABEL_WORDS) for _ in range(rows)]
+    amounts = [random_number(rng) for _ in range(rows)]
+    height = line_height(font)
+    label_width = max(text_width(font, label) for label in labels)
+    amount_width = max(text_width(font, amount) for amount in amounts)
+    margin = height
+    width = label_width + amount_width + 4 * margin
+    image = Image.new("RGB", (width, (rows + 2) * height + 2 * margin), "white")
+    draw = ImageDraw.Draw(image)
+    draw.text((margin, margin), "INVOICE", fill="black", font=font)
+    draw.line(
+        [(margin, margin + height * 3 // 2), (width - margin, margin + height * 3 // 2)],
+        "black",
+    )
+    for row, (label, amount) in enumerate(zip(labels, amounts)):
+        y = margin + (row + 2) * height
+        draw.text((margin, y), label, fill="black", font=font)
+        draw.text(
+            (width - margin - text_width(font, amount), y),
+            amount,
+            fill="black",
+            font=font,
+        )
+    return image, amounts
+
+
+def draw_scrolled(
+    rng: random.Random, rows: int, font: Font
+) -> tuple[Image.Image, list[str]]:
+    """
+    模拟截取一个滚动到中间的长列表：隔行底色、右侧滚动条，只有可见的行计入真实值
+    """
+    numbers = [random_number(rng) for _ in range(rows * SYNTHETIC_SCROLL_FACTOR)]
+    first = rng.randint(0, len(numbers) - rows)
+    visible = numbers[first : first + rows]
+    height = line_height(font)
+    width = max(text_width(font, number) for number in visible) + 2 * height
+    scrollbar = max(height // 2, 6)
+    image = Image.new("RGB", (width + scrollbar, rows * height), "white")
+    draw = ImageDraw.Draw(image)
+    for row, number in enumerate(visible):
+        if (first + row) % 2:
+            draw.rectangle(
+                [(0, row * height), (width, (row + 1) * height)], fill="#eef2f7"
+            )
+        draw.text((height, row * height + height // 4), number, fill="black", font=font)
+    thumb_top = rows * height * first // len(numbers)
+    thumb_height = rows * height * rows // len(numbers)
+    draw.rectangle([(width, 0), (width + scrollbar, rows * height)], fill="#dddddd")
+    draw.rectangle(
+        [(width + 1, thumb_top), (width + scrollbar - 1, thumb_top + thumb_height)],
+        fill="#999999",
+    )
+    return image, visible
+
+
+DRAWERS = {
+    SYNTHETIC_KIND_COLUMN: draw_column,
+    SYNTHETIC_KIND_TABLE: draw_table,
+    SYNTHETIC_KIND_INVOICE: draw_invoice,
+    SYNTHETIC_KIND_SCROLLED: draw_scrolled,
+}
+
+
+def add_noise(image: Image.Image, sigma: float, seed: int) -> Image.Image:
+    if sigma <= 0:
+        return image
+    rng = np.random.default_rng(seed)
+    pixels = np.asarray(image, dtype=np.float32)
+    pixels = pixels + rng.normal(0.0, sigma, pixels.shape)
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+
+def generate_sample(case: SyntheticCase) -> SyntheticSample:
+    """
+    按用例参数生成图片和真实值，同一用例（含随机种子）每次生成的图片完全相同
+    """
+    rng = random.Random(case.seed)
+    image, numbers = DRAWERS[case.kind](rng, case.rows, load_font(case.font, case.dpi))
+    return SyntheticSample(
+        add_noise(image, case.noise, case.seed),
+        numbers,
+        sum((Decimal(number) for number in numbers), Decimal(0)),
+    )
+
+
+def build_cases(
+    kinds: list[str],
+    rows: list[int],
+    fonts: list[str],
+    dpis: list[int],
+    noise_levels: list[float],
+    seed: int,
+) -> tuple[list[SyntheticCase], list[str]]:
+    """
+    返回 (所有参数组合的用例, 当前系统中找不到的字体)
+    """
+    available: list[str] = []
+    missing: list[str] = []
+    for font in fonts:
+        try:
+            load_font(font, dpis[0] if dpis else 72)
+            available.append(font)
+        except OSError:
+            missing.append(font)
+    cases: list[SyntheticCase] = []
+    for kind, row_count, font, dpi, noise in itertools.product(
+        kinds, rows, available, dpis, noise_levels
+    ):
+        # 种子只由基础种子和用例参数决定，调整用例组合不影响其他用例生成的图片
+        name = SyntheticCase(kind, row_count, font, dpi, noise, 0).name
+        case_seed = zlib.crc32(f"{seed}:{name}".encode())
+        cases.append(SyntheticCase(kind, row_count, font, dpi, noise, case_seed))
+    return cases, missing
@@ -0,0 +1,49 @@
+from typing import Any
+
+from src.constant import TABLE_COLUMN_GAP, TABLE_ROW_OVERLAP
+from src.utils import Box
+
+
+def group_intervals(intervals: list[tuple[float, float]], gap: float) -> list[list[int]]:
+    """
+    按起点扫描，把相互重叠（或间隔小于 gap）的区间归为一组，返回每组区间的下标
+    """
+    groups: list[list[int]] = []
+    end = 0.0
+    for index in sorted(range(len(intervals)), key=lambda i: intervals[i][0]):
+        start, stop = intervals[index]
+        if groups and start < end + gap:
+            groups[-1].append(index)
+            end = max(end, stop)
+        else:
+            groups.append([index])
+            end = stop
+    return groups
+
+
+def table_layout(numbers: list[str], boxes: list[Box] | list[list[int]]) -> dict[str, Any]:
+    """
+    按框的位置把数字聚成列和行：水平方向有重叠的框属于同一列，
+    垂直方向中心附近有重叠的框属于同一行。列从左到右、行从上到下排列，
+    每列（行）内是数字在 numbers 中的下标
+    """
+    columns = group_intervals([(x1, x2) for x1, _, x2, _ in boxes], TABLE_COLUMN_GAP)
+    # 只取框中间的一段比较，相邻两行的框上下略有重叠时不会被合并
+    rows = group_intervals(
+        [
+            (
+                (y1 + y2) / 2 - (y2 - y1) * TABLE_ROW_OVERLAP / 2,
+                (y1 + y2) / 2 + (y2 - y1) * TABLE_ROW_OVERLAP / 2,
+            )
+            for _, y1, _, y2 in boxes
+        ],
+        0,
+    )
+    columns = [sorted(column, key=lambda i: boxes[i][1]) for column in columns]
+    rows = [sorted(row, key=lambda i: boxes[i][0]) for row in rows]
+    return {
+        "columns": columns,
+        "rows": rows,
+        "column_totals": [sum(float(numbers[i]) for i in column) for column in columns],
+        "row_totals": [sum(float(numbers[i]) for i in row) for row in rows],
+    }
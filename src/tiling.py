@@ -0,0 +1,83 @@
+from src.constant import TILE_DEDUP_OVERLAP, TILE_EDGE_MARGIN, TILE_GRID_CELL
+from src.utils import Box, RecItem
+
+
+def plan_axis(length: int, tile_size: int, overlap: int) -> list[tuple[int, int]]:
+    if length <= tile_size:
+        return [(0, length)]
+    if not 0 <= overlap < tile_size:
+        raise ValueError(f"切片重叠 {overlap} 必须不小于0且小于切片边长 {tile_size}")
+    step = tile_size - overlap
+    starts = list(range(0, length - tile_size, step)) + [length - tile_size]
+    return [(start, start + tile_size) for start in starts]
+
+
+def plan_tiles(width: int, height: int, tile_size: int, overlap: int) -> list[Box]:
+    """
+    把大图切成互相重叠的切片，最后一行/列切片贴齐图片边缘，保证每块都是原始分辨率
+    """
+    return [
+        (x1, y1, x2, y2)
+        for y1, y2 in plan_axis(height, tile_size, overlap)
+        for x1, x2 in plan_axis(width, tile_size, overlap)
+    ]
+
+
+def touches_seam(box: Box, tile: Box, width: int, height: int) -> bool:
+    # 只有贴着内部接缝（而不是图片边缘）的框才可能被切断
+    x1, y1, x2, y2 = box
+    tx1, ty1, tx2, ty2 = tile
+    return (
+        (tx1 > 0 and x1 - tx1 <= TILE_EDGE_MARGIN)
+        or (ty1 > 0 and y1 - ty1 <= TILE_EDGE_MARGIN)
+        or (tx2 < width and tx2 - x2 <= TILE_EDGE_MARGIN)
+        or (ty2 < height and ty2 - y2 <= TILE_EDGE_MARGIN)
+    )
+
+
+def overlap_ratio(a: Box, b: Box) -> float:
+    width = min(a[2], b[2]) - max(a[0], b[0])
+    height = min(a[3], b[3]) - max(a[1], b[1])
+    if width <= 0 or height <= 0:
+        return 0.0
+    smaller = min((a[2] - a[0]) * (a[3] - a[1]), (b[2] - b[0]) * (b[3] - b[1]))
+    return width * height / max(smaller, 1)
+
+
+def merge_tile_results(
+    tile_results: list[tuple[Box, list[RecItem]]], width: int, height: int
+) -> list[RecItem]:
+    """
+    合并各切片的识别结果：框坐标换算回原图，重叠区域里重复识别的文本只保留一份，
+    优先保留没有贴着接缝、面积更大（更完整）的那个框，最后按阅读顺序排序
+    """
+    candidates: list[tuple[bool, int, str, float, Box]] = []
+    for tile, items in tile_results:
+        for text, score, (x1, y1, x2, y2) in items:
+            box = (x1 + tile[0], y1 + tile[1], x2 + tile[0], y2 + tile[1])
+            area = (box[2] - box[0]) * (box[3] - box[1])
+            candidates.append(
+                (touches_seam(box, tile, width, height), -area, text, score, box)
+            )
+    candidates.sort(key=lambda candidate: candidate[:2])
+
+    kept: list[RecItem] = []
+    # 按网格索引已保留的框，只和附近的框比较重叠
+    grid: dict[tuple[int, int], list[Box]] = {}
+    for _, _, text, score, box in candidates:
+        cells = [
+            (cx, cy)
+            for cx in range(box[0] // TILE_GRID_CELL, box[2] // TILE_GRID_CELL + 1)
+            for cy in range(box[1] // TILE_GRID_CELL, box[3] // TILE_GRID_CELL + 1)
+        ]
+        if any(
+            overlap_ratio(box, other) >= TILE_DEDUP_OVERLAP
+            for cell in cells
+            for other in grid.get(cell, [])
+        ):
+            continue
+        kept.append((text, score, box))
+        for cell in cells:
+            grid.setdefault(cell, []).append(box)
+    kept.sort(key=lambda item: (item[2][1], item[2][0]))
+    return kept
@@ -0,0 +1,177 @@
+import cProfile
+import functools
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from typing import Any, Callable, Iterator
+
+from src.constant import (
+    PROFILE_DIR,
+    TRACE_BACKUP_COUNT,
+    TRACE_MAX_BYTES,
+    TRACE_STAGE_QUEUE,
+    TRACE_STAGE_RETURN,
+    TRACE_STAGE_WORKER,
+)
+
+# 子进程中当前请求的各阶段耗时（秒），不在请求中时为 None；一个子进程同时只处理一个请求
+current_stages: dict[str, float] | None = None
+# 正在计时的阶段，嵌套阶段以 "外层.内层" 命名
+active_stages: list[str] = []
+
+
+def dump_profile(profiler: cProfile.Profile, name: str):
+    assert PROFILE_DIR is not None
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(
+            os.path.join(PROFILE_DIR, f"{os.getpid()}-{time.time_ns()}-{name}.prof")
+        )
+    except OSError as e:
+        print(f"Error writing profile: {e}", file=sys.stderr)
+
+
+@contextmanager
+def stage(name: str, profile: bool = False) -> Iterator[None]:
+    """
+    记录当前请求中一个阶段的耗时，同名阶段累加。
+    profile 为 True 且设置了 PROFILE_DIR 时用 cProfile 记录该阶段，结果写成 .prof 文件
+    """
+    if current_stages is None:
+        yield
+        return
+    active_stages.append(name)
+    key = ".".join(active_stages)
+    profiler = cProfile.Profile() if profile and PROFILE_DIR else None
+    start_time = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        elapsed_time = time.perf_counter() - start_time
+        if profiler is not None:
+            profiler.disable()
+            dump_profile(profiler, key)
+        active_stages.pop()
+        current_stages[key] = current_stages.get(key, 0.0) + elapsed_time
+
+
+def traced(
+    task: Callable[..., dict[str, Any]],
+) -> Callable[..., dict[str, Any]]:
+    """
+    包装子进程任务：结果中附带各阶段耗时、起止时间和进程号（可用于 py-spy --pid），
+    起止时间用墙钟记录，主进程据此算出排队和结果回传的耗时
+    """
+
+    @functools.wraps(task)
+    def wrapper(*args: Any, **kwargs: Any) -> dict[str, Any]:
+        global current_stages
+        current_stages = {}
+        active_stages.clear()
+        started = time.time()
+        try:
+            result = task(*args, **kwargs)
+        finally:
+            stages, current_stages = current_stages, None
+        trace = {
+            "stages": stages,
+            "started": started,
+            "finished": time.time(),
+            "pid": os.getpid(),
+        }
+        return {**result, "trace": trace}
+
+    return wrapper
+
+
+class RequestTrace:
+    """
+    主进程中一次识别请求的追踪记录：截图、写入共享内存、排队、子进程各阶段、结果回传和界面刷新
+    """
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.created = time.time()
+        self.submitted: float | None = None
+        self.pid: int | None = None
+        self.stages: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start_time)
+
+    def add(self, name: str, elapsed_time: float):
+        # 跨进程的墙钟可能有微小偏差，不记负数
+        self.stages[name] = self.stages.get(name, 0.0) + max(elapsed_time, 0.0)
+
+    def mark_submitted(self):
+        self.submitted = time.time()
+
+    def add_worker_trace(self, result: dict[str, Any], received: float):
+        worker = result.get("trace")
+        # 被取消的任务没有子进程的追踪信息
+        if worker is None or self.submitted is None:
+            return
+        self.pid = worker["pid"]
+        self.add(TRACE_STAGE_QUEUE, worker["started"] - self.submitted)
+        self.add(TRACE_STAGE_WORKER, worker["finished"] - worker["started"])
+        for name, elapsed_time in worker["stages"].items():
+            self.add(f"{TRACE_STAGE_WORKER}.{name}", elapsed_time)
+        self.add(TRACE_STAGE_RETURN, received - worker["finished"])
+
+    def to_record(self, result: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "time": self.created,
+            "kind": self.kind,
+            "success": result["success"],
+            "error": None if result["success"] else result["error"],
+            "pid": self.pid,
+            "total": sum(
+                elapsed_time
+                for name, elapsed_time in self.stages.items()
+                if "." not in name
+            ),
+            "stages": self.stages,
+        }
+
+
+class TraceLog:
+    """
+    把每次请求的追踪记录追加到 JSONL 文件，超过大小上限后轮转；path 为 None 或无法写入时不记录
+    """
+
+    def __init__(self, path: str | None):
+        self.logger: logging.Logger | None = None
+        if path is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            handler = RotatingFileHandler(
+                path,
+                maxBytes=TRACE_MAX_BYTES,
+                backupCount=TRACE_BACKUP_COUNT,
+                encoding="utf-8",
+            )
+        except OSError as e:
+            print(f"Error opening trace file: {e}", file=sys.stderr)
+            return
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger = logging.getLogger(f"snapsum4j.trace.{path}")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.handlers = [handler]
+        self.logger = logger
+
+    def write(self, record: dict[str, Any]):
+        if self.logger is not None:
+            self.logger.info(json.dumps(record, ensure_ascii=False))
@@ -0,0 +1,330 @@
+import argparse
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import platform
+import sys
+import time
+from dataclasses import asdict, replace
+from typing import Any, Callable
+
+import numpy as np
+
+from src.constant import (
+    BENCHMARK_SEED,
+    MODEL_TIER_ACCURATE,
+    OCR_BACKEND,
+    OCR_BACKEND_PADDLE,
+    OCR_BACKENDS,
+    REC_BATCH_SIZE,
+    SYNTHETIC_DEFAULT_FONT,
+    SYNTHETIC_KIND_COLUMN,
+    SYNTHETIC_KIND_TABLE,
+    TUNE_ON_STARTUP,
+    TUNING_BATCH_SIZES,
+    TUNING_DIR,
+    TUNING_REPEAT,
+    TUNING_SAMPLE_ROWS,
+    TUNING_THREAD_CANDIDATES,
+    TUNING_VERSION,
+    WORKER_MEMORY_ESTIMATES,
+    WORKER_MEMORY_RESERVE,
+    WORKER_SHARED_MEMORY_RATIO,
+)
+from src.line_split import split_text_lines
+from src.ocr_backend import WorkerTuning, backend_config_error, create_backend
+from src.shared_image import to_bgr_array
+from src.synthetic_images import SyntheticCase, generate_sample
+
+
+def physical_cores() -> int:
+    """
+    当前进程可用的物理核心数：优先用 psutil，其次解析 /proc/cpuinfo，都不可用时退回逻辑核心数
+    """
+    logical = os.cpu_count() or 1
+    if hasattr(os, "sched_getaffinity"):
+        logical = len(os.sched_getaffinity(0))
+    try:
+        import psutil  # pyright: ignore[reportMissingModuleSource]
+
+        cores = psutil.cpu_count(logical=False)
+        if cores:
+            return min(cores, logical)
+    except ImportError:
+        pass
+    try:
+        core_ids: set[tuple[str, str]] = set()
+        physical_id = ""
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key.strip() == "physical id":
+                    physical_id = value.strip()
+                elif key.strip() == "core id":
+                    core_ids.add((physical_id, value.strip()))
+        if core_ids:
+            return min(len(core_ids), logical)
+    except OSError:
+        pass
+    return logical
+
+
+def available_memory() -> int | None:
+    try:
+        import psutil  # pyright: ignore[reportMissingModuleSource]
+
+        return int(psutil.virtual_memory().available)
+    except ImportError:
+        pass
+    try:
+        with open("/proc/meminfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def plan_workers(
+    backend_name: str, cpu_threads: int | None, shared_models: bool = False
+) -> int:
+    """
+    按物理核心数和每个进程的线程数计算识别进程数，再按可用内存限制；未校准时每个物理核心一个进程。
+    共享模型时父进程持有一份完整的模型，每个识别进程只计算权重之外的占用
+    """
+    workers = max(physical_cores() // max(cpu_threads or 1, 1), 1)
+    memory = available_memory()
+    if memory is not None:
+        estimate = WORKER_MEMORY_ESTIMATES[backend_name]
+        memory -= WORKER_MEMORY_RESERVE
+        if shared_models:
+            memory -= estimate
+            estimate = int(estimate * WORKER_SHARED_MEMORY_RATIO)
+        workers = min(workers, max(int(memory // estimate), 1))
+    return workers
+
+
+def machine_key() -> str:
+    # 校准结果只对同一台机器有效，换机器或换CPU后重新校准
+    machine = [
+        platform.node(),
+        platform.machine(),
+        platform.processor(),
+        os.cpu_count(),
+        physical_cores(),
+    ]
+    return hashlib.sha256(json.dumps(machine).encode()).hexdigest()[:16]
+
+
+def tuning_path(backend_name: str) -> str:
+    return os.path.join(TUNING_DIR, f"{backend_name}-{machine_key()}.json")
+
+
+def load_tuning(backend_name: str) -> WorkerTuning | None:
+    path = tuning_path(backend_name)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != TUNING_VERSION:
+            return None
+        return WorkerTuning(**data["tuning"])
+    except (OSError, ValueError, TypeError, KeyError) as e:
+        print(f"Error reading tuning file: {e}", file=sys.stderr)
+        return None
+
+
+def batch_tuning(backend_name: str) -> WorkerTuning | None:
+    # 多进程并行识别时改用校准时吞吐量最高的线程数
+    tuning = load_tuning(backend_name)
+    if tuning is None or tuning.batch_cpu_threads is None:
+        return tuning
+    return replace(tuning, cpu_threads=tuning.batch_cpu_threads)
+
+
+def save_tuning(
+    backend_name: str, tuning: WorkerTuning, measurements: list[dict[str, Any]]
+) -> str:
+    path = tuning_path(backend_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "version": TUNING_VERSION,
+                "backend": backend_name,
+                "created": time.time(),
+                "physical_cores": physical_cores(),
+                "tuning": asdict(tuning),
+                "measurements": measurements,
+            },
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+    os.replace(temp_path, path)
+    return path
+
+
+def calibration_samples() -> tuple[list[np.ndarray], list[np.ndarray]]:
+    """
+    内置的校准图片：一列数字和一张表格；文本行取自单列图片，用来测量识别批大小的影响
+    """
+    images = [
+        to_bgr_array(
+            generate_sample(
+                SyntheticCase(
+                    kind, TUNING_SAMPLE_ROWS, SYNTHETIC_DEFAULT_FONT, 96, 0.0, BENCHMARK_SEED
+                )
+            ).image
+        )
+        for kind in (SYNTHETIC_KIND_COLUMN, SYNTHETIC_KIND_TABLE)
+    ]
+    column = images[0]
+    strips = [column[y1:y2, x1:x2] for x1, y1, x2, y2 in split_text_lines(column)]
+    return images, strips
+
+
+def measure(
+    backend_name: str,
+    tuning: WorkerTuning,
+    images: list[np.ndarray],
+    strips: list[np.ndarray],
+    repeat: int,
+) -> float:
+    backend = create_backend(backend_name, MODEL_TIER_ACCURATE, tuning)
+    backend.load()
+    # 第一次调用包含延迟初始化（含单独的识别模型），不计入结果
+    backend.warm_up(images[0])
+    backend.recognize(strips[:1])
+    best = math.inf
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        backend.predict([*images], {})
+        backend.recognize(strips)
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+
+def calibrate(
+    backend_name: str,
+    repeat: int = TUNING_REPEAT,
+    report: Callable[[dict[str, Any]], None] | None = None,
+) -> tuple[WorkerTuning, list[dict[str, Any]]]:
+    """
+    先比较线程数和 MKL-DNN 的组合，再在最快的组合上比较识别批大小，返回 (最佳参数, 全部测量结果)。
+    每个组合都要重新加载模型，所以不做完整的网格搜索
+    """
+    images, strips = calibration_samples()
+    cores = physical_cores()
+    thread_options = sorted({t for t in TUNING_THREAD_CANDIDATES if t < cores} | {cores})
+    # MKL-DNN 只对 Paddle 引擎有效
+    mkldnn_options = [True, False] if backend_name == OCR_BACKEND_PADDLE else [None]
+    measurements: list[dict[str, Any]] = []
+
+    def run(tuning: WorkerTuning) -> float:
+        try:
+            elapsed_time = measure(backend_name, tuning, images, strips, repeat)
+            measurement = {**asdict(tuning), "elapsed_time": elapsed_time, "error": None}
+        except Exception as e:
+            elapsed_time = math.inf
+            measurement = {**asdict(tuning), "elapsed_time": None, "error": str(e)}
+        measurements.append(measurement)
+        if report is not None:
+            report(measurement)
+        return elapsed_time
+
+    results = {
+        (threads, mkldnn): run(WorkerTuning(threads, mkldnn))
+        for threads in thread_options
+        for mkldnn in mkldnn_options
+    }
+    best_threads, best_mkldnn = min(results, key=lambda key: results[key])
+    if math.isinf(results[(best_threads, best_mkldnn)]):
+        raise RuntimeError("所有参数组合都无法运行，校准失败")
+    # 批量识别按 物理核心数 // 线程数 个进程同时运行估算吞吐量
+    batch_threads = max(
+        (threads for threads, mkldnn in results if mkldnn == best_mkldnn),
+        key=lambda threads: (cores // threads) / results[(threads, best_mkldnn)],
+    )
+
+    batch_results = {REC_BATCH_SIZE: results[(best_threads, best_mkldnn)]}
+    for batch_size in TUNING_BATCH_SIZES:
+        if batch_size not in batch_results:
+            batch_results[batch_size] = run(
+                WorkerTuning(best_threads, best_mkldnn, batch_size)
+            )
+    best_batch_size = min(batch_results, key=lambda size: batch_results[size])
+    tuning = WorkerTuning(best_threads, best_mkldnn, best_batch_size, batch_threads)
+    return tuning, measurements
+
+
+def tune(
+    backend_name: str,
+    repeat: int = TUNING_REPEAT,
+    report: Callable[[dict[str, Any]], None] | None = None,
+) -> WorkerTuning:
+    tuning, measurements = calibrate(backend_name, repeat, report)
+    save_tuning(backend_name, tuning, measurements)
+    return tuning
+
+
+def startup_tuning(backend_name: str) -> WorkerTuning | None:
+    """
+    多进程识别（批量、服务）启动进程池之前调用：本机还没有校准结果且设置了 SNAPSUM4J_AUTO_TUNE 时只校准一次，
+    结果经 init_worker 交给各识别进程，识别进程不再各自校准。
+    校准在单独的 spawn 进程中运行，主进程不加载推理库，之后 fork 出的识别进程不会继承校准时创建的推理线程
+    """
+    tuning = batch_tuning(backend_name)
+    if tuning is not None or not TUNE_ON_STARTUP:
+        return tuning
+    print(f"Calibrating {backend_name} inference settings...", file=sys.stderr)
+    try:
+        with multiprocessing.get_context("spawn").Pool(1) as pool:
+            pool.apply(tune, (backend_name,))
+    except Exception as e:
+        print(f"Error calibrating inference settings: {e}", file=sys.stderr)
+        return None
+    return batch_tuning(backend_name)
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="SnapSum4J tune",
+        description="在内置图片上校准本机的线程数、MKL-DNN 和识别批大小，结果保存后识别进程启动时自动使用",
+    )
+    parser.add_argument("--backend", choices=OCR_BACKENDS, default=OCR_BACKEND)
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=TUNING_REPEAT,
+        help=f"每个组合的测量次数，取最快一次（默认：{TUNING_REPEAT}）",
+    )
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat 必须大于0")
+    if error := backend_config_error(args.backend):
+        parser.error(error)
+    return args
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+
+    def report(measurement: dict[str, Any]):
+        print(json.dumps(measurement, ensure_ascii=False), file=sys.stderr)
+
+    tuning = tune(args.backend, args.repeat, report)
+    result = {
+        "path": tuning_path(args.backend),
+        "tuning": asdict(tuning),
+        "physical_cores": physical_cores(),
+        "available_memory": available_memory(),
+        "batch_workers": plan_workers(args.backend, tuning.batch_cpu_threads),
+    }
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
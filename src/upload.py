@@ -42,7 +42,7 @@ class UploadFrame(tk.Frame):
     def upload_image(self):
         file_path = filedialog.askopenfilename(
             filetypes=[
-                ("图片文件", "*.png *.jpg *.jpeg *.bmp *.gif"),
+                ("图片文件", "*.png *.jpg *.jpeg *.bmp *.gif *.tif *.tiff"),
                 ("所有文件", "*.*"),
             ]
         )
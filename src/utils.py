@@ -1,10 +1,12 @@
 import os
 import sys
 
-from PIL.ImageFile import ImageFile
-
 from src.constant import SCALE_FACTOR
 
+Box = tuple[int, int, int, int]
+# 识别结果：(文本, 置信度, 框)
+RecItem = tuple[str, float, Box]
+
 
 # 解决打包后路径问题的核心函数：获取资源真实路径
 def get_resource_path(relative_path):
@@ -20,8 +22,13 @@ def get_resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 
-def calculate_scaled_size(image: ImageFile):
-    img_width, img_height = image.size
-    scaled_width = int(img_width * SCALE_FACTOR)
-    scaled_height = int(img_height * SCALE_FACTOR)
-    return scaled_width, scaled_height
+def calculate_initial_zoom(
+    image_size: tuple[int, int], max_size: tuple[int, int]
+) -> float:
+    """
+    小图最多放大 SCALE_FACTOR 倍，大图缩小到能完整放进 max_size
+    """
+    img_width, img_height = image_size
+    return min(
+        SCALE_FACTOR, max_size[0] / max(img_width, 1), max_size[1] / max(img_height, 1)
+    )
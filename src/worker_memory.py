@@ -0,0 +1,46 @@
+import os
+from typing import Any
+
+from src.constant import WORKER_MEMORY_ESTIMATES, WORKER_RSS_BUDGET_RATIO
+
+
+def process_rss(pid: int | None = None) -> int | None:
+    """
+    进程当前的常驻内存（字节）：优先用 psutil，其次读 /proc，都不可用时返回 None
+    """
+    pid = pid or os.getpid()
+    try:
+        import psutil  # pyright: ignore[reportMissingModuleSource]
+
+        return int(psutil.Process(pid).memory_info().rss)
+    except ImportError:
+        pass
+    except Exception:
+        return None
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def rss_budget(backend_name: str, megabytes: int | None = None) -> int | None:
+    # 未指定时按预估占用的倍数计算，指定为 0 时不限制
+    if megabytes is None:
+        return int(WORKER_MEMORY_ESTIMATES[backend_name] * WORKER_RSS_BUDGET_RATIO)
+    return megabytes * 1024 * 1024 or None
+
+
+def record_rss(result: Any, budget: int) -> bool:
+    """
+    在识别进程中任务结束后调用：把本进程的常驻内存写入结果的追踪信息，返回是否超出预算
+    """
+    rss = process_rss()
+    over_budget = rss is not None and rss > budget
+    if isinstance(result, dict) and isinstance(result.get("trace"), dict):
+        result["trace"]["rss"] = rss
+        result["trace"]["recycled"] = over_budget
+    return over_budget
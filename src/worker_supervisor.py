@@ -0,0 +1,324 @@
+import multiprocessing
+import queue
+import sys
+import threading
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, Iterable, Iterator
+
+from src.constant import (
+    WORKER_CRASHED_ERROR,
+    WORKER_JOB_ATTEMPTS,
+    WORKER_JOB_TIMEOUT,
+    WORKER_STATE_RESTARTING,
+    WORKER_TIMEOUT_ERROR,
+)
+from src.recognition import init_worker, report_worker_state
+from src.worker_memory import record_rss
+
+
+def run_worker(conn: Connection, initargs: tuple[Any, ...], rss_budget: int | None):
+    """
+    识别进程的主循环：加载并预热模型后先发回 None 表示就绪，之后逐个执行收到的任务，
+    发回 (是否成功, 结果或错误信息, 是否退出)。设置了 rss_budget 时任务结束后检查常驻内存，
+    超出预算则发回结果后退出，由主进程换上新进程。主进程关闭连接时退出
+    """
+    init_worker(*initargs)
+    conn.send(None)
+    while True:
+        try:
+            task, args = conn.recv()
+        except EOFError:
+            return
+        try:
+            result = task(*args)
+        except Exception as e:
+            success, value = False, str(e)
+        else:
+            success, value = True, result
+        exiting = rss_budget is not None and record_rss(value, rss_budget)
+        conn.send((success, value, exiting))
+        if exiting:
+            return
+
+
+class WorkerLostError(Exception):
+    """
+    识别进程在任务中途退出（段错误、被系统因内存不足结束等）或超时被结束
+    """
+
+
+class WorkerProcess:
+    """
+    一个识别进程及与它通信的管道，initargs 原样传给 init_worker
+    """
+
+    def __init__(
+        self,
+        initargs: tuple[Any, ...],
+        context: Any = None,
+        rss_budget: int | None = None,
+    ):
+        context = context or multiprocessing.get_context()
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=run_worker,
+            args=(child_conn, initargs, rss_budget),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.ready = False
+        # 进程因超出内存预算在发回上一个结果后退出
+        self.exiting = False
+
+    def wait_ready(self) -> bool:
+        # 模型加载和首次校准的耗时无法预估，这里不设超时，只检查进程是否还活着
+        if not self.ready and self.conn in wait([self.conn, self.process.sentinel]):
+            try:
+                self.ready = self.conn.recv() is None
+            except EOFError:
+                pass
+        return self.ready
+
+    def run(
+        self, task: Callable[..., Any], args: tuple[Any, ...], timeout: float | None
+    ) -> Any:
+        if not self.wait_ready():
+            raise WorkerLostError(self.crash_error())
+        try:
+            self.conn.send((task, args))
+        except (BrokenPipeError, ConnectionResetError):
+            raise WorkerLostError(self.crash_error())
+        if not wait([self.conn, self.process.sentinel], timeout):
+            raise WorkerLostError(WORKER_TIMEOUT_ERROR.format(timeout=timeout))
+        try:
+            # 进程发回结果后立即退出时两者同时就绪，优先取结果
+            success, value, self.exiting = self.conn.recv()
+        except EOFError:
+            raise WorkerLostError(self.crash_error())
+        if not success:
+            raise RuntimeError(value)
+        return value
+
+    def crash_error(self) -> str:
+        self.process.join()
+        return WORKER_CRASHED_ERROR.format(exitcode=self.process.exitcode)
+
+    def stop(self):
+        self.conn.close()
+        self.process.kill()
+        self.process.join()
+
+
+@dataclass
+class SupervisedJob:
+    task: Callable[..., Any]
+    args: tuple[Any, ...]
+    callback: Callable[[Any], None]
+    error_callback: Callable[[BaseException], None]
+
+
+class WorkerSupervisor:
+    """
+    代替单进程的进程池运行识别任务，apply_async 与进程池的同名方法一致。
+    识别进程崩溃或单个任务超过 timeout 秒时结束并重启该进程，任务在新进程上最多重试一次，
+    仍失败时以错误回调，不会让界面一直停在“正在识别”。
+    standby 为 True 时另外保持一个已预热的备用进程，出错时直接顶替，不必在用户面前重新加载模型
+    """
+
+    def __init__(
+        self,
+        status_queue: Any,
+        cancel_event: Any,
+        standby: bool = False,
+        timeout: float = WORKER_JOB_TIMEOUT,
+    ):
+        self.status_queue = status_queue
+        self.cancel_event = cancel_event
+        self.standby_enabled = standby
+        self.timeout = timeout
+        self.jobs: queue.Queue[SupervisedJob] = queue.Queue()
+        self.active = WorkerProcess((status_queue, cancel_event))
+        self.standby: WorkerProcess | None = None
+        threading.Thread(target=self.supervise, daemon=True).start()
+
+    def apply_async(
+        self,
+        task: Callable[..., Any],
+        args: tuple[Any, ...],
+        callback: Callable[[Any], None],
+        error_callback: Callable[[BaseException], None],
+    ):
+        self.jobs.put(SupervisedJob(task, args, callback, error_callback))
+
+    def supervise(self):
+        # 主进程加载完模型后再启动备用进程，两者不会同时抢占 CPU 拖慢首次加载
+        self.active.wait_ready()
+        self.refill_standby()
+        while True:
+            self.run_job(self.jobs.get())
+
+    def run_job(self, job: SupervisedJob):
+        if not self.active.process.is_alive():
+            # 空闲时退出的进程不占用任务的重试次数
+            self.replace_active(self.active.crash_error())
+        for attempt in range(WORKER_JOB_ATTEMPTS):
+            try:
+                result = self.active.run(job.task, job.args, self.timeout)
+            except WorkerLostError as e:
+                print(f"Recognition worker lost: {e}", file=sys.stderr)
+                self.replace_active(str(e))
+                if attempt + 1 == WORKER_JOB_ATTEMPTS:
+                    job.error_callback(e)
+                continue
+            except Exception as e:
+                job.error_callback(e)
+            else:
+                job.callback(result)
+            return
+
+    def replace_active(self, error: str):
+        self.active.stop()
+        report_worker_state(self.status_queue, WORKER_STATE_RESTARTING, error=error)
+        standby, self.standby = self.standby, None
+        if standby is not None and standby.process.is_alive():
+            self.active = standby
+        else:
+            if standby is not None:
+                standby.stop()
+            self.active = WorkerProcess((self.status_queue, self.cancel_event))
+        self.refill_standby()
+
+    def refill_standby(self):
+        if self.standby_enabled and self.standby is None:
+            # 备用进程不上报状态，界面只显示正在使用的进程的加载进度
+            self.standby = WorkerProcess((None, self.cancel_event))
+
+
+class WorkerPool:
+    """
+    批量识别和识别服务的进程池，apply/apply_async 与标准库进程池的同名方法用法相同，
+    imap_unordered 则逐个返回 (参数, 结果, 错误)，单个任务失败不影响其余任务。
+    每个识别进程由一个线程逐个派发任务；进程发回结果时告知是否因常驻内存超出 rss_budget 而退出，
+    派发线程据此换上新进程。进程在任务中途崩溃时该任务以 WorkerLostError 失败，不会一直等待
+    """
+
+    def __init__(
+        self,
+        processes: int,
+        initargs: tuple[Any, ...],
+        context: Any = None,
+        rss_budget: int | None = None,
+    ):
+        self.initargs = initargs
+        self.context = context
+        self.rss_budget = rss_budget
+        self.jobs: queue.Queue[SupervisedJob | None] = queue.Queue()
+        self.lock = threading.Lock()
+        self.closed = False
+        self.workers = [self.start_worker() for _ in range(processes)]
+        for index in range(processes):
+            threading.Thread(target=self.serve, args=(index,), daemon=True).start()
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, *exc_info: Any):
+        self.terminate()
+
+    def start_worker(self) -> WorkerProcess:
+        return WorkerProcess(self.initargs, self.context, self.rss_budget)
+
+    def apply_async(
+        self,
+        task: Callable[..., Any],
+        args: tuple[Any, ...],
+        callback: Callable[[Any], None],
+        error_callback: Callable[[BaseException], None],
+    ):
+        self.jobs.put(SupervisedJob(task, args, callback, error_callback))
+
+    def apply(self, task: Callable[..., Any], args: tuple[Any, ...]) -> Any:
+        results: queue.Queue[tuple[bool, Any]] = queue.Queue()
+        self.submit(task, args, results)
+        return self.take(results)
+
+    def imap_unordered(
+        self, task: Callable[..., Any], iterable: Iterable[Any]
+    ) -> Iterator[tuple[Any, Any, BaseException | None]]:
+        """
+        全部提交后按完成顺序逐个返回 (参数, 结果, 错误)，成功时错误为 None，失败时结果为 None。
+        识别进程在某个任务中途崩溃时只有该任务失败，不会中断其余任务
+        """
+        results: queue.Queue[tuple[Any, Any, BaseException | None]] = queue.Queue()
+        count = 0
+        for item in iterable:
+            self.apply_async(
+                task,
+                (item,),
+                callback=lambda result, item=item: results.put((item, result, None)),
+                error_callback=lambda error, item=item: results.put((item, None, error)),
+            )
+            count += 1
+        for _ in range(count):
+            yield results.get()
+
+    def submit(
+        self,
+        task: Callable[..., Any],
+        args: tuple[Any, ...],
+        results: queue.Queue[tuple[bool, Any]],
+    ):
+        self.apply_async(
+            task,
+            args,
+            callback=lambda result: results.put((True, result)),
+            error_callback=lambda error: results.put((False, error)),
+        )
+
+    @staticmethod
+    def take(results: queue.Queue[tuple[bool, Any]]) -> Any:
+        success, value = results.get()
+        if not success:
+            raise value
+        return value
+
+    def serve(self, index: int):
+        while (job := self.jobs.get()) is not None:
+            worker = self.workers[index]
+            if not worker.process.is_alive():
+                print(f"Recognition worker lost: {worker.crash_error()}", file=sys.stderr)
+                worker = self.replace(index)
+            try:
+                result = worker.run(job.task, job.args, None)
+            except WorkerLostError as e:
+                if not self.closed:
+                    print(f"Recognition worker lost: {e}", file=sys.stderr)
+                    self.replace(index)
+                job.error_callback(e)
+                continue
+            except Exception as e:
+                job.error_callback(e)
+            else:
+                job.callback(result)
+            if worker.exiting:
+                # 进程发回结果后已自行退出，等它结束后换上新进程
+                worker.process.join()
+                self.replace(index)
+
+    def replace(self, index: int) -> WorkerProcess:
+        with self.lock:
+            self.workers[index].stop()
+            if not self.closed:
+                self.workers[index] = self.start_worker()
+            return self.workers[index]
+
+    def terminate(self):
+        # 与标准库进程池相同，不等待未完成的任务
+        with self.lock:
+            self.closed = True
+            for worker in self.workers:
+                worker.stop()
+        for _ in self.workers:
+            self.jobs.put(None)
@@ -0,0 +1,36 @@
+import io
+import json
+import multiprocessing
+import os
+
+import pytest
+
+from src import batch, worker_supervisor
+
+
+def fake_recognition(image_path: str, options: object) -> dict:
+    # 模拟识别进程在某张图片上段错误或被系统因内存不足结束
+    if os.path.basename(image_path) == "1.png":
+        os._exit(11)
+    return {"path": image_path, "success": True, "numbers": [1.0], "total": 1.0}
+
+
+@pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="替换的识别函数需经 fork 传给识别进程",
+)
+def test_worker_crash_fails_only_that_image(tmp_path, monkeypatch):
+    monkeypatch.setattr(worker_supervisor, "init_worker", lambda *args: None)
+    monkeypatch.setattr(batch, "batch_recognition_process", fake_recognition)
+    for index in range(5):
+        (tmp_path / f"{index}.png").write_bytes(b"")
+
+    output = io.StringIO()
+    assert batch.run_batch(output, [str(tmp_path)], 2) == 1
+
+    *records, summary = [json.loads(line) for line in output.getvalue().splitlines()]
+    failed = [record for record in records if record["error"] is not None]
+    assert len(records) == 5
+    assert [os.path.basename(record["path"]) for record in failed] == ["1.png"]
+    assert summary["failed"] == 1
+    assert summary["total"] == 4.0
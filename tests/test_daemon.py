@@ -0,0 +1,66 @@
+import http.client
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src.daemon import DaemonStats, RecognitionDaemon
+
+
+@pytest.fixture
+def daemon_url():
+    # 请求体不合法时在派发给识别进程之前就返回，不需要进程池
+    server = RecognitionDaemon(("127.0.0.1", 0), None, DaemonStats(1, 0, "paddle"))
+    threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    ).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def post(url: str, body: bytes) -> tuple[int, dict]:
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=body)) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+@pytest.mark.parametrize("path", ["/regions", "/recheck"])
+@pytest.mark.parametrize(
+    "body",
+    [
+        b"not json",
+        b"[]",
+        b'"images"',
+        b'{"images": "aGVsbG8="}',
+        b'{"images": [1, 2]}',
+        b'{"images": ["%%%"]}',
+    ],
+)
+def test_malformed_body_is_rejected(daemon_url, path, body):
+    status, result = post(daemon_url + path, body)
+    assert status == 400
+    assert result["success"] is False
+
+
+def test_malformed_options_are_rejected(daemon_url):
+    status, _ = post(daemon_url + "/regions", b'{"images": [], "options": []}')
+    assert status == 400
+    status, _ = post(daemon_url + "/regions", b'{"images": [], "options": {"cascade": "x"}}')
+    assert status == 400
+
+
+@pytest.mark.parametrize("length", ["abc", "-1"])
+def test_invalid_content_length_is_rejected(daemon_url, length):
+    connection = http.client.HTTPConnection(daemon_url.removeprefix("http://"), timeout=5)
+    connection.putrequest("POST", "/regions")
+    connection.putheader("Content-Length", length)
+    connection.endheaders()
+    response = connection.getresponse()
+    assert response.status == 400
+    assert json.loads(response.read())["success"] is False
+    connection.close()
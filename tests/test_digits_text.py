@@ -0,0 +1,86 @@
+import tkinter as tk
+from decimal import Decimal
+
+import pytest
+
+from src.digits_text import DigitsText, LineTotals, parse_number
+
+
+def expected_total(text: str) -> Decimal:
+    numbers = [parse_number(line) for line in text.split("\n")]
+    return sum((number for number in numbers if number is not None), Decimal(0))
+
+
+def test_line_totals_replace_updates_total_and_values():
+    totals = LineTotals()
+    totals.replace(0, 1, ["1", "2.5", "abc", ""])
+    assert totals.total == Decimal("3.5")
+    assert totals.values == [Decimal(1), Decimal("2.5"), None, None]
+
+    totals.replace(1, 2, ["4"])
+    assert totals.total == Decimal(5)
+    assert totals.values == [Decimal(1), Decimal(4), None]
+
+
+def test_line_totals_skips_non_finite_numbers():
+    totals = LineTotals()
+    totals.replace(0, 1, ["NaN", "inf", "7"])
+    assert totals.total == Decimal(7)
+
+
+@pytest.fixture
+def digits_text():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("no display available")
+    totals: list[Decimal] = []
+    widget = DigitsText(root, totals.append)
+    yield widget, totals
+    root.destroy()
+
+
+def assert_consistent(widget: DigitsText):
+    text = widget.get("1.0", "end -1c")
+    assert len(widget.line_totals.values) == widget.line_count()
+    assert widget.line_totals.total == expected_total(text)
+
+
+def test_insert_at_end_counts_first_line(digits_text):
+    widget, totals = digits_text
+    widget.set_lines(["1", "2", "3"])
+    assert totals[-1] == Decimal(6)
+    assert_consistent(widget)
+
+    widget.insert(tk.END, "4\n")
+    assert totals[-1] == Decimal(10)
+    assert_consistent(widget)
+
+
+def test_multi_line_and_multi_range_delete(digits_text):
+    widget, totals = digits_text
+    widget.set_lines(["1", "2", "3", "4", "5"])
+    widget.delete("2.0", "4.0")
+    assert totals[-1] == Decimal(10)
+    assert_consistent(widget)
+
+    widget.delete("1.0", "1.end", "3.0", "3.end")
+    assert totals[-1] == Decimal(4)
+    assert_consistent(widget)
+
+    widget.delete("1.0", tk.END)
+    assert totals[-1] == Decimal(0)
+    assert_consistent(widget)
+
+
+def test_replace_line_and_join_lines(digits_text):
+    widget, totals = digits_text
+    widget.set_lines(["1", "2", "3"])
+    widget.replace("2.0", "2.end", "20\n30")
+    assert totals[-1] == Decimal(54)
+    assert_consistent(widget)
+
+    # 删除行尾换行符把两行合并成一行
+    widget.delete("1.end")
+    assert totals[-1] == Decimal(153)
+    assert_consistent(widget)
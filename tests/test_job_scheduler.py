@@ -0,0 +1,122 @@
+import threading
+from typing import Any, Callable
+
+from src.constant import (
+    JOB_KIND_PAGES,
+    JOB_KIND_RECHECK,
+    JOB_KIND_RECOGNIZE,
+    JOB_KIND_WATCH,
+    JOB_PRIORITY_BACKGROUND,
+    JOB_PRIORITY_INTERACTIVE,
+)
+from src.job_scheduler import JobScheduler
+
+
+class FakePool:
+    """
+    只记录派发的任务，由测试决定何时以什么结果完成
+    """
+
+    def __init__(self):
+        self.calls: list[tuple[tuple[Any, ...], Callable[[Any], None]]] = []
+
+    def apply_async(
+        self,
+        task: Callable[..., Any],
+        args: tuple[Any, ...],
+        callback: Callable[[Any], None],
+        error_callback: Callable[[BaseException], None],
+    ):
+        self.calls.append((args, callback))
+
+    def complete(self, index: int):
+        args, callback = self.calls[index]
+        callback({"success": True, "name": args[0]})
+
+
+class Recorder:
+    def __init__(self):
+        self.results: dict[str, dict[str, Any]] = {}
+        self.done: list[str] = []
+
+    def submit(
+        self,
+        scheduler: JobScheduler,
+        name: str,
+        kind: str,
+        priority: int = JOB_PRIORITY_INTERACTIVE,
+    ):
+        scheduler.submit(
+            lambda name: {},
+            (name,),
+            lambda result: self.results.setdefault(name, result),
+            lambda: self.done.append(name),
+            kind,
+            priority,
+        )
+
+
+def make_scheduler() -> tuple[JobScheduler, FakePool, threading.Event, Recorder]:
+    pool = FakePool()
+    cancel_event = threading.Event()
+    return JobScheduler(pool, cancel_event), pool, cancel_event, Recorder()
+
+
+def dispatched(pool: FakePool) -> list[str]:
+    return [args[0] for args, _ in pool.calls]
+
+
+def test_newer_job_of_same_kind_replaces_queued_one():
+    scheduler, pool, _, recorder = make_scheduler()
+    recorder.submit(scheduler, "watch", JOB_KIND_WATCH)
+    recorder.submit(scheduler, "first", JOB_KIND_RECHECK)
+    recorder.submit(scheduler, "second", JOB_KIND_RECHECK)
+    # 被替换的任务立即释放资源，不会派发，也不回调结果
+    assert recorder.done == ["first"]
+    pool.complete(0)
+    assert dispatched(pool) == ["watch", "second"]
+    pool.complete(1)
+    assert set(recorder.results) == {"watch", "second"}
+    assert scheduler.pending() == 0
+
+
+def test_newer_job_supersedes_running_one_and_drops_its_result():
+    scheduler, pool, cancel_event, recorder = make_scheduler()
+    recorder.submit(scheduler, "old", JOB_KIND_RECOGNIZE)
+    recorder.submit(scheduler, "new", JOB_KIND_RECOGNIZE)
+    assert cancel_event.is_set()
+    # 被取消的任务还占着识别进程，等它返回后才派发新任务
+    assert dispatched(pool) == ["old"]
+    pool.complete(0)
+    assert not cancel_event.is_set()
+    pool.complete(1)
+    assert list(recorder.results) == ["new"]
+    assert recorder.done == ["old", "new"]
+
+
+def test_cancel_sets_event_for_running_job():
+    scheduler, pool, cancel_event, recorder = make_scheduler()
+    recorder.submit(scheduler, "running", JOB_KIND_RECOGNIZE)
+    recorder.submit(scheduler, "queued", JOB_KIND_RECHECK)
+    scheduler.cancel()
+    assert cancel_event.is_set()
+    assert recorder.results["running"]["cancelled"] is True
+    assert recorder.results["queued"]["cancelled"] is True
+    assert recorder.done == ["queued"]
+    # 识别进程返回被取消任务的结果时不再回调
+    pool.complete(0)
+    assert recorder.results["running"]["cancelled"] is True
+    assert recorder.done == ["queued", "running"]
+    assert scheduler.pending() == 0
+
+
+def test_higher_priority_goes_first():
+    scheduler, pool, _, recorder = make_scheduler()
+    recorder.submit(scheduler, "busy", JOB_KIND_WATCH, JOB_PRIORITY_BACKGROUND)
+    recorder.submit(scheduler, "pages", JOB_KIND_PAGES, JOB_PRIORITY_BACKGROUND)
+    recorder.submit(scheduler, "recheck", JOB_KIND_RECHECK, JOB_PRIORITY_INTERACTIVE)
+    recorder.submit(scheduler, "recognize", JOB_KIND_RECOGNIZE)
+    for index in range(4):
+        pool.complete(index)
+    # 同优先级按提交顺序
+    assert dispatched(pool) == ["busy", "recheck", "recognize", "pages"]
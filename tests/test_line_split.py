@@ -0,0 +1,84 @@
+import numpy as np
+
+from src.constant import LINE_PADDING, TRIM_PADDING
+from src.line_split import content_box, find_runs, split_text_lines
+
+
+def blank(height: int = 120, width: int = 200) -> np.ndarray:
+    return np.full((height, width, 3), 255, dtype=np.uint8)
+
+
+def draw(image: np.ndarray, box: tuple[int, int, int, int], value: int = 0):
+    x1, y1, x2, y2 = box
+    image[y1:y2, x1:x2] = value
+
+
+def test_find_runs_merges_small_gaps():
+    mask = np.array([1, 1, 0, 1, 0, 0, 0, 1], dtype=bool)
+    assert find_runs(mask, 2) == [(0, 4), (7, 8)]
+    assert find_runs(np.zeros(5, dtype=bool), 2) == []
+
+
+def test_blank_image_has_no_lines_or_content():
+    assert split_text_lines(blank()) is None
+    assert content_box(blank()) is None
+
+
+def test_single_line():
+    image = blank()
+    draw(image, (30, 20, 90, 32))
+    p = LINE_PADDING
+    assert split_text_lines(image) == [(30 - p, 20 - p, 90 + p, 32 + p)]
+
+
+def test_separate_lines_are_split_in_order():
+    image = blank()
+    for top in (10, 40, 70):
+        draw(image, (30, top, 90, top + 12))
+    lines = split_text_lines(image)
+    assert lines is not None
+    assert [box[1] + LINE_PADDING for box in lines] == [10, 40, 70]
+
+
+def test_touching_lines_fall_back():
+    # 后两行之间没有空白，投影上连成一段两倍高的“行”，不像单列文本，交给完整流程
+    image = blank()
+    for top in (10, 30, 50):
+        draw(image, (30, top, 90, top + 10))
+    draw(image, (30, 60, 90, 71))
+    assert split_text_lines(image) is None
+
+
+def test_two_columns_fall_back():
+    image = blank()
+    draw(image, (10, 20, 40, 32))
+    draw(image, (150, 20, 190, 32))
+    assert split_text_lines(image) is None
+
+
+def test_content_box_skips_uniform_borders():
+    image = blank()
+    # 深色标题栏和左侧纯色边距：颜色均匀，不算内容
+    draw(image, (0, 0, 200, 15), 50)
+    draw(image, (0, 15, 20, 120), 100)
+    draw(image, (60, 50, 120, 62))
+    assert content_box(image) == (
+        60 - TRIM_PADDING,
+        50 - TRIM_PADDING,
+        120 + TRIM_PADDING,
+        62 + TRIM_PADDING,
+    )
+
+
+def test_content_box_padding_is_clipped_to_image():
+    image = blank()
+    draw(image, (2, 3, 20, 20))
+    draw(image, (30, 3, 50, 20))
+    assert content_box(image) == (0, 0, 50 + TRIM_PADDING, 20 + TRIM_PADDING)
+
+
+def test_solid_band_at_edge_is_treated_as_border():
+    # 贴着右边缘的纯色块与标题栏无法区分，按边框去掉
+    image = blank()
+    draw(image, (150, 0, 200, 120), 0)
+    assert content_box(image) is None
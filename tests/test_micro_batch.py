@@ -0,0 +1,56 @@
+import threading
+from typing import Any, Callable
+
+from src.micro_batch import MicroBatcher
+from src.recognition import RecognitionOptions
+from src.shared_image import SharedImage
+
+
+class FakePool:
+    """
+    不启动识别进程，直接以给定的结果回调；result 为 None 时一直不回调
+    """
+
+    def __init__(self, result: dict[str, Any] | None):
+        self.result = result
+
+    def apply_async(
+        self,
+        task: Callable[..., Any],
+        args: tuple[Any, ...],
+        callback: Callable[[Any], None],
+        error_callback: Callable[[BaseException], None],
+    ):
+        if self.result is not None:
+            callback(self.result)
+
+
+def handle(index: int) -> SharedImage:
+    return SharedImage(f"image-{index}", (1, 1, 3), "uint8")
+
+
+def recognize_concurrently(batcher: MicroBatcher, count: int) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = [{} for _ in range(count)]
+
+    def run(index: int):
+        results[index] = batcher.recognize([handle(index)], RecognitionOptions())
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+        assert not thread.is_alive()
+    return results
+
+
+def test_malformed_result_fails_every_merged_request():
+    batcher = MicroBatcher(FakePool({"success": True}), 0.01, 16)
+    results = recognize_concurrently(batcher, 3)
+    assert all(result["success"] is False for result in results)
+
+
+def test_missing_result_times_out():
+    batcher = MicroBatcher(FakePool(None), 0.01, 16, timeout=0.1)
+    results = recognize_concurrently(batcher, 2)
+    assert all(result["success"] is False for result in results)
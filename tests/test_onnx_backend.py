@@ -0,0 +1,26 @@
+import pytest
+
+onnx_backend = pytest.importorskip("src.onnx_backend")
+
+
+def test_session_settings_come_from_config(monkeypatch):
+    monkeypatch.setattr(onnx_backend, "ONNX_INTER_OP_THREADS", "3")
+    monkeypatch.setattr(onnx_backend, "ONNX_GRAPH_OPTIMIZATION", "basic")
+    backend = onnx_backend.OnnxBackend()
+    assert backend.inter_op_threads == 3
+    assert backend.graph_optimization == "basic"
+    assert onnx_backend.OnnxBackend(inter_op_threads=2).inter_op_threads == 2
+
+
+@pytest.mark.parametrize(
+    "name, value",
+    [
+        ("ONNX_GRAPH_OPTIMIZATION", "max"),
+        ("ONNX_INTER_OP_THREADS", "-1"),
+        ("ONNX_INTRA_OP_THREADS", "two"),
+    ],
+)
+def test_invalid_session_settings_are_rejected(monkeypatch, name, value):
+    monkeypatch.setattr(onnx_backend, name, value)
+    with pytest.raises(ValueError):
+        onnx_backend.OnnxBackend()
@@ -0,0 +1,44 @@
+import os
+
+import numpy as np
+
+from src.ocr_backend import WorkerTuning
+from src.recognition import model_identity
+from src.result_cache import RecognitionCache
+
+
+def image(value: int) -> np.ndarray:
+    return np.full((2, 2, 3), value, dtype=np.uint8)
+
+
+def disk_files(cache_dir: str) -> list[str]:
+    return [name for _, _, names in os.walk(cache_dir) for name in names]
+
+
+def test_stale_versions_are_removed(tmp_path):
+    (tmp_path / "ab").mkdir()
+    (tmp_path / "ab" / "legacy.json").write_text("{}")
+    (tmp_path / "v3").mkdir()
+    (tmp_path / "v4").mkdir()
+    RecognitionCache(4, str(tmp_path), "identity", version=4)
+    assert os.listdir(tmp_path) == ["v4"]
+
+
+def test_disk_entries_are_evicted_by_last_use(tmp_path):
+    cache = RecognitionCache(0, str(tmp_path), "identity", version=1, max_disk_entries=10)
+    keys = [cache.make_key(image(value)) for value in range(30)]
+    for index, key in enumerate(keys):
+        cache.put(key, {"value": index})
+        # 模拟最早写入的条目一直被读取命中：修改时间最新，不会被淘汰
+        os.utime(cache.disk_path(keys[0]), (1e10, 1e10))
+    assert len(disk_files(str(tmp_path))) <= 10
+    assert cache.load(keys[0]) == {"value": 0}
+    assert cache.load(keys[-1]) == {"value": 29}
+    assert cache.load(keys[1]) is None
+
+
+def test_identity_follows_result_affecting_tuning():
+    base = model_identity("paddle", WorkerTuning(cpu_threads=4, enable_mkldnn=False))
+    assert model_identity("paddle", WorkerTuning(cpu_threads=4, enable_mkldnn=True)) != base
+    # 线程数只影响速度，不让已有缓存失效
+    assert model_identity("paddle", WorkerTuning(cpu_threads=2, enable_mkldnn=False)) == base
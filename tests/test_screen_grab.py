@@ -0,0 +1,92 @@
+import os
+import shutil
+import subprocess
+import sys
+import time
+import tkinter as tk
+
+import pytest
+
+from src.screen_grab import X11Grabber
+
+pytestmark = pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="X11 截图只在 Linux 上使用"
+)
+
+XVFB_DISPLAY = ":97"
+WINDOW_BOX = (40, 60, 140, 120)
+WINDOW_COLOR = (255, 32, 0)
+
+
+@pytest.fixture(scope="module")
+def display():
+    # 已有显示时直接使用；没有时若装有 Xvfb 则启动一个 24 位色的虚拟显示
+    if os.environ.get("DISPLAY"):
+        yield
+        return
+    if shutil.which("Xvfb") is None:
+        pytest.skip("需要 X11 显示或 Xvfb")
+    server = subprocess.Popen(
+        ["Xvfb", XVFB_DISPLAY, "-screen", "0", "640x480x24", "-nolisten", "tcp"]
+    )
+    time.sleep(1)
+    os.environ["DISPLAY"] = XVFB_DISPLAY
+    yield
+    del os.environ["DISPLAY"]
+    server.terminate()
+    server.wait()
+
+
+@pytest.fixture
+def grabber(display):
+    try:
+        return X11Grabber()
+    except OSError as e:
+        pytest.skip(str(e))
+
+
+@pytest.fixture
+def solid_window(display):
+    # 不经窗口管理器摆放的纯色窗口，位置和颜色都已知
+    root = tk.Tk()
+    x1, y1, x2, y2 = WINDOW_BOX
+    root.overrideredirect(True)
+    root.geometry(f"{x2 - x1}x{y2 - y1}+{x1}+{y1}")
+    root.configure(background="#%02x%02x%02x" % WINDOW_COLOR)
+    root.lift()
+    root.update()
+    time.sleep(0.2)
+    root.update()
+    yield
+    root.destroy()
+
+
+def test_grab_region_reads_rgb_pixels(grabber, solid_window):
+    x1, y1, x2, y2 = WINDOW_BOX
+    image = grabber.grab((x1 + 10, y1 + 10, x2 - 10, y2 - 10))
+    assert image.mode == "RGB"
+    assert image.size == (x2 - x1 - 20, y2 - y1 - 20)
+    # 通道顺序错误（BGR）时红色会变成蓝色
+    assert set(image.getdata()) == {WINDOW_COLOR}
+
+
+def test_grab_matches_full_screen_crop(grabber, solid_window):
+    screen = grabber.grab_screen()
+    assert screen.size == (grabber.width, grabber.height)
+    region = (20, 40, 160, 140)
+    assert grabber.grab(region).tobytes() == screen.crop(region).tobytes()
+
+
+def test_grab_is_clipped_to_screen(grabber):
+    width, height = grabber.width, grabber.height
+    image = grabber.grab((width - 10, height - 10, width + 50, height + 50))
+    assert image.size == (10, 10)
+    with pytest.raises(ValueError):
+        grabber.grab((width + 1, 0, width + 20, 20))
+
+
+def test_x_error_is_raised_not_fatal(grabber):
+    # 读取不存在的窗口会触发 X 错误：由错误处理函数记下错误码并抛出异常，而不是结束进程
+    grabber.root = 0x7FFFFFF
+    with pytest.raises(OSError):
+        grabber.grab((0, 0, 10, 10))
@@ -0,0 +1,74 @@
+import numpy as np
+
+from src.constant import WATCH_BAND_PADDING, WATCH_DIFF_SCALE
+from src.screen_watch import changed_bands, expand_band
+
+# 原始画面 400 像素高，缩小 WATCH_DIFF_SCALE 倍后比较
+HEIGHT = 400
+SHAPE = (HEIGHT // WATCH_DIFF_SCALE, 50)
+
+
+def item(top: int, bottom: int):
+    return ("1", 0.9, (0, top, 40, bottom))
+
+
+def frame_with_rows(*row_ranges: tuple[int, int]) -> np.ndarray:
+    frame = np.zeros(SHAPE, dtype=np.int16)
+    for start, end in row_ranges:
+        frame[start:end, 10:20] = 255
+    return frame
+
+
+def band(start: int, end: int) -> tuple[int, int]:
+    # 缩小画面中的变化行 [start, end) 对应的原始分辨率行带
+    return (
+        start * WATCH_DIFF_SCALE - WATCH_BAND_PADDING,
+        end * WATCH_DIFF_SCALE + WATCH_BAND_PADDING,
+    )
+
+
+def test_no_change():
+    frame = frame_with_rows((10, 12))
+    assert changed_bands(frame, frame.copy(), HEIGHT, [item(30, 50)]) == []
+
+
+def test_one_changed_band():
+    previous = frame_with_rows()
+    assert changed_bands(previous, frame_with_rows((10, 13)), HEIGHT, []) == [
+        band(10, 13)
+    ]
+
+
+def test_band_expands_to_cover_intersecting_items():
+    previous = frame_with_rows()
+    top, bottom = band(10, 13)
+    # 第一个数字与行带相交，扩展后又与第二个数字相交；不相交的数字不影响行带
+    items = [item(top - 10, top + 4), item(top - 20, top - 5), item(bottom + 30, 300)]
+    assert changed_bands(previous, frame_with_rows((10, 13)), HEIGHT, items) == [
+        (top - 20, bottom)
+    ]
+
+
+def test_bands_merge_after_expansion():
+    previous = frame_with_rows()
+    current = frame_with_rows((10, 13), (25, 28))
+    first, second = band(10, 13), band(25, 28)
+    assert changed_bands(previous, current, HEIGHT, []) == [first, second]
+    # 一个数字跨过两个行带之间的空隙，两个行带扩展后重叠，合并成一个
+    items = [item(first[1] - 4, second[0] + 4)]
+    assert changed_bands(previous, current, HEIGHT, items) == [(first[0], second[1])]
+
+
+def test_large_change_refreshes_whole_frame():
+    previous = frame_with_rows()
+    assert changed_bands(previous, frame_with_rows((0, 80)), HEIGHT, []) == [
+        (0, HEIGHT)
+    ]
+    assert changed_bands(previous, np.zeros((10, 10), np.int16), HEIGHT, []) == [
+        (0, HEIGHT)
+    ]
+
+
+def test_expand_band_is_stable_without_intersections():
+    assert expand_band(100, 120, [item(0, 50), item(130, 150)]) == (100, 120)
+    assert expand_band(100, 120, [item(90, 110)]) == (90, 120)
@@ -0,0 +1,48 @@
+from src.table_layout import group_intervals, table_layout
+
+
+def test_group_intervals_merges_overlaps_and_small_gaps():
+    intervals = [(50, 60), (0, 10), (8, 20), (23, 30), (100, 110)]
+    assert group_intervals(intervals, 0) == [[1, 2], [3], [0], [4]]
+    assert group_intervals(intervals, 5) == [[1, 2, 3], [0], [4]]
+
+
+def test_table_layout_totals_with_ragged_rows():
+    # 三列右对齐的数字，第二行缺中间一列，第三行只有最后一列；输入顺序打乱
+    cells = {
+        (0, 0): ("1", (10, 10, 50, 30)),
+        (0, 1): ("20", (100, 10, 140, 30)),
+        (0, 2): ("300", (200, 10, 240, 30)),
+        (1, 0): ("4", (30, 40, 50, 60)),
+        (1, 2): ("500", (190, 40, 240, 60)),
+        (2, 2): ("600.5", (180, 70, 240, 90)),
+    }
+    order = [(2, 2), (0, 1), (1, 0), (0, 0), (1, 2), (0, 2)]
+    numbers = [cells[key][0] for key in order]
+    boxes = [cells[key][1] for key in order]
+
+    layout = table_layout(numbers, boxes)
+
+    def texts(groups):
+        return [[numbers[i] for i in group] for group in groups]
+
+    assert texts(layout["columns"]) == [["1", "4"], ["20"], ["300", "500", "600.5"]]
+    assert texts(layout["rows"]) == [["1", "20", "300"], ["4", "500"], ["600.5"]]
+    assert layout["column_totals"] == [5.0, 20.0, 1400.5]
+    assert layout["row_totals"] == [321.0, 504.0, 600.5]
+
+
+def test_rows_with_slightly_overlapping_boxes_stay_separate():
+    # 相邻两行的框上下重叠 4 像素，只比较中间一段，不会并成一行
+    layout = table_layout(["1", "2"], [(0, 0, 40, 24), (0, 20, 40, 44)])
+    assert layout["rows"] == [[0], [1]]
+    assert layout["column_totals"] == [3.0]
+
+
+def test_empty_table():
+    assert table_layout([], []) == {
+        "columns": [],
+        "rows": [],
+        "column_totals": [],
+        "row_totals": [],
+    }
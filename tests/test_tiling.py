@@ -0,0 +1,94 @@
+import pytest
+
+from src.tiling import merge_tile_results, plan_axis, plan_tiles
+
+
+@pytest.mark.parametrize(
+    "length, tile_size, overlap",
+    [
+        (100, 120, 40),
+        (120, 120, 40),
+        (200, 120, 40),
+        (1000, 960, 160),
+        (4001, 960, 160),
+    ],
+)
+def test_plan_axis_covers_length_with_overlap(length, tile_size, overlap):
+    spans = plan_axis(length, tile_size, overlap)
+    assert spans[0][0] == 0
+    assert spans[-1][1] == length
+    for start, end in spans:
+        assert end - start == min(tile_size, length)
+    for (_, previous_end), (start, _) in zip(spans, spans[1:]):
+        # 相邻切片至少重叠 overlap，接缝处的文字总能在某一块中完整出现
+        assert previous_end - start >= overlap
+
+
+def test_plan_axis_rejects_overlap_not_smaller_than_tile():
+    with pytest.raises(ValueError):
+        plan_axis(500, 100, 100)
+    # 不需要切分时不检查重叠
+    assert plan_axis(80, 100, 200) == [(0, 80)]
+
+
+# 200x200 的图按 120 切、重叠 40：x 和 y 方向都切成 (0, 120) 和 (80, 200)
+WIDTH = HEIGHT = 200
+TILES = plan_tiles(WIDTH, HEIGHT, 120, 40)
+
+
+def local(box, tile):
+    return (box[0] - tile[0], box[1] - tile[1], box[2] - tile[0], box[3] - tile[1])
+
+
+def test_plan_tiles_grid():
+    assert TILES == [
+        (0, 0, 120, 120),
+        (80, 0, 200, 120),
+        (0, 80, 120, 200),
+        (80, 80, 200, 200),
+    ]
+
+
+def test_dedupe_across_one_seam_keeps_complete_box():
+    left, right = TILES[0], TILES[1]
+    # 左边的切片只看到被接缝截断的 "12"，右边的切片看到完整的 "123"
+    truncated = (100, 20, 118, 40)
+    complete = (100, 20, 130, 40)
+    other = (10, 60, 40, 80)
+    merged = merge_tile_results(
+        [
+            (
+                left,
+                [("12", 0.9, local(truncated, left)), ("7", 0.9, local(other, left))],
+            ),
+            (right, [("123", 0.8, local(complete, right))]),
+        ],
+        WIDTH,
+        HEIGHT,
+    )
+    assert merged == [("123", 0.8, complete), ("7", 0.9, other)]
+
+
+def test_dedupe_across_corner_of_four_tiles():
+    complete = (100, 100, 130, 130)
+    # 左上、右上、左下三块分别在右边、下边或两条接缝处截断，只有右下一块完整
+    seen = [
+        (TILES[0], "4", (100, 100, 118, 118)),
+        (TILES[1], "45", (100, 100, 130, 118)),
+        (TILES[2], "4", (100, 100, 118, 130)),
+        (TILES[3], "456", complete),
+    ]
+    merged = merge_tile_results(
+        [(tile, [(text, 0.9, local(box, tile))]) for tile, text, box in seen],
+        WIDTH,
+        HEIGHT,
+    )
+    assert merged == [("456", 0.9, complete)]
+
+
+def test_box_inside_all_overlaps_is_kept_once():
+    box = (95, 95, 105, 105)
+    merged = merge_tile_results(
+        [(tile, [("8", 0.9, local(box, tile))]) for tile in TILES], WIDTH, HEIGHT
+    )
+    assert merged == [("8", 0.9, box)]